@@ -0,0 +1,172 @@
+"""
+Compare per-query latency of SuggestionIndex with the list comprehension the Lambdas
+used before (first 10 substring matches in CSV order), then time mistyped queries on
+a fuzzy index against a brute-force edit distance scan and report how often the
+intended term is suggested.
+
+    python Lambda/benchmark_suggestions.py                       # 100k synthetic terms
+    python Lambda/benchmark_suggestions.py --csv skills.csv --column Skill
+
+Run from the repository root or the Lambda directory; only the standard library is needed.
+"""
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suggestion_index import FUZZY_DISTANCE, SuggestionIndex, prefix_distance  # noqa: E402
+
+SYLLABLES = ['ar', 'be', 'con', 'da', 'el', 'fi', 'gra', 'ho', 'in', 'ja', 'ka', 'lo', 'man', 'ne', 'or',
+             'pro', 'qua', 'ri', 'sys', 'te', 'un', 'ver', 'wa', 'xi', 'yo', 'zen']
+
+
+def synthetic_terms(count, seed):
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < count:
+        words = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(1, 3))]
+        terms.add(' '.join(words))
+    return list(terms)
+
+
+def csv_terms(path, column):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return [row[column].lower() for row in csv.DictReader(f) if row.get(column)]
+
+
+def sample_queries(terms, count, seed):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        term = rng.choice(terms)
+        length = rng.randint(1, min(8, len(term)))
+        start = 0 if rng.random() < 0.6 else rng.randint(0, len(term) - length)
+        query = term[start:start + length].strip()
+        if query:
+            # The handlers strip and lower-case the query before looking it up
+            queries.append(query)
+    # A few queries that match nothing
+    queries.extend(''.join(rng.choice('qxz') for _ in range(4)) for _ in range(count // 20))
+    return queries
+
+
+def typo_queries(terms, count, seed):
+    """(mistyped query, intended term) pairs: one or two random edits to a word of the term."""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    pairs = []
+    while len(pairs) < count:
+        term = rng.choice(terms)
+        words = term.split()
+        position = rng.randrange(len(words))
+        word = words[position]
+        if len(word) < 5:
+            continue
+        for _ in range(rng.randint(1, FUZZY_DISTANCE)):
+            i = rng.randrange(1, len(word) - 1)
+            edit = rng.choice(('delete', 'insert', 'replace', 'transpose'))
+            if edit == 'delete':
+                word = word[:i] + word[i + 1:]
+            elif edit == 'insert':
+                word = word[:i] + rng.choice(letters) + word[i:]
+            elif edit == 'replace':
+                word = word[:i] + rng.choice(letters) + word[i + 1:]
+            else:
+                word = word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+        words[position] = word
+        pairs.append((' '.join(words), term))
+    return pairs
+
+
+def brute_force_fuzzy(terms, query):
+    """Every term whose words start within FUZZY_DISTANCE edits of the query words, closest first."""
+    query_words = query.split()
+    scored = []
+    for term_id, term in enumerate(terms):
+        words = term.split()
+        if len(words) < len(query_words):
+            continue
+        distance = sum(prefix_distance(q, w, FUZZY_DISTANCE) for q, w in zip(query_words, words))
+        if distance <= FUZZY_DISTANCE * len(query_words):
+            scored.append((distance, term_id))
+    return [terms[term_id] for _, term_id in sorted(scored)[:10]]
+
+
+def measure(search, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return statistics.mean(timings), timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark autocomplete lookups.")
+    parser.add_argument('--terms', type=int, default=100000, help="Number of synthetic terms")
+    parser.add_argument('--csv', help="Benchmark the terms of this CSV instead")
+    parser.add_argument('--column', default='Skill')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--typo-queries', type=int, default=500)
+    parser.add_argument('--brute-force-queries', type=int, default=20,
+                        help="Typo queries also timed with a full edit distance scan (slow)")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    terms = csv_terms(args.csv, args.column) if args.csv else synthetic_terms(args.terms, args.seed)
+    queries = sample_queries(terms, args.queries, args.seed)
+
+    start = time.perf_counter()
+    built = SuggestionIndex.build(([term], term) for term in terms)
+    build_seconds = time.perf_counter() - start
+
+    # Search the memory-mapped file, as a Lambda with a prebuilt index does
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.idx')
+        built.save(path)
+        start = time.perf_counter()
+        index = SuggestionIndex.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        size_kib = os.path.getsize(path) / 1024
+
+    def baseline(query):
+        return [term for term in terms if query in term][:10]
+
+    # Every suggestion has to be a real substring match
+    for query in queries[:200]:
+        assert all(query in term for term in index.search(query)), query
+        assert len(index.search(query)) == len(baseline(query)), query
+
+    print(f"{len(terms)} terms, {len(queries)} queries, index built in {build_seconds:.2f}s, "
+          f"{size_kib:.0f} KiB on disk, mapped in {load_ms:.2f}ms")
+    print(f"{'':<22}{'mean':>10}{'p50':>10}{'p95':>10}  (microseconds)")
+    for name, search in (('list comprehension', baseline), ('SuggestionIndex', index.search)):
+        mean, p50, p95 = measure(search, queries)
+        print(f"{name:<22}{mean:>10.1f}{p50:>10.1f}{p95:>10.1f}")
+
+    start = time.perf_counter()
+    fuzzy = SuggestionIndex.build((([term], term) for term in terms), fuzzy=True)
+    build_seconds = time.perf_counter() - start
+    pairs = typo_queries(terms, args.typo_queries, args.seed)
+    found = sum(term in fuzzy.search(query) for query, term in pairs)
+
+    print(f"\nFuzzy index built in {build_seconds:.2f}s, {len(fuzzy._buffer) / 1024:.0f} KiB; "
+          f"{len(pairs)} mistyped queries, intended term suggested for {found / len(pairs):.0%}")
+    print(f"{'':<22}{'mean':>10}{'p50':>10}{'p95':>10}  (microseconds)")
+    typos = [query for query, _ in pairs]
+    brute_force = typos[:args.brute_force_queries]
+    for name, search, queries in (('edit distance scan', lambda q: brute_force_fuzzy(terms, q), brute_force),
+                                  ('fuzzy SuggestionIndex', fuzzy.search, typos)):
+        mean, p50, p95 = measure(search, queries)
+        print(f"{name:<22}{mean:>10.1f}{p50:>10.1f}{p95:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
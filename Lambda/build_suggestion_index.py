@@ -0,0 +1,41 @@
+"""
+Build the prebuilt autocomplete index for one Lambda from its CSV.
+
+    python Lambda/build_suggestion_index.py skill skills.csv
+    python Lambda/build_suggestion_index.py city worldcities.csv --output build/city.idx
+
+By default <type>.idx is written next to this script, which is where the handler looks
+first; ship it in the deployment package (or upload it to INDEX_BUCKET) to skip the S3
+CSV download and parsing on cold start.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suggestion_index import (  # noqa: E402
+    FUZZY_KINDS, PACKAGE_DIR, SOURCES, SuggestionIndex, entries_from_rows, rows_from_file
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a suggestion index file from a CSV.")
+    parser.add_argument('kind', choices=sorted(SOURCES))
+    parser.add_argument('csv', help="Path of the CSV the Lambda would otherwise read from S3")
+    parser.add_argument('--output', help="Defaults to <kind>.idx next to this script")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(PACKAGE_DIR, f"{args.kind}.idx")
+
+    start = time.perf_counter()
+    rows = rows_from_file(args.csv)
+    index = SuggestionIndex.build(entries_from_rows(rows, args.kind), fuzzy=args.kind in FUZZY_KINDS)
+    index.save(output)
+    print(f"Wrote {len(index)} {args.kind} entries to {output} "
+          f"({os.path.getsize(output) / 1024:.0f} KiB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
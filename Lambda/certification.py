@@ -1,35 +1,38 @@
 import json
 import boto3
-import csv
 import os
 from functools import lru_cache
 
+from suggestion_index import SuggestionIndex, entries_from_rows, load_index, rows_from_s3
+
 s3_client = boto3.client('s3')
-CSV_BUCKET = os.environ['CSV_BUCKET']
-CSV_KEY = os.environ['CSV_KEY']
+# Only read when no prebuilt index is available, see suggestion_index.load_index
+CSV_BUCKET = os.environ.get('CSV_BUCKET')
+CSV_KEY = os.environ.get('CSV_KEY')
+
+# Global index over the certification data, loaded once per cold start
+certification_index = None
+
 
-# Global variable to cache certification data
-certification_data = []
+def build_certification_index():
+    print("Building certification index from the CSV in S3.")
+    return SuggestionIndex.build(entries_from_rows(rows_from_s3(s3_client, CSV_BUCKET, CSV_KEY), 'certification'))
 
 
 def load_certification_data():
-    global certification_data
-    if not certification_data:
+    global certification_index
+    if certification_index is None:
         try:
-            print("Loading certification data from S3.")
-            response = s3_client.get_object(Bucket=CSV_BUCKET, Key=CSV_KEY)
-            content = response['Body'].read().decode('utf-8-sig').splitlines()
-            reader = csv.DictReader(content)
-            certification_data = [row['Certification'].lower() for row in reader if row.get('Certification')]
-            print(f"Loaded {len(certification_data)} certifications.")
+            certification_index = load_index('certification', build_certification_index, s3_client)
+            print(f"Loaded {len(certification_index)} certifications.")
         except Exception as e:
-            print(f"Error loading CSV: {e}")
-            certification_data = []
+            print(f"Error loading certification index: {e}")
+            certification_index = None
 
 
 @lru_cache(maxsize=1024)
 def get_suggestions(query):
-    return [cer for cer in certification_data if query in cer][:10]
+    return certification_index.search(query) if certification_index else []
 
 
 def lambda_handler(event, context):
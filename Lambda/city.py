@@ -1,42 +1,38 @@
 import boto3
-import csv
 import os
 import json
 from functools import lru_cache
 
+from suggestion_index import SuggestionIndex, entries_from_rows, load_index, rows_from_s3
+
 s3_client = boto3.client('s3')
-CSV_BUCKET = os.environ['CSV_BUCKET']
-CSV_KEY = os.environ['CSV_KEY']
+# Only read when no prebuilt index is available, see suggestion_index.load_index
+CSV_BUCKET = os.environ.get('CSV_BUCKET')
+CSV_KEY = os.environ.get('CSV_KEY')
+
+# Global index over the city data, loaded once per cold start
+city_index = None
+
 
-# Global variable to cache city data
-city_data = []
+def build_city_index():
+    print("Building city index from the CSV in S3.")
+    return SuggestionIndex.build(entries_from_rows(rows_from_s3(s3_client, CSV_BUCKET, CSV_KEY), 'city'))
 
 
 def load_city_data():
-    global city_data
-    if not city_data:
+    global city_index
+    if city_index is None:
         try:
-            print("Loading city data from S3.")
-            response = s3_client.get_object(Bucket=CSV_BUCKET, Key=CSV_KEY)
-            lines = response['Body'].read().decode('utf-8').splitlines()
-            reader = csv.DictReader(lines)
-            # Extract city and country names and store in a list of dictionaries
-            city_data = [{'city': row['city'].lower(), 'country': row['country'].lower(),
-                          'original_city': row['city'], 'original_country': row['country']}
-                         for row in reader if row.get('city') and row.get('country')]
-            print(f"Loaded {len(city_data)} cities.")
+            city_index = load_index('city', build_city_index, s3_client)
+            print(f"Loaded {len(city_index)} cities.")
         except Exception as e:
-            print(f"Error loading CSV: {e}")
-            city_data = []
+            print(f"Error loading city index: {e}")
+            city_index = None
 
 
 @lru_cache(maxsize=1024)
 def get_suggestions(query):
-    return [
-               {'city': item['original_city'], 'country': item['original_country']}
-               for item in city_data
-               if query in item['city'] or query in item['country']
-           ][:10]
+    return city_index.search(query) if city_index else []
 
 
 def lambda_handler(event, context):
@@ -1,35 +1,39 @@
 import json
 import boto3
-import csv
 import os
 from functools import lru_cache
 
+from suggestion_index import SuggestionIndex, entries_from_rows, load_index, rows_from_s3
+
 s3_client = boto3.client('s3')
-CSV_BUCKET = os.environ['CSV_BUCKET']
-CSV_KEY = os.environ['CSV_KEY']
+# Only read when no prebuilt index is available, see suggestion_index.load_index
+CSV_BUCKET = os.environ.get('CSV_BUCKET')
+CSV_KEY = os.environ.get('CSV_KEY')
+
+# Global index over the occupation data, loaded once per cold start
+occupation_index = None
+
 
-# Global variable to cache occupation data
-occupation_data = []
+def build_occupation_index():
+    print("Building occupation index from the CSV in S3.")
+    rows = rows_from_s3(s3_client, CSV_BUCKET, CSV_KEY)
+    return SuggestionIndex.build(entries_from_rows(rows, 'occupation'), fuzzy=True)
 
 
 def load_occupation_data():
-    global occupation_data
-    if not occupation_data:
+    global occupation_index
+    if occupation_index is None:
         try:
-            print("Loading occupation data from S3.")
-            response = s3_client.get_object(Bucket=CSV_BUCKET, Key=CSV_KEY)
-            content = response['Body'].read().decode('utf-8-sig').splitlines()
-            reader = csv.DictReader(content)
-            occupation_data = [row['Occupation'].lower() for row in reader if row.get('Occupation')]
-            print(f"Loaded {len(occupation_data)} occupations.")
+            occupation_index = load_index('occupation', build_occupation_index, s3_client)
+            print(f"Loaded {len(occupation_index)} occupations.")
         except Exception as e:
-            print(f"Error loading CSV: {e}")
-            occupation_data = []
+            print(f"Error loading occupation index: {e}")
+            occupation_index = None
 
 
 @lru_cache(maxsize=1024)
 def get_suggestions(query):
-    return [occ for occ in occupation_data if query in occ][:10]
+    return occupation_index.search(query) if occupation_index else []
 
 
 def lambda_handler(event, context):
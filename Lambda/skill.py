@@ -1,35 +1,39 @@
 import json
 import boto3
-import csv
 import os
 from functools import lru_cache
 
+from suggestion_index import SuggestionIndex, entries_from_rows, load_index, rows_from_s3
+
 s3_client = boto3.client('s3')
-CSV_BUCKET = os.environ['CSV_BUCKET']
-CSV_KEY = os.environ['CSV_KEY']
+# Only read when no prebuilt index is available, see suggestion_index.load_index
+CSV_BUCKET = os.environ.get('CSV_BUCKET')
+CSV_KEY = os.environ.get('CSV_KEY')
+
+# Global index over the skill data, loaded once per cold start
+skill_index = None
+
 
-# Global variable to cache skill data
-skill_data = []
+def build_skill_index():
+    print("Building skill index from the CSV in S3.")
+    rows = rows_from_s3(s3_client, CSV_BUCKET, CSV_KEY)
+    return SuggestionIndex.build(entries_from_rows(rows, 'skill'), fuzzy=True)
 
 
 def load_skill_data():
-    global skill_data
-    if not skill_data:
+    global skill_index
+    if skill_index is None:
         try:
-            print("Loading skill data from S3.")
-            response = s3_client.get_object(Bucket=CSV_BUCKET, Key=CSV_KEY)
-            content = response['Body'].read().decode('utf-8-sig').splitlines()
-            reader = csv.DictReader(content)
-            skill_data = [row['Skill'].lower() for row in reader if row.get('Skill')]
-            print(f"Loaded {len(skill_data)} skills.")
+            skill_index = load_index('skill', build_skill_index, s3_client)
+            print(f"Loaded {len(skill_index)} skills.")
         except Exception as e:
-            print(f"Error loading CSV: {e}")
-            skill_data = []
+            print(f"Error loading skill index: {e}")
+            skill_index = None
 
 
 @lru_cache(maxsize=1024)
 def get_suggestions(query):
-    return [ski for ski in skill_data if query in ski][:10]
+    return skill_index.search(query) if skill_index else []
 
 
 def lambda_handler(event, context):
@@ -0,0 +1,488 @@
+"""
+Shared autocomplete index for the city, skill, occupation and certification Lambdas.
+
+Package this file next to each handler. A query returns up to `limit` suggestions:
+entries whose text starts with the query first, then entries containing it anywhere,
+each group in popularity order (CSV order, or a numeric `popularity` column when the
+CSV has one).
+
+- Prefix hits come from a sorted array of the lower-cased entry texts (bisect).
+- Infix hits come from trigram posting lists; candidates from the shortest list are
+  checked with a substring test in popularity order, so the search stops after `limit`.
+- Queries of up to three characters are answered from a table computed at build time.
+- Indexes built with fuzzy=True (skills and occupations) fill any remaining places with
+  near-matches for mistyped words, SymSpell style: the indexed words are grouped by
+  their first nine letters and every group is stored under each string obtained by
+  deleting up to two letters from its first seven, so a query word only needs the same
+  deletions looked up and each group found checked once with a bounded edit distance.
+  Words are compared as prefixes, so a word that is still being typed matches as well.
+  Results rank by total edit distance, then popularity.
+
+The index is a single flat buffer: UTF-8 string tables plus uint32 offset/id arrays.
+build_suggestion_index.py writes it to <name>.idx ahead of time and load_index() maps
+that file into memory, so a cold start neither downloads nor parses the CSV and the
+data stays in the page cache instead of in per-row Python objects.
+"""
+import bisect
+import csv
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+DEFAULT_LIMIT = 10
+SHORT_QUERY_LENGTH = 3
+FUZZY_DISTANCE = 2
+FUZZY_PREFIX_LENGTH = 7
+# Query words shorter than this are only matched exactly; words of this length allow one edit
+FUZZY_MIN_LENGTH = 4
+POPULARITY_COLUMN = 'popularity'
+
+# CSV columns searched for each suggestion type; city entries return {'city', 'country'}
+SOURCES = {
+    'city': ('city', 'country'),
+    'skill': ('Skill',),
+    'occupation': ('Occupation',),
+    'certification': ('Certification',),
+}
+# Suggestion types whose indexes also return near-matches for typos
+FUZZY_KINDS = {'skill', 'occupation'}
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+TMP_DIR = '/tmp'
+
+MAGIC = b'SUGIDX02'
+SECTIONS = (
+    'values', 'value_offsets',  # JSON value of every entry
+    'texts', 'text_offsets', 'text_entries', 'entry_text_offsets',  # searchable texts, grouped by entry
+    'sorted_texts',  # text ids in byte order, for prefix search
+    'grams', 'gram_offsets', 'posting_offsets', 'postings',  # trigram -> entry ids
+    'shorts', 'short_offsets', 'short_id_offsets', 'short_ids',  # short query -> top entry ids
+    'words', 'word_offsets', 'word_entry_offsets', 'word_entries',  # fuzzy: word -> entry ids
+    'prefixes', 'prefix_offsets', 'prefix_word_offsets',  # fuzzy: word prefix -> range of word ids
+    'deletes', 'delete_offsets', 'delete_prefix_offsets', 'delete_prefixes',  # fuzzy: deletion -> prefix ids
+)
+BLOB_SECTIONS = {'values', 'texts', 'grams', 'shorts', 'words', 'prefixes', 'deletes'}
+HEADER = struct.Struct('<8sIIII')
+SECTION_ENTRY = struct.Struct('<QQ')
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def deletions(word, distance):
+    """word and every string made by deleting up to `distance` of its characters."""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        result |= frontier
+    return result
+
+
+def prefix_distances(query, texts, limit):
+    """
+    For each of texts, the fewest edits (insertions, deletions, substitutions and swaps of
+    adjacent letters) turning query into some prefix of it, or limit + 1 once that exceeds
+    limit. With texts sorted, the rows for the letters a text shares with the one before
+    it are reused, which is most of the work when the texts come from one vocabulary.
+    """
+    rows = [list(range(len(query) + 1))]  # rows[r][j]: distance between text[:r] and query[:j]
+    best = [len(query)]  # best[r]: smallest distance from the whole query to text[:r'], r' <= r
+    previous = ''
+    distances = []
+    for text in texts:
+        common = 0
+        shared = min(len(previous), len(text), len(rows) - 1)
+        while common < shared and previous[common] == text[common]:
+            common += 1
+        del rows[common + 1:], best[common + 1:]
+
+        r = common
+        # Once a whole row is over the limit every later row is too
+        while r < len(text) and min(rows[r]) <= limit:
+            letter = text[r]
+            above = rows[r]
+            # Cells more than `limit` columns off the diagonal are over the limit anyway
+            row = [r + 1] + [limit + 1] * len(query)
+            for j in range(max(1, r + 1 - limit), min(len(query), r + 1 + limit) + 1):
+                distance = above[j] + 1
+                if row[j - 1] + 1 < distance:
+                    distance = row[j - 1] + 1
+                if above[j - 1] + (letter != query[j - 1]) < distance:
+                    distance = above[j - 1] + (letter != query[j - 1])
+                if r and j > 1 and letter == query[j - 2] and text[r - 1] == query[j - 1] \
+                        and rows[r - 1][j - 2] + 1 < distance:
+                    distance = rows[r - 1][j - 2] + 1
+                row[j] = distance
+            rows.append(row)
+            best.append(min(best[r], row[-1]))
+            r += 1
+        distances.append(min(best[r], limit + 1))
+        previous = text
+    return distances
+
+
+def prefix_distance(query, text, limit):
+    return prefix_distances(query, [text], limit)[0]
+
+
+def rows_from_s3(s3_client, bucket, key, encoding='utf-8-sig'):
+    """Read a CSV object from S3 into a list of row dicts."""
+    response = s3_client.get_object(Bucket=bucket, Key=key)
+    return list(csv.DictReader(response['Body'].read().decode(encoding).splitlines()))
+
+
+def rows_from_file(path, encoding='utf-8-sig'):
+    with open(path, newline='', encoding=encoding) as f:
+        return list(csv.DictReader(f))
+
+
+def by_popularity(rows, column=POPULARITY_COLUMN):
+    """Most popular rows first when the CSV has a popularity column, otherwise CSV order."""
+    if rows and column in rows[0]:
+        return sorted(rows, key=lambda row: -float(row.get(column) or 0))
+    return rows
+
+
+def entries_from_rows(rows, kind):
+    """(search texts, value) pairs for SuggestionIndex.build, most popular first."""
+    columns = SOURCES[kind]
+    for row in by_popularity(rows):
+        if not all(row.get(column) for column in columns):
+            continue
+        if len(columns) == 1:
+            yield [row[columns[0]]], row[columns[0]].lower()
+        else:
+            yield [row[column] for column in columns], {column: row[column] for column in columns}
+
+
+def _string_table(strings):
+    blob = bytearray()
+    offsets = array('I', [0])
+    for string in strings:
+        blob += string
+        offsets.append(len(blob))
+    return bytes(blob), offsets
+
+
+def _postings_table(postings):
+    """Sorted string table of the posting keys, plus the offsets and ids of their lists."""
+    keys = sorted(postings)
+    blob, offsets = _string_table(keys)
+    ids = array('I')
+    id_offsets = array('I', [0])
+    for key in keys:
+        ids.extend(postings[key])
+        id_offsets.append(len(ids))
+    return blob, offsets, id_offsets, ids
+
+
+def _serialize(entries, limit, fuzzy):
+    values = []
+    texts = []
+    text_entries = array('I')
+    entry_text_offsets = array('I', [0])
+    postings = {}
+    short_prefix = {}
+    short_infix = {}
+    words = {}
+
+    def add_short(table, query, entry_id):
+        ids = table.setdefault(query, [])
+        if len(ids) < limit and (not ids or ids[-1] != entry_id):
+            ids.append(entry_id)
+
+    for entry_id, (entry_texts, value) in enumerate(entries):
+        values.append(json.dumps(value).encode('utf-8'))
+        for text in (text.lower() for text in entry_texts if text):
+            texts.append(text.encode('utf-8'))
+            text_entries.append(entry_id)
+            for gram in trigrams(text):
+                posting = postings.setdefault(gram.encode('utf-8'), array('I'))
+                # Ids only grow, so a repeat (city and country sharing a trigram) is the last one
+                if not posting or posting[-1] != entry_id:
+                    posting.append(entry_id)
+            for length in range(1, SHORT_QUERY_LENGTH + 1):
+                if len(text) >= length:
+                    add_short(short_prefix, text[:length], entry_id)
+                for start in range(len(text) - length + 1):
+                    add_short(short_infix, text[start:start + length], entry_id)
+            if fuzzy:
+                for word in text.split():
+                    if len(word) >= FUZZY_MIN_LENGTH - 1:
+                        posting = words.setdefault(word.encode('utf-8'), array('I'))
+                        if not posting or posting[-1] != entry_id:
+                            posting.append(entry_id)
+        entry_text_offsets.append(len(text_entries))
+
+    shorts = {}
+    for query in set(short_prefix) | set(short_infix):
+        # Prefix hits first, then infix hits, at most `limit` in total
+        merged = list(short_prefix.get(query, []))
+        merged += [entry_id for entry_id in short_infix.get(query, []) if entry_id not in merged]
+        shorts[query.encode('utf-8')] = merged[:limit]
+
+    sections = {}
+    sections['values'], sections['value_offsets'] = _string_table(values)
+    sections['texts'], sections['text_offsets'] = _string_table(texts)
+    sections['text_entries'] = text_entries
+    sections['entry_text_offsets'] = entry_text_offsets
+    sections['sorted_texts'] = array('I', sorted(range(len(texts)), key=texts.__getitem__))
+
+    (sections['grams'], sections['gram_offsets'],
+     sections['posting_offsets'], sections['postings']) = _postings_table(postings)
+    (sections['shorts'], sections['short_offsets'],
+     sections['short_id_offsets'], sections['short_ids']) = _postings_table(shorts)
+
+    # Words sharing a prefix are adjacent in the sorted word table, so a prefix owns a range of word ids
+    prefixes = []
+    prefix_word_offsets = array('I')
+    for word_id, word in enumerate(sorted(words)):
+        prefix = word.decode('utf-8')[:FUZZY_PREFIX_LENGTH + FUZZY_DISTANCE].encode('utf-8')
+        if not prefixes or prefixes[-1] != prefix:
+            prefixes.append(prefix)
+            prefix_word_offsets.append(word_id)
+    prefix_word_offsets.append(len(words))
+    deletes = {}
+    for prefix_id, prefix in enumerate(prefixes):
+        for variant in deletions(prefix.decode('utf-8')[:FUZZY_PREFIX_LENGTH], FUZZY_DISTANCE):
+            deletes.setdefault(variant.encode('utf-8'), array('I')).append(prefix_id)
+    (sections['words'], sections['word_offsets'],
+     sections['word_entry_offsets'], sections['word_entries']) = _postings_table(words)
+    sections['prefixes'], sections['prefix_offsets'] = _string_table(prefixes)
+    sections['prefix_word_offsets'] = prefix_word_offsets
+    (sections['deletes'], sections['delete_offsets'],
+     sections['delete_prefix_offsets'], sections['delete_prefixes']) = _postings_table(deletes)
+
+    # Header, section table, then every section aligned to 4 bytes so it can be cast to uint32
+    position = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+    table = []
+    payload = bytearray()
+    for name in SECTIONS:
+        data = sections[name]
+        data = data if isinstance(data, bytes) else data.tobytes()
+        payload += b'\0' * (-(position + len(payload)) % 4)
+        table.append(SECTION_ENTRY.pack(position + len(payload), len(data)))
+        payload += data
+    header = HEADER.pack(MAGIC, limit, SHORT_QUERY_LENGTH, FUZZY_DISTANCE if fuzzy else 0, FUZZY_PREFIX_LENGTH)
+    return header + b''.join(table) + bytes(payload)
+
+
+class SuggestionIndex:
+    def __init__(self, buffer):
+        """Wrap a serialized index held in bytes or an mmap; use build() or load() to get one."""
+        if sys.byteorder != 'little':
+            raise RuntimeError("Suggestion indexes are stored little-endian")
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a suggestion index of the current format")
+        _, self.limit, self.short_query_length, self.fuzzy_distance, self.fuzzy_prefix_length = \
+            HEADER.unpack_from(buffer, 0)
+
+        self._buffer = buffer
+        view = memoryview(buffer)
+        self._base = {}
+        for i, name in enumerate(SECTIONS):
+            start, length = SECTION_ENTRY.unpack_from(buffer, HEADER.size + i * SECTION_ENTRY.size)
+            if name in BLOB_SECTIONS:
+                self._base[name] = start
+            else:
+                setattr(self, '_' + name, view[start:start + length].cast('I'))
+
+    @classmethod
+    def build(cls, entries, limit=DEFAULT_LIMIT, fuzzy=False):
+        """
+        entries is an iterable of (search texts, value) pairs, most popular first; a query
+        matching any of an entry's texts returns its JSON-serializable value. With fuzzy,
+        texts within a couple of typos of the query are suggested too.
+        """
+        return cls(_serialize(entries, limit, fuzzy))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            # The mapping stays valid after the file is closed
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self._buffer)
+
+    def __len__(self):
+        return len(self._value_offsets) - 1
+
+    def _span(self, section, offsets, i):
+        base = self._base[section]
+        return base + offsets[i], base + offsets[i + 1]
+
+    def _string(self, section, offsets, i):
+        start, end = self._span(section, offsets, i)
+        return self._buffer[start:end]
+
+    def _find(self, section, offsets, key):
+        """Position of key in a sorted string table, or -1."""
+        count = len(offsets) - 1
+        i = bisect.bisect_left(range(count), key, key=lambda j: self._string(section, offsets, j))
+        if i < count and self._string(section, offsets, i) == key:
+            return i
+        return -1
+
+    def _value(self, entry_id):
+        return json.loads(self._string('values', self._value_offsets, entry_id))
+
+    def _prefix_ids(self, query):
+        def text_at(position):
+            return self._string('texts', self._text_offsets, self._sorted_texts[position])
+
+        positions = range(len(self._sorted_texts))
+        lo = bisect.bisect_left(positions, query, key=text_at)
+        # 0xff never occurs in UTF-8, so this sorts after every text starting with query
+        hi = bisect.bisect_left(positions, query + b'\xff', lo, key=text_at)
+        return heapq.nsmallest(self.limit, {self._text_entries[self._sorted_texts[p]] for p in range(lo, hi)})
+
+    def _infix_ids(self, query, exclude, needed):
+        postings = []
+        for gram in trigrams(query.decode('utf-8')):
+            i = self._find('grams', self._gram_offsets, gram.encode('utf-8'))
+            if i < 0:
+                return []
+            postings.append(self._postings[self._posting_offsets[i]:self._posting_offsets[i + 1]])
+
+        ids = []
+        for entry_id in min(postings, key=len):
+            if entry_id in exclude:
+                continue
+            # UTF-8 substring search on the raw bytes matches the same texts as str containment
+            for text_id in range(self._entry_text_offsets[entry_id], self._entry_text_offsets[entry_id + 1]):
+                start, end = self._span('texts', self._text_offsets, text_id)
+                if self._buffer.find(query, start, end) != -1:
+                    ids.append(entry_id)
+                    break
+            if len(ids) == needed:
+                break
+        return ids
+
+    def _entry_words(self, entry_id):
+        for text_id in range(self._entry_text_offsets[entry_id], self._entry_text_offsets[entry_id + 1]):
+            yield from self._string('texts', self._text_offsets, text_id).decode('utf-8').split()
+
+    def _fuzzy_entries(self, word):
+        """{entry id: edit distance} for the entries with a word close to `word`."""
+        matches = {}  # word id -> distance
+        if len(word) < FUZZY_MIN_LENGTH:
+            i = self._find('words', self._word_offsets, word.encode('utf-8'))
+            if i >= 0:
+                matches[i] = 0
+        else:
+            limit = self.fuzzy_distance if len(word) > FUZZY_MIN_LENGTH else 1
+            key = word[:self.fuzzy_prefix_length]
+            candidates = set()
+            for variant in deletions(key, limit):
+                i = self._find('deletes', self._delete_offsets, variant.encode('utf-8'))
+                if i >= 0:
+                    candidates.update(self._delete_prefixes[self._delete_prefix_offsets[i]:self._delete_prefix_offsets[i + 1]])
+            # Prefix ids follow the sorted prefix table, as prefix_distances wants
+            candidates = sorted(candidates)
+            prefixes = [self._string('prefixes', self._prefix_offsets, prefix_id).decode('utf-8')
+                        for prefix_id in candidates]
+            for prefix_id, distance in zip(candidates, prefix_distances(key, prefixes, limit)):
+                if distance <= limit:
+                    for word_id in range(self._prefix_word_offsets[prefix_id], self._prefix_word_offsets[prefix_id + 1]):
+                        matches[word_id] = distance
+        entries = {}
+        for word_id, distance in matches.items():
+            for entry_id in self._word_entries[self._word_entry_offsets[word_id]:self._word_entry_offsets[word_id + 1]]:
+                if distance < entries.get(entry_id, distance + 1):
+                    entries[entry_id] = distance
+        return entries
+
+    def _prefix_entries(self, prefix, most):
+        """Ids of the entries with a word starting with prefix, or None if that's more than `most` postings."""
+        encoded = prefix.encode('utf-8')
+        words = range(len(self._word_offsets) - 1)
+
+        def word_at(word_id):
+            return self._string('words', self._word_offsets, word_id)
+
+        lo = bisect.bisect_left(words, encoded, key=word_at)
+        hi = bisect.bisect_left(words, encoded + b'\xff', lo, key=word_at)
+        start, end = self._word_entry_offsets[lo], self._word_entry_offsets[hi]
+        return set(self._word_entries[start:end]) if end - start <= most else None
+
+    def _fuzzy_ids(self, query, exclude, needed):
+        *complete, last = query.split()
+        scores = self._fuzzy_entries(last)
+        if complete:
+            # Every complete word needs a close match; the last may also still be being typed
+            matched = [self._fuzzy_entries(word) for word in complete]
+            candidates = [entry_id for entry_id in min(matched, key=len)
+                          if entry_id not in exclude and all(entry_id in matches for matches in matched)]
+            typed = self._prefix_entries(last, len(candidates))
+            last_matches = scores
+            scores = {}
+            for entry_id in candidates:
+                if entry_id in last_matches:
+                    last_distance = last_matches[entry_id]
+                elif entry_id in typed if typed is not None else \
+                        any(word.startswith(last) for word in self._entry_words(entry_id)):
+                    last_distance = 0
+                else:
+                    continue
+                scores[entry_id] = sum(matches[entry_id] for matches in matched) + last_distance
+        candidates = (entry_id for entry_id in scores if entry_id not in exclude)
+        return heapq.nsmallest(needed, candidates, key=lambda entry_id: (scores[entry_id], entry_id))
+
+    def search(self, query):
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        encoded = query.encode('utf-8')
+        if len(query) <= self.short_query_length:
+            i = self._find('shorts', self._short_offsets, encoded)
+            ids = list(self._short_ids[self._short_id_offsets[i]:self._short_id_offsets[i + 1]]) if i >= 0 else []
+        else:
+            ids = self._prefix_ids(encoded)
+            if len(ids) < self.limit:
+                ids = ids + self._infix_ids(encoded, set(ids), self.limit - len(ids))
+            if len(ids) < self.limit and self.fuzzy_distance:
+                ids = ids + self._fuzzy_ids(query, set(ids), self.limit - len(ids))
+        return [self._value(entry_id) for entry_id in ids]
+
+
+def load_index(name, build, s3_client=None):
+    """
+    Return the index for one suggestion type, trying in order: <name>.idx packaged next
+    to this file, a copy already in /tmp, the object INDEX_PREFIX + <name>.idx in
+    INDEX_BUCKET downloaded to /tmp (when configured), and finally build(), which builds
+    it from the CSV as before.
+    """
+    filename = f"{name}.idx"
+    for path in (os.path.join(PACKAGE_DIR, filename), os.path.join(TMP_DIR, filename)):
+        if os.path.exists(path):
+            try:
+                index = SuggestionIndex.load(path)
+                print(f"Mapping prebuilt index {path}")
+                return index
+            except ValueError as e:
+                # Built by an older version of this file; rebuild it with build_suggestion_index.py
+                print(f"Skipping index {path}: {e}")
+
+    bucket = os.environ.get('INDEX_BUCKET')
+    if bucket and s3_client is not None:
+        path = os.path.join(TMP_DIR, filename)
+        key = os.environ.get('INDEX_PREFIX', '') + filename
+        try:
+            # Download under a temporary name so a partial file is never mapped
+            s3_client.download_file(bucket, key, path + '.part')
+            os.replace(path + '.part', path)
+            print(f"Mapping index s3://{bucket}/{key}")
+            return SuggestionIndex.load(path)
+        except Exception as e:
+            print(f"Error downloading index s3://{bucket}/{key}: {e}")
+
+    return build()
@@ -2,7 +2,9 @@ import os
 
 from src import create_app
 
-application = app = create_app()
+# Hashing processes started with spawn (see PasswordHasher) re-import this file as __mp_main__
+if __name__ != '__mp_main__':
+    application = app = create_app()
 
 if __name__ == '__main__':
     if os.getenv('FLASK_ENV') == 'production':
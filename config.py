@@ -1,5 +1,6 @@
 import os
 import json
+import tempfile
 import boto3
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
@@ -17,6 +18,105 @@ class Config:
     S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME', 'your-app-profile-pictures')
     S3_REGION = os.getenv('S3_REGION', 'ap-southeast-2')
 
+    # Local DynamoDB stand-in (e.g. http://localhost:8000); unset to use AWS
+    DYNAMODB_ENDPOINT_URL = os.getenv('DYNAMODB_ENDPOINT_URL') or None
+
+    # Session backend: 'dynamodb' (Sessions table) or 'signed_cookie' (stateless, see SignedCookieSessionManager)
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'dynamodb')
+    # Optional Fernet key; when set, signed session cookies are also encrypted
+    SESSION_ENCRYPTION_KEY = os.getenv('SESSION_ENCRYPTION_KEY')
+    SESSION_EPOCH_CACHE_TTL_SECONDS = int(os.getenv('SESSION_EPOCH_CACHE_TTL_SECONDS', '30'))
+
+    # Per-worker cache of session records and logged-in principals, see SessionCache; it polls for principals
+    # changed or revoked by other workers every SESSION_SYNC_POLL_SECONDS and is bypassed while polling has
+    # failed for SESSION_SYNC_STALE_SECONDS
+    SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', '10000'))
+    SESSION_CACHE_TTL_SECONDS = int(os.getenv('SESSION_CACHE_TTL_SECONDS', '30'))
+    SESSION_SYNC_POLL_SECONDS = float(os.getenv('SESSION_SYNC_POLL_SECONDS', '2'))
+    SESSION_SYNC_STALE_SECONDS = float(os.getenv('SESSION_SYNC_STALE_SECONDS', '30'))
+
+    # Parallel Segment/TotalSegments workers used for full-table DynamoDB scans
+    DYNAMODB_SCAN_SEGMENTS = int(os.getenv('DYNAMODB_SCAN_SEGMENTS', '4'))
+
+    # The worker's shared scan of the active jobs behind job search and recommendations, see ActiveJobs:
+    # reloaded in the background after the TTL (to pick up other workers' edits), after this worker's
+    # own job edits at most every MIN_RELOAD seconds, and no sooner than RETRY seconds after a failed scan
+    ACTIVE_JOBS_TTL_SECONDS = int(os.getenv('ACTIVE_JOBS_TTL_SECONDS', '300'))
+    ACTIVE_JOBS_MIN_RELOAD_SECONDS = int(os.getenv('ACTIVE_JOBS_MIN_RELOAD_SECONDS', '10'))
+    ACTIVE_JOBS_RETRY_SECONDS = int(os.getenv('ACTIVE_JOBS_RETRY_SECONDS', '30'))
+
+    # How long a worker trusts its user skill/certification/city postings before reloading them, see InvertedIndex,
+    # and how many matching candidates the job applications page lists
+    MATCHING_INDEX_TTL_SECONDS = int(os.getenv('MATCHING_INDEX_TTL_SECONDS', '600'))
+    MATCHING_CANDIDATES_LIMIT = int(os.getenv('MATCHING_CANDIDATES_LIMIT', '10'))
+
+    # Best matches shown on the dashboard and the recommended jobs page
+    RECOMMENDATIONS_PAGE_SIZE = int(os.getenv('RECOMMENDATIONS_PAGE_SIZE', '20'))
+
+    # Keyword index segment shared by the workers on a host, see scripts/build_job_text_index.py, and how many
+    # changed jobs a rebuild lets pile up in memory before writing it again
+    JOB_TEXT_INDEX_PATH = os.getenv('JOB_TEXT_INDEX_PATH', os.path.join(tempfile.gettempdir(), 'job_text_index.seg'))
+    JOB_TEXT_MERGE_MIN_CHANGES = int(os.getenv('JOB_TEXT_MERGE_MIN_CHANGES', '500'))
+
+    # Per-worker cache of Jobs items, see JobCatalogue; it polls for other workers' job edits every
+    # JOB_CATALOGUE_POLL_SECONDS and is bypassed while polling has failed for JOB_CATALOGUE_STALE_SECONDS
+    JOB_CATALOGUE_SIZE = int(os.getenv('JOB_CATALOGUE_SIZE', '20000'))
+    JOB_CATALOGUE_POLL_SECONDS = float(os.getenv('JOB_CATALOGUE_POLL_SECONDS', '5'))
+    JOB_CATALOGUE_STALE_SECONDS = float(os.getenv('JOB_CATALOGUE_STALE_SECONDS', '30'))
+
+    # Shared Messages poll behind the /messages/stream endpoints, see MessagePoller
+    MESSAGE_POLL_INTERVAL_SECONDS = float(os.getenv('MESSAGE_POLL_INTERVAL_SECONDS', '2'))
+    MESSAGE_STREAM_KEEPALIVE_SECONDS = float(os.getenv('MESSAGE_STREAM_KEEPALIVE_SECONDS', '15'))
+    # Messages shown per page when a chat is opened
+    CHAT_PAGE_SIZE = int(os.getenv('CHAT_PAGE_SIZE', '50'))
+
+    # Autocomplete backend: 'lambda' (API Gateway) or 'local' (in-process index, see SuggestionService)
+    SUGGESTIONS_BACKEND = os.getenv('SUGGESTIONS_BACKEND', 'lambda')
+    SUGGESTIONS_API_URL = os.getenv('SUGGESTIONS_API_URL', 'https://w6z5elzk0b.execute-api.ap-southeast-2.amazonaws.com')
+    # Connection pool and per-worker answer cache for the API Gateway backend
+    SUGGESTIONS_HTTP_POOL_SIZE = int(os.getenv('SUGGESTIONS_HTTP_POOL_SIZE', '20'))
+    SUGGESTIONS_CACHE_SIZE = int(os.getenv('SUGGESTIONS_CACHE_SIZE', '5000'))
+    SUGGESTIONS_CACHE_TTL_SECONDS = int(os.getenv('SUGGESTIONS_CACHE_TTL_SECONDS', '600'))
+    # How long browsers may reuse a suggestions response
+    SUGGESTIONS_BROWSER_CACHE_SECONDS = int(os.getenv('SUGGESTIONS_BROWSER_CACHE_SECONDS', '300'))
+    # Holds <kind>.idx from Lambda/build_suggestion_index.py, or the <kind>.csv to index at startup
+    SUGGESTION_INDEX_DIR = os.getenv('SUGGESTION_INDEX_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Lambda'))
+
+    # Refresh the cached Gmail token this long before it expires, see GoogleAuthService
+    GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv('GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS', '300'))
+
+    # Background email delivery, see EmailOutbox; EMAIL_TRANSPORT 'fake' keeps emails in memory instead of sending them
+    EMAIL_TRANSPORT = os.getenv('EMAIL_TRANSPORT', 'gmail')
+    EMAIL_OUTBOX_WORKERS = int(os.getenv('EMAIL_OUTBOX_WORKERS', '2'))
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '10'))
+    EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv('EMAIL_OUTBOX_POLL_SECONDS', '30'))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '6'))
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS = float(os.getenv('EMAIL_OUTBOX_RETRY_BASE_SECONDS', '30'))
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS = float(os.getenv('EMAIL_OUTBOX_RETRY_MAX_SECONDS', '3600'))
+    # Outbox rows (and the record of dead emails) are deleted by DynamoDB's time to live after this long
+    EMAIL_OUTBOX_RETENTION_HOURS = int(os.getenv('EMAIL_OUTBOX_RETENTION_HOURS', '72'))
+
+    # S3 uploads, see StorageService; files over the threshold go up in parts, S3_UPLOAD_CONCURRENCY at a time
+    S3_MULTIPART_THRESHOLD_MB = int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '8'))
+    S3_MULTIPART_CHUNK_MB = int(os.getenv('S3_MULTIPART_CHUNK_MB', '8'))
+    S3_UPLOAD_CONCURRENCY = int(os.getenv('S3_UPLOAD_CONCURRENCY', '4'))
+    # Connections the shared S3 client keeps open; covers several concurrent uploads' parts
+    S3_MAX_POOL_CONNECTIONS = int(os.getenv('S3_MAX_POOL_CONNECTIONS', '32'))
+    # Background threads deleting replaced and removed files
+    S3_DELETE_WORKERS = int(os.getenv('S3_DELETE_WORKERS', '2'))
+    # Opt in: browsers upload straight to S3 with presigned POSTs, which needs a CORS rule on the bucket (see README)
+    S3_DIRECT_UPLOADS = os.getenv('S3_DIRECT_UPLOADS', 'False') == 'True'
+    S3_PRESIGN_EXPIRES_SECONDS = int(os.getenv('S3_PRESIGN_EXPIRES_SECONDS', '300'))
+    MAX_PROFILE_PICTURE_MB = int(os.getenv('MAX_PROFILE_PICTURE_MB', '5'))
+    MAX_CERTIFICATION_MB = int(os.getenv('MAX_CERTIFICATION_MB', '20'))
+
+    # Password hashing, see PasswordHasher; stored hashes move to BCRYPT_ROUNDS on their next successful login
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    # Hashing processes per app worker (0 hashes on the request thread) and how many hashes may wait for one
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '16'))
+    PASSWORD_HASH_START_METHOD = os.getenv('PASSWORD_HASH_START_METHOD', 'spawn')
+
     # Load secrets from AWS SSM Parameter Store
     CLIENT_SECRET = None
     TOKEN = None
@@ -0,0 +1,69 @@
+# scripts/backfill_active_jobs.py
+#
+# Set active_partition on jobs saved before the active-date_posted-index existed,
+# so they show up on the paginated job board, and add jobs saved before the
+# last_modified-index existed to the JobCatalogue change feed:
+#
+#   python scripts/provision_dynamodb.py --tables Jobs
+#   python scripts/backfill_active_jobs.py
+#
+# Active jobs get active_partition = 'active'; inactive ones have it removed. Jobs
+# without a change_partition get one, with last_modified set to now.
+# Re-running the script only touches jobs that are still out of step.
+
+import argparse
+import os
+import sys
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.models.job_model import Job  # noqa: E402
+from src.services.job_catalogue import JobCatalogue  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add jobs to the active-date_posted-index and last_modified-index.")
+    parser.add_argument('--endpoint-url', default=os.getenv('DYNAMODB_ENDPOINT_URL'))
+    parser.add_argument('--region', default=os.getenv('AWS_DEFAULT_REGION', 'ap-southeast-2'))
+    parser.add_argument('--dry-run', action='store_true', help="Count the jobs without updating them")
+    args = parser.parse_args()
+
+    table = boto3.resource('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url).Table('Jobs')
+
+    scan_kwargs = {'ProjectionExpression': 'job_id, is_active, active_partition, change_partition'}
+    updated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            active = item.get('is_active', True)
+            set_clauses, remove_clauses, values = [], [], {}
+            if (item.get('active_partition') == Job.ACTIVE_PARTITION) != bool(active):
+                if active:
+                    set_clauses.append('active_partition = :p')
+                    values[':p'] = Job.ACTIVE_PARTITION
+                else:
+                    remove_clauses.append('active_partition')
+            if item.get('change_partition') != JobCatalogue.CHANGE_PARTITION:
+                set_clauses.append('change_partition = :c, last_modified = :m')
+                values.update({':c': JobCatalogue.CHANGE_PARTITION, ':m': JobCatalogue.now()})
+            if not set_clauses and not remove_clauses:
+                continue
+            if not args.dry_run:
+                update_expression = ' '.join(clause for clause in (
+                    'SET ' + ', '.join(set_clauses) if set_clauses else '',
+                    'REMOVE ' + ', '.join(remove_clauses) if remove_clauses else '') if clause)
+                update_kwargs = {'ExpressionAttributeValues': values} if values else {}
+                table.update_item(Key={'job_id': item['job_id']}, UpdateExpression=update_expression, **update_kwargs)
+            updated += 1
+        if not response.get('LastEvaluatedKey'):
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    action = "Would update" if args.dry_run else "Updated"
+    print(f"{action} {updated} job(s)")
+
+
+if __name__ == '__main__':
+    main()
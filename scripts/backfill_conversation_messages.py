@@ -0,0 +1,56 @@
+# scripts/backfill_conversation_messages.py
+#
+# Copy messages from the legacy Messages table (keyed by message_id) into
+# ConversationMessages, which is partitioned by conversation and sorted by time:
+#
+#   python scripts/provision_dynamodb.py --tables ConversationMessages
+#   python scripts/backfill_conversation_messages.py
+#
+# Items are written with the same conversation_id/message_key the app uses, so
+# re-running the script just overwrites what it copied before. Messages sent
+# while it runs already go to the new table.
+
+import argparse
+import os
+import sys
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.models.message_model import Message  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy Messages into the conversation-keyed message table.")
+    parser.add_argument('--endpoint-url', default=os.getenv('DYNAMODB_ENDPOINT_URL'))
+    parser.add_argument('--region', default=os.getenv('AWS_DEFAULT_REGION', 'ap-southeast-2'))
+    parser.add_argument('--source-table', default='Messages')
+    parser.add_argument('--dry-run', action='store_true', help="Count the messages without writing them")
+    args = parser.parse_args()
+
+    resource = boto3.resource('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+    source = resource.Table(args.source_table)
+    target = resource.Table(Message.TABLE)
+
+    scan_kwargs = {}
+    copied = 0
+    # batch_writer groups puts into BatchWriteItem calls and resends unprocessed items
+    with target.batch_writer() as batch:
+        while True:
+            response = source.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                message = Message(**item)
+                if not args.dry_run:
+                    batch.put_item(Item=message.to_dict())
+                copied += 1
+            if not response.get('LastEvaluatedKey'):
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    action = "Found" if args.dry_run else "Copied"
+    print(f"{action} {copied} message(s) from {args.source_table} to {Message.TABLE}")
+
+
+if __name__ == '__main__':
+    main()
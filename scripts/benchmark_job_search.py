@@ -0,0 +1,103 @@
+# scripts/benchmark_job_search.py
+#
+# Time JobSearchIndex on synthetic jobs, to check searches stay in the milliseconds
+# as the board grows:
+#
+#   python scripts/benchmark_job_search.py
+#   python scripts/benchmark_job_search.py --jobs 100000 --queries 500
+#
+# Prints the build time, then mean and p95 latency of filtered, sorted and paged
+# searches (facet counts included) and of applying job updates.
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.services.job_search_service import JobSearchIndex  # noqa: E402
+
+CITIES = [(f"City {i}", f"Country {i % 40}") for i in range(2000)]
+SKILLS = [f"Skill {i}" for i in range(3000)]
+
+
+def synthetic_job(rng, i, now):
+    city, country = rng.choice(CITIES[:rng.choice((20, 200, 2000))])
+    return {
+        'job_id': f"job-{i}",
+        'city': city,
+        'country': country,
+        'salary': rng.randrange(30000, 250000, 500),
+        'date_posted': (now - timedelta(seconds=rng.randrange(0, 365 * 86400))).isoformat(),
+        # Popular skills come up far more often, as on a real board
+        'skills': list({SKILLS[int(rng.paretovariate(1.2)) % len(SKILLS)] for _ in range(rng.randint(1, 8))}),
+        'is_active': True,
+    }
+
+
+def random_query(rng):
+    query = {'sort': rng.choice(JobSearchIndex.SORTS), 'offset': rng.choice((0, 0, 0, 10, 50)), 'limit': 10}
+    if rng.random() < 0.5:
+        query['city'] = rng.choice(CITIES[:50])[0]
+    if rng.random() < 0.3:
+        query['country'] = rng.choice(CITIES)[1]
+    if rng.random() < 0.5:
+        query['skills'] = [SKILLS[int(rng.paretovariate(1.2)) % 50] for _ in range(rng.randint(1, 2))]
+    if rng.random() < 0.4:
+        query['salary_min'] = rng.choice((50000, 75000, 100000))
+    if rng.random() < 0.3:
+        query['posted_within_days'] = rng.choice(JobSearchIndex.POSTED_DAYS)
+    return query
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28}{statistics.mean(timings) * 1000:>10.2f}{p95 * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory job search index.")
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--updates', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    jobs = [synthetic_job(rng, i, now) for i in range(args.jobs)]
+
+    start = time.perf_counter()
+    index = JobSearchIndex()
+    for job in jobs:
+        index.apply(job['job_id'], job)
+    print(f"Indexed {len(index)} jobs in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'':<28}{'mean ms':>10}{'p95 ms':>10}")
+    report("search, no filters", [timed(index.search, sort='newest') for _ in range(args.queries)])
+    report("search, random filters", [timed(index.search, **random_query(rng)) for _ in range(args.queries)])
+
+    updates = []
+    for _ in range(args.updates):
+        job = rng.choice(jobs)
+        change = rng.choice(({'salary': rng.randrange(30000, 250000, 500)},
+                             {'skills': synthetic_job(rng, 0, now)['skills']},
+                             None,
+                             job))
+        updates.append(timed(index.apply, job['job_id'], change))
+    report("apply update/delete/create", updates)
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# scripts/benchmark_job_text_search.py
+#
+# Time the job keyword index (FullTextIndex) on synthetic job ads:
+#
+#   python scripts/benchmark_job_text_search.py
+#   python scripts/benchmark_job_text_search.py --jobs 100000 --queries 500
+#
+# Prints how long analyzing every job takes (a worker's first search without a segment
+# file), writing and loading the segment file (its first search with one), then mean and
+# p95 latency of keyword, phrase and half-typed searches and of indexing edited jobs.
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.services.full_text_index import FullTextIndex, Segment  # noqa: E402
+from src.services.job_search_service import JobSearchService  # noqa: E402
+
+TITLES = ['Software Engineer', 'Data Analyst', 'Registered Nurse', 'Sales Manager', 'Electrician', 'Teacher',
+          'Accountant', 'Project Manager', 'DevOps Engineer', 'Graphic Designer', 'Chef', 'Mechanic']
+LEVELS = ['Junior', 'Senior', 'Lead', 'Graduate', 'Principal', '']
+WORDS = ("python java react kubernetes aws docker sql excel customer service leadership communication team "
+         "stakeholders reporting budgets patients scheduling training safety compliance design marketing "
+         "negotiation analytics machine learning cloud infrastructure testing agile scrum accounting payroll "
+         "logistics warehouse inventory maintenance electrical plumbing cooking menus hospitality retail").split()
+
+
+def synthetic_job(rng, i):
+    def text(words):
+        # Common words come up far more often, as in real ads
+        return ' '.join(WORDS[int(rng.paretovariate(0.8)) % len(WORDS)] for _ in range(words))
+    return {
+        'job_id': f"job-{i}",
+        'job_title': f"{rng.choice(LEVELS)} {rng.choice(TITLES)}".strip(),
+        'description': f"We are looking for an experienced {text(3)} to join our team. {text(rng.randint(60, 250))}",
+        'requirements': f"{rng.randint(1, 10)}+ years of {text(2)}. {text(rng.randint(10, 50))}",
+    }
+
+
+def random_query(rng):
+    kind = rng.choice(('words', 'words', 'phrase', 'prefix'))
+    if kind == 'phrase':
+        return f'"{rng.choice(TITLES)}" {rng.choice(WORDS)}'
+    words = rng.sample(WORDS[:20], rng.randint(1, 3))
+    if kind == 'prefix':
+        return ' '.join(words[:-1] + [words[-1][:rng.randint(2, 4)]])
+    return ' '.join(words) + ' '
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28}{statistics.mean(timings) * 1000:>10.2f}{p95 * 1000:>10.2f}")
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the job keyword search index.")
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--updates', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    jobs = [synthetic_job(rng, i) for i in range(args.jobs)]
+
+    start = time.perf_counter()
+    index = FullTextIndex(JobSearchService.TEXT_FIELDS)
+    for job in jobs:
+        index.apply(job['job_id'], job)
+    print(f"Analyzed {len(index)} jobs in {time.perf_counter() - start:.2f}s")
+
+    path = os.path.join(tempfile.mkdtemp(), 'job_text_index.seg')
+    start = time.perf_counter()
+    index.merged().save(path)
+    print(f"Wrote the segment ({os.path.getsize(path) / 1024 / 1024:.1f}MB) in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    index = FullTextIndex(JobSearchService.TEXT_FIELDS, Segment.load(path))
+    for job in jobs:
+        index.apply(job['job_id'], job)
+    print(f"Loaded it and checked every job against it in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'':<28}{'mean ms':>10}{'p95 ms':>10}")
+    report("search", [timed(index.search, random_query(rng)) for _ in range(args.queries)])
+    updates = []
+    for _ in range(args.updates):
+        job = dict(rng.choice(jobs), description=synthetic_job(rng, 0)['description'])
+        updates.append(timed(index.apply, job['job_id'], job))
+    report("index an edited job", updates)
+    report("search with edits pending", [timed(index.search, random_query(rng)) for _ in range(args.queries)])
+    start = time.perf_counter()
+    index.merged()
+    print(f"Merged {index.delta_size} edits into a new segment in {time.perf_counter() - start:.2f}s")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
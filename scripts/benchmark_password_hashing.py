@@ -0,0 +1,75 @@
+# scripts/benchmark_password_hashing.py
+#
+# Measure bcrypt cost per login to size PASSWORD_HASH_WORKERS, BCRYPT_ROUNDS and the
+# number of app instances:
+#
+#   python scripts/benchmark_password_hashing.py
+#   python scripts/benchmark_password_hashing.py --rounds 10 12 --workers 1 2 4 --logins 64
+#
+# For every cost it prints the time of one bcrypt.checkpw (the CPU a login spends in
+# bcrypt) and the logins per second one core can verify, then the logins per second
+# reached when that many checks are run on a process pool like PasswordHasher's, or on
+# plain threads for comparison. Only bcrypt is needed, not the app's configuration.
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+
+PASSWORD = b'Correct-Horse-Battery-9'
+
+
+def single_check_seconds(hashed, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        bcrypt.checkpw(PASSWORD, hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def throughput(executor, hashed, logins):
+    # One untimed round starts the pool's processes
+    list(executor.map(bcrypt.checkpw, [PASSWORD] * executor._max_workers, [hashed] * executor._max_workers))
+    start = time.perf_counter()
+    results = list(executor.map(bcrypt.checkpw, [PASSWORD] * logins, [hashed] * logins))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bcrypt login verification.")
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument('--logins', type=int, default=32, help="Checks per throughput measurement")
+    parser.add_argument('--repeats', type=int, default=5, help="Single checks timed per cost")
+    parser.add_argument('--start-method', default='spawn', help="Same as PASSWORD_HASH_START_METHOD")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, bcrypt {bcrypt.__version__}")
+    print(f"{'rounds':>6}{'ms/login':>10}{'logins/s/core':>15}")
+    hashes = {}
+    for rounds in args.rounds:
+        hashes[rounds] = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds=rounds))
+        seconds = single_check_seconds(hashes[rounds], args.repeats)
+        print(f"{rounds:>6}{seconds * 1000:>10.1f}{1 / seconds:>15.1f}")
+
+    context = multiprocessing.get_context(args.start_method)
+    print(f"\nlogins/s for {args.logins} concurrent logins")
+    print(f"{'rounds':>6}{'workers':>8}{'processes':>11}{'threads':>9}")
+    for rounds in args.rounds:
+        for workers in args.workers:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                processes = throughput(pool, hashes[rounds], args.logins)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                threads = throughput(pool, hashes[rounds], args.logins)
+            print(f"{rounds:>6}{workers:>8}{processes:>11.1f}{threads:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# scripts/benchmark_recommendations.py
+#
+# Time RecommendationEngine on synthetic jobs and users:
+#
+#   python scripts/benchmark_recommendations.py
+#   python scripts/benchmark_recommendations.py --jobs 100000 --users 500 --limit 20
+#
+# Prints how long building the engine takes (what a worker does after a scan of the
+# active jobs), then mean and p95 latency of scoring one user against every job, with
+# and without a limit. The dashboard asks for RECOMMENDATIONS_PAGE_SIZE jobs.
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.services.recommendation_service import RecommendationEngine  # noqa: E402
+
+SKILLS = [f"skill {i}" for i in range(2000)]
+CERTIFICATIONS = [f"certification {i}" for i in range(300)]
+CITIES = [f"city {i}" for i in range(500)]
+TITLES = [f"title {i}" for i in range(1000)]
+
+
+def pick(rng, values, count):
+    # Popular values come up far more often, as in real profiles and ads
+    return list({values[int(rng.paretovariate(0.7)) % len(values)] for _ in range(count)})
+
+
+def synthetic_job(rng, i):
+    return SimpleNamespace(
+        job_id=f"job-{i}",
+        job_title=pick(rng, TITLES, 1)[0],
+        skills=pick(rng, SKILLS, rng.randint(2, 10)),
+        certifications=pick(rng, CERTIFICATIONS, rng.randint(0, 3)),
+        city=pick(rng, CITIES, 1)[0],
+        date_posted=f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00",
+    )
+
+
+def synthetic_user(rng):
+    return SimpleNamespace(
+        skills=[{'skill': skill} for skill in pick(rng, SKILLS, rng.randint(3, 15))],
+        certifications=[{'type': cert} for cert in pick(rng, CERTIFICATIONS, rng.randint(0, 4))],
+        work_history=[{'job_title': title} for title in pick(rng, TITLES, rng.randint(0, 3))],
+        city=pick(rng, CITIES, 1)[0],
+        country='Australia',
+    )
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28}{statistics.mean(timings) * 1000:>10.2f}{p95 * 1000:>10.2f}")
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized job recommendation engine.")
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    jobs = [synthetic_job(rng, i) for i in range(args.jobs)]
+    users = [synthetic_user(rng) for _ in range(args.users)]
+
+    start = time.perf_counter()
+    engine = RecommendationEngine(jobs)
+    print(f"Built the engine over {len(jobs)} jobs in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'':<28}{'mean ms':>10}{'p95 ms':>10}")
+    report(f"recommend, limit {args.limit}", [timed(engine.recommend, user, limit=args.limit) for user in users])
+    report("recommend, no limit", [timed(engine.recommend, user) for user in users])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# scripts/build_job_text_index.py
+#
+# Write the keyword search segment of the active jobs, so app workers start from it
+# instead of analyzing every job's text on their first search:
+#
+#   python scripts/build_job_text_index.py
+#   python scripts/build_job_text_index.py --output /var/app/job_text_index.seg
+#
+# Run it on each app host during a deploy (or point JOB_TEXT_INDEX_PATH at the output).
+# Workers keep the file up to date themselves afterwards; a stale file only costs them
+# analyzing the jobs that changed since it was written.
+
+import argparse
+import os
+import sys
+import time
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import Config  # noqa: E402
+from src.services.full_text_index import FullTextIndex  # noqa: E402
+from src.services.job_search_service import JobSearchService  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the job keyword search segment file.")
+    parser.add_argument('--output', default=Config.JOB_TEXT_INDEX_PATH)
+    parser.add_argument('--endpoint-url', default=os.getenv('DYNAMODB_ENDPOINT_URL'))
+    parser.add_argument('--region', default=os.getenv('AWS_DEFAULT_REGION', 'ap-southeast-2'))
+    args = parser.parse_args()
+
+    table = boto3.resource('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url).Table('Jobs')
+
+    attributes = ['job_id'] + [attribute for attribute, _ in JobSearchService.TEXT_FIELDS]
+    scan_kwargs = {
+        'FilterExpression': Attr('is_active').eq(True),
+        'ProjectionExpression': ', '.join(f"#a{i}" for i in range(len(attributes))),
+        'ExpressionAttributeNames': {f"#a{i}": attribute for i, attribute in enumerate(attributes)},
+    }
+    start = time.perf_counter()
+    index = FullTextIndex(JobSearchService.TEXT_FIELDS)
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            index.apply(item['job_id'], item)
+        if not response.get('LastEvaluatedKey'):
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    segment = index.merged()
+    segment.save(args.output)
+    print(f"Indexed {len(segment)} jobs ({len(segment.terms)} terms) into {args.output} "
+          f"({os.path.getsize(args.output) / 1024 / 1024:.1f}MB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
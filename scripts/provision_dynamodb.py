@@ -0,0 +1,161 @@
+# scripts/provision_dynamodb.py
+#
+# Create the DynamoDB tables and global secondary indexes declared in
+# src/services/index_catalogue.py. Meant for a local DynamoDB stand-in:
+#
+#   docker run -p 8000:8000 amazon/dynamodb-local
+#   python scripts/provision_dynamodb.py --endpoint-url http://localhost:8000
+#
+# Existing tables are kept; only missing indexes (and time to live settings) are added to them.
+# --strip-null-keys removes index key attributes stored as NULL by older code,
+# which DynamoDB would otherwise reject on the next write to those items.
+
+import argparse
+import os
+import sys
+import time
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.services.index_catalogue import TABLES, attribute_type, index_key_attributes  # noqa: E402
+
+
+def key_schema(key):
+    schema = [{'AttributeName': key['hash'], 'KeyType': 'HASH'}]
+    if key.get('range'):
+        schema.append({'AttributeName': key['range'], 'KeyType': 'RANGE'})
+    return schema
+
+
+def attribute_definitions(*keys):
+    names = []
+    for key in keys:
+        for name in (key.get('hash'), key.get('range')):
+            if name and name not in names:
+                names.append(name)
+    return [{'AttributeName': name, 'AttributeType': attribute_type(name)} for name in names]
+
+
+def gsi_definition(index_name, index):
+    return {
+        'IndexName': index_name,
+        'KeySchema': key_schema(index),
+        'Projection': {'ProjectionType': index.get('projection', 'ALL')}
+    }
+
+
+def wait_until_active(client, table_name):
+    while True:
+        table = client.describe_table(TableName=table_name)['Table']
+        statuses = [table['TableStatus']] + [index['IndexStatus'] for index in table.get('GlobalSecondaryIndexes', [])]
+        if all(status == 'ACTIVE' for status in statuses):
+            return table
+        time.sleep(1)
+
+
+def create_table(client, table_name, definition):
+    indexes = definition['indexes']
+    params = {
+        'TableName': table_name,
+        'KeySchema': key_schema(definition['key']),
+        'AttributeDefinitions': attribute_definitions(definition['key'], *indexes.values()),
+        'BillingMode': 'PAY_PER_REQUEST'
+    }
+    if indexes:
+        params['GlobalSecondaryIndexes'] = [gsi_definition(name, index) for name, index in indexes.items()]
+    client.create_table(**params)
+    print(f"Created table {table_name} with {len(indexes)} index(es)")
+    wait_until_active(client, table_name)
+
+
+def add_missing_indexes(client, table_name, definition):
+    table = wait_until_active(client, table_name)
+    existing = {index['IndexName'] for index in table.get('GlobalSecondaryIndexes', [])}
+
+    for index_name, index in definition['indexes'].items():
+        if index_name in existing:
+            continue
+        # DynamoDB only accepts one index creation per UpdateTable call
+        client.update_table(
+            TableName=table_name,
+            AttributeDefinitions=attribute_definitions(index),
+            GlobalSecondaryIndexUpdates=[{'Create': gsi_definition(index_name, index)}]
+        )
+        print(f"Adding index {index_name} to {table_name}")
+        wait_until_active(client, table_name)
+
+
+def enable_ttl(client, table_name, definition):
+    attribute = definition.get('ttl')
+    if not attribute:
+        return
+    current = client.describe_time_to_live(TableName=table_name)['TimeToLiveDescription']
+    if current.get('TimeToLiveStatus') in ('ENABLED', 'ENABLING'):
+        return
+    client.update_time_to_live(
+        TableName=table_name,
+        TimeToLiveSpecification={'Enabled': True, 'AttributeName': attribute}
+    )
+    print(f"Enabled time to live on {table_name}.{attribute}")
+
+
+def strip_null_keys(resource, table_name, definition):
+    attributes = sorted(index_key_attributes(table_name))
+    if not attributes:
+        return
+    key_names = [name for name in (definition['key'].get('hash'), definition['key'].get('range')) if name]
+    table = resource.Table(table_name)
+
+    scan_kwargs = {}
+    cleaned = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            null_attributes = [name for name in attributes if name in item and item[name] is None]
+            if null_attributes:
+                table.update_item(
+                    Key={name: item[name] for name in key_names},
+                    UpdateExpression="REMOVE " + ", ".join(f"#a{i}" for i in range(len(null_attributes))),
+                    ExpressionAttributeNames={f"#a{i}": name for i, name in enumerate(null_attributes)}
+                )
+                cleaned += 1
+        if not response.get('LastEvaluatedKey'):
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"Removed NULL index keys from {cleaned} item(s) in {table_name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the DynamoDB tables and indexes used by the app.")
+    parser.add_argument('--endpoint-url', default=os.getenv('DYNAMODB_ENDPOINT_URL', 'http://localhost:8000'))
+    parser.add_argument('--region', default=os.getenv('AWS_DEFAULT_REGION', 'ap-southeast-2'))
+    parser.add_argument('--tables', nargs='*', default=list(TABLES), help="Only provision these tables")
+    parser.add_argument('--strip-null-keys', action='store_true',
+                        help="Remove NULL index key attributes left by older writes")
+    args = parser.parse_args()
+
+    # DynamoDB Local accepts any credentials, but boto3 still wants some
+    session = boto3.session.Session(
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'local'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'local'),
+        region_name=args.region
+    )
+    client = session.client('dynamodb', endpoint_url=args.endpoint_url)
+    resource = session.resource('dynamodb', endpoint_url=args.endpoint_url)
+    existing_tables = set(client.list_tables().get('TableNames', []))
+
+    for table_name in args.tables:
+        definition = TABLES[table_name]
+        if table_name in existing_tables:
+            if args.strip_null_keys:
+                strip_null_keys(resource, table_name, definition)
+            add_missing_indexes(client, table_name, definition)
+        else:
+            create_table(client, table_name, definition)
+        enable_ttl(client, table_name, definition)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# scripts/rebuild_conversation_summaries.py
+#
+# Recompute the ConversationSummaries table (inbox rows and unread counts) from
+# ConversationMessages. Run it once after backfill_conversation_messages.py, or
+# whenever the counters need to be brought back in line with the messages:
+#
+#   python scripts/provision_dynamodb.py --tables ConversationSummaries
+#   python scripts/rebuild_conversation_summaries.py
+#
+# Every summary row is overwritten, so messages sent while it runs may leave
+# their conversation one message behind until the next message or read.
+
+import argparse
+import os
+import sys
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.models.conversation_summary_model import ConversationSummary  # noqa: E402
+from src.models.message_model import Message  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild conversation summaries from the stored messages.")
+    parser.add_argument('--endpoint-url', default=os.getenv('DYNAMODB_ENDPOINT_URL'))
+    parser.add_argument('--region', default=os.getenv('AWS_DEFAULT_REGION', 'ap-southeast-2'))
+    args = parser.parse_args()
+
+    resource = boto3.resource('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+    messages = resource.Table(Message.TABLE)
+
+    summaries = {}  # (participant_id, conversation_id) -> ConversationSummary
+    latest_keys = {}
+    totals = {}
+    scan_kwargs = {}
+    while True:
+        response = messages.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            message = Message(**item)
+            for participant_id, other_id in ((message.sender_id, message.receiver_id),
+                                             (message.receiver_id, message.sender_id)):
+                key = (participant_id, message.conversation_id)
+                summary = summaries.setdefault(key, ConversationSummary(participant_id, message.conversation_id,
+                                                                        other_participant_id=other_id,
+                                                                        job_id=message.job_id))
+                if message.message_key > latest_keys.get(key, ''):
+                    latest_keys[key] = message.message_key
+                    summary.last_message_id = message.message_id
+                    summary.last_content = message.content
+                    summary.last_timestamp = message.timestamp
+                    summary.last_sender_id = message.sender_id
+                    summary.last_sender_type = message.sender_type
+            if not message.is_read:
+                summaries[(message.receiver_id, message.conversation_id)].unread_count += 1
+                totals[message.receiver_id] = totals.get(message.receiver_id, 0) + 1
+        if not response.get('LastEvaluatedKey'):
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    with resource.Table(ConversationSummary.TABLE).batch_writer() as batch:
+        for summary in summaries.values():
+            batch.put_item(Item=summary.to_dict())
+        for participant_id in {participant_id for participant_id, _ in summaries}:
+            batch.put_item(Item={
+                'participant_id': participant_id,
+                'conversation_id': ConversationSummary.TOTAL_ID,
+                'unread_count': totals.get(participant_id, 0)
+            })
+
+    print(f"Wrote {len(summaries)} conversation summaries")
+
+
+if __name__ == '__main__':
+    main()
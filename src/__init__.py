@@ -6,9 +6,10 @@ from google_auth_oauthlib.flow import Flow
 from config import Config
 import os
 
-from src.controllers.index_controller import get_user
-from src.services import SessionManager
-from src.models.message_model import Message
+from src.controllers.index_controller import load_principal
+from src.services import SessionManager, SessionCache, EmailOutbox
+from src.services.suggestion_service import SuggestionService
+from src.models.conversation_summary_model import ConversationSummary
 
 from src.views import index_bp, landing_bp, user_bp, employer_bp, admin_bp
 # from .services.google_auth_service import GoogleAuthService
@@ -42,37 +43,60 @@ def create_app(config_class=Config):
     # Middleware to load session
     @app.before_request
     def load_session():
+        g.user = None
+        g.user_type = None
+
+        # Static files never need the logged-in user
+        if request.endpoint == 'static':
+            return
+
         session_id = request.cookies.get('session_id')
-        if session_id:
+        if not session_id:
+            return
+        session = SessionCache.get(session_id)
+        cached = session is not None
+        if not cached:
             session = SessionManager.get_session(session_id)
-            if session:
-                user_id = session.get('user_id')
-                user_type = session.get('user_type')
-                user = get_user(user_id, user_type)
-                if user:
-                    g.user = user
-                    g.user_type = user_type
-                    print(f"Session loaded for {user_type}: {user_id}")
-                else:
-                    g.user = None
-                    g.user_type = None
-                    print(f"User not found for session: {user_id}, {user_type}")
-            else:
-                g.user = None
-                g.user_type = None
-                print("No valid session found")  # Debug log
-        else:
-            g.user = None
-            g.user_type = None
-            print("No session ID in cookie")  # Debug log
+        if not session:
+            return
+
+        user_id = session.get('user_id')
+        user_type = session.get('user_type')
+        # Requests that may write read the principal fresh, so they never save over a newer copy
+        fresh = request.method not in ('GET', 'HEAD')
+        principal = load_principal(user_id, user_type, fresh=fresh)
+        if principal is not None and not fresh and session.get('epoch', 0) > principal[1]:
+            # Issued by another worker after our cached copy was read
+            principal = load_principal(user_id, user_type, fresh=True)
+        if principal is None:
+            return
+        user, epoch = principal
+        if 'epoch' in session and session['epoch'] != epoch:
+            # Logged out, logged in again or revoked since this session was issued
+            SessionCache.invalidate_session(session_id)
+            return
+        if not cached and 'epoch' in session:
+            SessionCache.put(session_id, session)
+        if user:
+            g.user = user
+            g.user_type = user_type
 
     @app.context_processor
     def inject_unread_message_count():
+        # A single keyed read of the participant's '#total' summary row
         if g.user and g.user_type == 'employer':
-            unread_count = Message.get_unread_count(g.user.employer_id, 'employer')
-            return {'unread_message_count': unread_count}
+            return {'unread_message_count': ConversationSummary.get_unread_total(g.user.employer_id)}
+        if g.user and g.user_type == 'user':
+            return {'unread_message_count': ConversationSummary.get_unread_total(g.user.user_id)}
         return {}
 
+    # Deliver emails left in the outbox by an earlier run
+    EmailOutbox.start()
+
+    # Map or build the autocomplete indexes before the first keystroke arrives
+    if config_class.SUGGESTIONS_BACKEND == 'local':
+        SuggestionService.preload()
+
     # Set environment variable for OAuth
     os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = str(app.config.get('OAUTHLIB_INSECURE_TRANSPORT', '1'))
 
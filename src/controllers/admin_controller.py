@@ -7,8 +7,9 @@ from ..models.admin_model import Admin
 from ..models.user_model import User
 from ..models.employer_model import Employer
 from ..services.email_service import send_reset_email
+from ..services.password_service import PasswordHasher
+from ..services.session_service import SessionManager
 from ..models.audit_log_model import AuditLog
-import bcrypt
 import datetime
 
 class AdminController:
@@ -20,8 +21,10 @@ class AdminController:
                 return None, "This account has been deactivated. Please contact support for assistance."
             if admin.account_locked:
                 return None, "Account is locked. Please use the 'Forgot Password' option to unlock your account."
-            if bcrypt.checkpw(password.encode('utf-8'), admin.password.encode('utf-8')):
+            if PasswordHasher.verify(password, admin.password):
                 admin.reset_failed_attempts()
+                if PasswordHasher.needs_rehash(admin.password):
+                    PasswordHasher.rehash_in_background(password, admin.rehash_password)
                 return admin, None
             else:
                 admin.increment_failed_attempts()
@@ -42,7 +45,7 @@ class AdminController:
             return False, "An admin with this email already exists."
 
         # Hash the password
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = PasswordHasher.hash(password)
 
         # Create a new Admin instance
         new_admin = Admin(
@@ -81,7 +84,7 @@ class AdminController:
                     return False, message, False
 
                 was_locked = admin.account_locked
-                hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                hashed_password = PasswordHasher.hash(new_password)
                 admin.update_password(hashed_password)
                 unlock_message = " Your account has been unlocked." if was_locked else ""
                 return True, f"Password updated successfully.{unlock_message}", was_locked
@@ -117,7 +120,7 @@ class AdminController:
         if existing_user or existing_admin:
             return False, "An account with this email already exists."
 
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = PasswordHasher.hash(password)
 
         if account_type.lower() == 'admin':
             new_admin = Admin(
@@ -234,7 +237,7 @@ class AdminController:
             is_valid, message = AdminController.validate_password(new_password)
             if not is_valid:
                 return False, message
-            hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            hashed_password = PasswordHasher.hash(new_password)
             kwargs['password'] = hashed_password
 
         # Handle location for users
@@ -255,6 +258,8 @@ class AdminController:
         # Perform the update
         success, message = account.update_fields(kwargs)
         if success:
+            # An admin edit ends the account's sessions, so it's picked up on the next login
+            SessionManager.bump_epoch(account_id, account_type.lower())
             # Log the update action with redacted fields
             target_email = getattr(account, 'email', None)
             AuditLog.log_action(
@@ -277,6 +282,7 @@ class AdminController:
                 return False, "Admin not found."
             admin.is_active = False
             admin.save()
+            SessionManager.bump_epoch(admin.admin_id, 'admin')
             target_email = AdminController.get_target_user_email(account_type, account_id)
             AuditLog.log_action(
                 admin_id=g.user.admin_id,
@@ -294,6 +300,7 @@ class AdminController:
                 return False, "Employer not found."
             employer.is_active = False
             employer.save()
+            SessionManager.bump_epoch(employer.employer_id, 'employer')
             target_email = AdminController.get_target_user_email(account_type, account_id)
             AuditLog.log_action(
                 admin_id=g.user.admin_id,
@@ -311,6 +318,7 @@ class AdminController:
                 return False, "User not found."
             user.is_active = False
             user.save()
+            SessionManager.bump_epoch(user.user_id, 'user')
             target_email = AdminController.get_target_user_email(account_type, account_id)
             AuditLog.log_action(
                 admin_id=g.user.admin_id,
@@ -342,7 +350,7 @@ class AdminController:
 
         # Hash the password
         try:
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            hashed_password = PasswordHasher.hash(password)
         except Exception as e:
             logging.exception("Error hashing password for user: %s", email)
             return False, "Password processing failed."
@@ -400,7 +408,7 @@ class AdminController:
         if existing_employer:
             return False, "An employer with this email already exists."
 
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = PasswordHasher.hash(password)
 
         new_employer = Employer(
             employer_id=None,  # This will be auto-generated
@@ -438,7 +446,7 @@ class AdminController:
             logging.warning("Admin account creation failed: Email %s already exists.", email)
             return False, "An admin with this email already exists."
 
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = PasswordHasher.hash(password)
 
         new_admin = Admin(
             admin_id=None,  # This will be auto-generated
@@ -536,6 +544,8 @@ class AdminController:
             account.save()
 
         print(f"After toggle: {account_type} {account_id} is_active = {account.is_active}")  # Debug log
+        if not account.is_active:
+            SessionManager.bump_epoch(account_id, account_type.lower())
 
         # Prepare log details
         action = 'activate' if account.is_active else 'deactivate'
@@ -1,12 +1,11 @@
 from flask import g, url_for
 
-from ..models import User
 from ..models.employer_model import Employer
 from ..controllers.user_controller import UserController  # For password validation
 from ..services.email_service import send_reset_email, send_verification_email
+from ..services.password_service import PasswordHasher
 from ..models.job_model import Job
 import datetime
-import bcrypt
 from decimal import Decimal  # Import Decimal
 
 
@@ -45,8 +44,10 @@ class EmployerController:
             if employer.account_locked:
                 return None, "Account is locked. Please use the 'Forgot Password' option to unlock your account."
 
-            if bcrypt.checkpw(password.encode('utf-8'), employer.password.encode('utf-8')):
+            if PasswordHasher.verify(password, employer.password):
                 employer.reset_failed_attempts()
+                if PasswordHasher.needs_rehash(employer.password):
+                    PasswordHasher.rehash_in_background(password, employer.rehash_password)
                 employer.unlock_account()  # Unlock account on successful login
                 return employer, None
             else:
@@ -91,7 +92,7 @@ class EmployerController:
         if not is_valid:
             return False, message
 
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = PasswordHasher.hash(password)
         new_employer = Employer(
             employer_id=None,  # This will be generated automatically
             company_name=company_name,
@@ -145,7 +146,7 @@ class EmployerController:
                     return False, message, False
 
                 was_locked = employer.account_locked
-                hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                hashed_password = PasswordHasher.hash(new_password)
                 employer.update_password(hashed_password)
                 unlock_message = " Your account has been unlocked." if was_locked else ""
                 return True, f"Password updated successfully.{unlock_message}", was_locked
@@ -340,22 +341,8 @@ class EmployerController:
         if not job or job.employer_id != employer_id:
             return None, "Job not found or unauthorized"
 
+        # get_applications already loads every applicant, in one batch
         applications = job.get_applications()
-        # Get user details for each application
-        detailed_applications = []
-        for app in applications:
-            user = User.get_by_id(app['user_id'])
-            if user:
-                detailed_applications.append({
-                    'application': app,
-                    'user': {
-                        'first_name': user.first_name,
-                        'last_name': user.last_name,
-                        'email': user.email,
-                        'skills': user.skills,
-                        'work_history': user.work_history,
-                        'profile_picture_url': user.profile_picture_url
-                    }
-                })
-
-        return detailed_applications, "Success"
\ No newline at end of file
+        if applications is None:
+            return None, "Applications couldn't be loaded right now, please try again."
+        return applications, "Success"
\ No newline at end of file
@@ -1,6 +1,17 @@
 from ..models.user_model import User
 from ..models.employer_model import Employer
 from ..models.admin_model import Admin
+from ..services.database_service import DynamoDB
+from ..services.identity_map import IdentityMap
+from ..services.session_cache import SessionCache
+from ..services.session_service import SessionManager
+
+# user_type -> (model, table, id attribute) of the logged-in principal
+PRINCIPALS = {
+    'user': (User, 'Users', 'user_id'),
+    'employer': (Employer, 'Employers', 'employer_id'),
+    'admin': (Admin, 'Admins', 'admin_id'),
+}
 
 def get_user(user_id, user_type):
     if user_type == 'user':
@@ -12,3 +23,44 @@ def get_user(user_id, user_type):
     else:
         return None
 
+def get_user_and_session_epoch(user_id, user_type):
+    """
+    Read the principal and its current session epoch in one round trip.
+    Returns (principal or None, epoch), or None if the read failed.
+    """
+    if user_type not in PRINCIPALS:
+        return None, 0
+    model, table_name, id_attribute = PRINCIPALS[user_type]
+    items = DynamoDB.get_items([
+        (table_name, {id_attribute: user_id}),
+        (SessionManager.EPOCH_TABLE, {'principal': SessionManager.principal(user_id, user_type)}),
+    ])
+    if items is None:
+        return None
+    item, epoch_item = items
+    principal = model(**item) if item else None
+    if principal:
+        # Later get_by_id calls in this request reuse it instead of reading the row again
+        IdentityMap.add(table_name, user_id, principal)
+    # Rows only ever touched, never bumped, have no epoch yet
+    return principal, (int(epoch_item.get('epoch', 0)) if epoch_item else 0)
+
+def load_principal(user_id, user_type, fresh=False):
+    """
+    Like get_user_and_session_epoch, but served from SessionCache unless fresh is set.
+    Returns (principal or None, epoch), or None if the read failed.
+    """
+    key = SessionManager.principal(user_id, user_type)
+    if not fresh:
+        cached = SessionCache.get_principal(key)
+        if cached is not None:
+            principal, epoch = cached
+            if principal:
+                IdentityMap.add(PRINCIPALS[user_type][1], user_id, principal)
+            return principal, epoch
+
+    version = SessionCache.version()
+    result = get_user_and_session_epoch(user_id, user_type)
+    if result is not None and result[0] is not None:
+        SessionCache.put_principal(key, result[0], result[1], version)
+    return result
@@ -1,8 +1,6 @@
 import re
 import uuid
 
-import boto3
-from botocore.exceptions import ClientError
 from dateutil import parser
 from flask import url_for
 from werkzeug.utils import secure_filename
@@ -11,13 +9,26 @@ from config import Config
 from ..models.user_model import User
 from ..models.job_model import Job
 from ..models.application_model import Application
-from ..services import DynamoDB
+from ..services.recommendation_service import RecommendationEngine
 from ..services.email_service import send_reset_email, send_verification_email
-import bcrypt
+from ..services.password_service import PasswordHasher
+from ..services.storage_service import StorageService
+from ..services.job_search_service import JobSearchService
 import datetime
 
 
 class UserController:
+    PROFILE_PICTURE_FOLDER = "ProgrammingProject_data/user_data/profile_pictures"
+    CERTIFICATION_FOLDER = "ProgrammingProject_data/user_data/certifications"
+    # Content-Type an upload is stored with, by file extension
+    IMAGE_CONTENT_TYPES = {'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'gif': 'image/gif',
+                           'webp': 'image/webp'}
+    CERTIFICATION_CONTENT_TYPES = dict(IMAGE_CONTENT_TYPES, **{
+        'pdf': 'application/pdf',
+        'doc': 'application/msword',
+        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+    })
+
     @staticmethod
     def login(email, password):
         user = User.get_by_email(email)
@@ -43,8 +54,10 @@ class UserController:
             if user.account_locked:
                 return None, "Account is locked. Please use the 'Forgot Password' option to unlock your account."
 
-            if bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8')):
+            if PasswordHasher.verify(password, user.password):
                 user.reset_failed_attempts()
+                if PasswordHasher.needs_rehash(user.password):
+                    PasswordHasher.rehash_in_background(password, user.rehash_password)
                 user.unlock_account()  # Unlock account on successful login
                 return user, None
             else:
@@ -100,8 +113,8 @@ class UserController:
                     return False, message, False
 
                 was_locked = user.account_locked
-                hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-                user.update_password(hashed_password.decode('utf-8'))
+                hashed_password = PasswordHasher.hash(new_password)
+                user.update_password(hashed_password)
                 user.unlock_account()  # Ensure the account is unlocked when password is reset
                 unlock_message = " Your account has been unlocked." if was_locked else ""
                 return True, f"Password updated successfully.{unlock_message}", was_locked
@@ -141,11 +154,11 @@ class UserController:
             return False, "A user with this email already exists."
 
         # Create new user with is_active=False
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        hashed_password = PasswordHasher.hash(password)
         new_user = User(
             user_id=None,  # Will be generated automatically
             email=email,
-            password=hashed_password.decode('utf-8'),
+            password=hashed_password,
             first_name=first_name,
             last_name=last_name,
             phone_number=phone_number,
@@ -189,7 +202,7 @@ class UserController:
         if delete_certs:
             for cert_url in delete_certs:
                 user.remove_certification(cert_url)
-                UserController.delete_file_from_s3(cert_url)
+                StorageService.delete_url_later(cert_url)
 
         # Handle location
         if location:
@@ -218,7 +231,7 @@ class UserController:
             return False, "User not found."
 
         # Verify current password
-        if not bcrypt.checkpw(current_password.encode('utf-8'), user.password.encode('utf-8')):
+        if not PasswordHasher.verify(current_password, user.password):
             return False, "Current password is incorrect."
 
         # Validate new password
@@ -230,7 +243,7 @@ class UserController:
             return False, "New passwords do not match."
 
         # Hash the new password
-        hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = PasswordHasher.hash(new_password)
         user.update_password(hashed_password)
         return True, "Password changed successfully."
 
@@ -247,41 +260,19 @@ class UserController:
         if not UserController.allowed_image_file(profile_picture.filename):
             return None, "Invalid file type. Please upload an image (png, jpg, jpeg, gif, webp)."
 
-        s3 = boto3.client('s3',
-                          region_name=Config.S3_REGION,
-                          aws_access_key_id=Config.AWS_ACCESS_KEY,
-                          aws_secret_access_key=Config.AWS_SECRET_KEY)
-
-        # Delete old profile picture if it exists
-        if user.profile_picture_url:
-            try:
-                old_key = \
-                    user.profile_picture_url.split(f"{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/")[1]
-                s3.delete_object(Bucket=Config.S3_BUCKET_NAME, Key=old_key)
-            except Exception as e:
-                print(f"Error deleting old profile picture: {e}")
-
         # Upload new profile picture
-        folder_name = "ProgrammingProject_data/user_data/profile_pictures"
         filename = secure_filename(profile_picture.filename)
-        unique_filename = f"{folder_name}/{user.user_id}_{uuid.uuid4().hex}_{filename}"
-
-        try:
-            s3.upload_fileobj(
-                profile_picture,
-                Config.S3_BUCKET_NAME,
-                unique_filename,
-                ExtraArgs={
-                    'ACL': 'public-read',
-                    'ContentType': profile_picture.content_type
-                }
-            )
-            new_profile_picture_url = f"https://{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/{unique_filename}"
-            return new_profile_picture_url, None
-        except ClientError as e:
-            print(f"Error uploading to S3: {e}")
+        unique_filename = UserController.upload_key(UserController.PROFILE_PICTURE_FOLDER, user, filename)
+
+        new_profile_picture_url = StorageService.upload(profile_picture, unique_filename, profile_picture.content_type)
+        if not new_profile_picture_url:
             return None, "Failed to upload profile picture. Please try again."
 
+        # Delete the old profile picture once the new one is in place
+        if user.profile_picture_url:
+            StorageService.delete_url_later(user.profile_picture_url)
+        return new_profile_picture_url, None
+
     @staticmethod
     def allowed_certification_file(filename):
         allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'pdf', 'docx', 'doc'}
@@ -289,59 +280,112 @@ class UserController:
 
     @staticmethod
     def upload_certification(user, certification_file, cert_type):
-        s3 = boto3.client('s3',
-                          region_name=Config.S3_REGION,
-                          aws_access_key_id=Config.AWS_ACCESS_KEY,
-                          aws_secret_access_key=Config.AWS_SECRET_KEY)
-
-        folder_name = "ProgrammingProject_data/user_data/certifications"
         filename = secure_filename(certification_file.filename)
-        unique_filename = f"{folder_name}/{user.user_id}_{uuid.uuid4().hex}_{filename}"
-
-        try:
-            s3.upload_fileobj(
-                certification_file,
-                Config.S3_BUCKET_NAME,
-                unique_filename,
-                ExtraArgs={
-                    'ACL': 'public-read',
-                    'ContentType': certification_file.content_type
-                }
-            )
-            cert_url = f"https://{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/{unique_filename}"
-            cert_id = str(uuid.uuid4())
-            user.add_certification(cert_id, cert_url, filename, cert_type)
-            return cert_url, filename, cert_id, None
-        except ClientError as e:
-            print(f"Error uploading certification to S3: {e}")
+        unique_filename = UserController.upload_key(UserController.CERTIFICATION_FOLDER, user, filename)
+
+        cert_url = StorageService.upload(certification_file, unique_filename, certification_file.content_type)
+        if not cert_url:
             return None, None, None, "Failed to upload certification. Please try again."
+        cert_id = str(uuid.uuid4())
+        user.add_certification(cert_id, cert_url, filename, cert_type)
+        return cert_url, filename, cert_id, None
+
+    @staticmethod
+    def upload_key(folder, user, filename):
+        return f"{folder}/{user.user_id}_{uuid.uuid4().hex}_{filename}"
+
+    @staticmethod
+    def _direct_upload_rules(kind):
+        """(folder, content types by extension, size limit in bytes) for a direct upload kind."""
+        if kind == 'profile_picture':
+            return (UserController.PROFILE_PICTURE_FOLDER, UserController.IMAGE_CONTENT_TYPES,
+                    Config.MAX_PROFILE_PICTURE_MB * 1024 * 1024)
+        if kind == 'certification':
+            return (UserController.CERTIFICATION_FOLDER, UserController.CERTIFICATION_CONTENT_TYPES,
+                    Config.MAX_CERTIFICATION_MB * 1024 * 1024)
+        return None
+
+    @staticmethod
+    def presign_upload(user, kind, filename):
+        """
+        Presigned POST for the browser to upload a profile picture or certification straight
+        to S3. Returns ({'url', 'fields', 'key'}, None) or (None, error).
+        """
+        rules = UserController._direct_upload_rules(kind)
+        if not rules:
+            return None, "Unknown upload type."
+        folder, content_types, max_bytes = rules
+
+        filename = secure_filename(filename or '')
+        extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+        if extension not in content_types:
+            return None, f"Invalid file type. Please upload one of: {', '.join(sorted(content_types))}."
+
+        key = UserController.upload_key(folder, user, filename)
+        post = StorageService.presigned_post(key, content_types[extension], max_bytes)
+        if not post:
+            return None, "Uploads are unavailable right now. Please try again."
+        return {'url': post['url'], 'fields': post['fields'], 'key': key}, None
+
+    @staticmethod
+    def complete_upload(user, kind, key, cert_type=None):
+        """
+        Record a file the browser uploaded with presign_upload(). The key must be one issued
+        to this user and the object must exist in S3 with an allowed type and size.
+        Returns the profile picture URL, or the added certification dict, and an error.
+        """
+        rules = UserController._direct_upload_rules(kind)
+        if not rules:
+            return None, "Unknown upload type."
+        folder, content_types, max_bytes = rules
+
+        prefix = f"{folder}/{user.user_id}_"
+        if not key or not key.startswith(prefix) or '/' in key[len(prefix):]:
+            return None, "Invalid upload."
+        # Keys are <folder>/<user_id>_<random hex>_<filename>
+        filename = key[len(prefix):].split('_', 1)[-1]
+        if kind == 'certification' and (not cert_type or not cert_type.strip()):
+            return None, "Certification type is required."
+
+        head = StorageService.head(key)
+        if not head:
+            return None, "Upload not found. Please try again."
+        if head.get('ContentType') not in content_types.values() or head.get('ContentLength', 0) > max_bytes:
+            StorageService.delete_later(key)
+            return None, "Invalid file type or size."
+
+        url = StorageService.url_for_key(key)
+        if kind == 'profile_picture':
+            if user.profile_picture_url != url:
+                old_url = user.profile_picture_url
+                user.profile_picture_url = url
+                user.save()
+                if old_url:
+                    StorageService.delete_url_later(old_url)
+            return url, None
+
+        # Completing the same upload twice doesn't add it twice
+        existing = next((cert for cert in user.certifications if cert.get('url') == url), None)
+        if existing:
+            return existing, None
+        cert_id = str(uuid.uuid4())
+        user.add_certification(cert_id, url, filename, cert_type.strip())
+        return {'id': cert_id, 'url': url, 'filename': filename, 'type': cert_type.strip()}, None
 
     @staticmethod
     def delete_certification(user_id, cert_url):
         user = User.get_by_id(user_id)
         if not user:
-            return False, "User not found."
+            return False
 
-        # Extract the key from the URL
-        try:
-            key = cert_url.split(f"{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/")[1]
-        except IndexError:
-            return False, "Invalid certification URL."
-
-        s3 = boto3.client('s3',
-                          region_name=Config.S3_REGION,
-                          aws_access_key_id=Config.AWS_ACCESS_KEY,
-                          aws_secret_access_key=Config.AWS_SECRET_KEY)
-
-        try:
-            s3.delete_object(Bucket=Config.S3_BUCKET_NAME, Key=key)
-            user.remove_certification(cert_url)
-            user.save()
-            return True
-        except ClientError as e:
-            print(f"Error deleting certification from S3: {e}")
+        if StorageService.key_from_url(cert_url) is None:
+            print(f"Invalid certification URL: {cert_url}")
             return False
 
+        user.remove_certification(cert_url)
+        StorageService.delete_url_later(cert_url)
+        return True
+
     @staticmethod
     def update_profile_field(user_id, field, value):
         user = User.get_by_id(user_id)
@@ -457,6 +501,25 @@ class UserController:
         """
         return Job.get_all_active_jobs()
 
+    @staticmethod
+    def search_jobs(filters, page=1, per_page=10):
+        """
+        Active jobs matching filters (see JobSearchService.search), best keyword match or
+        newest first unless filters['sort'] says otherwise. Returns (jobs on the page, total
+        matches, facet counts); jobs is None if they couldn't be read.
+        """
+        result = JobSearchService.search(offset=(page - 1) * per_page, limit=per_page, **filters)
+        jobs = Job.get_many(result['job_ids'])
+        if jobs is None:
+            return None, result['total'], result['facets']
+        # The index can lag edits made by other workers, so check the jobs themselves
+        return [job for job in jobs if job.is_active], result['total'], result['facets']
+
+    @staticmethod
+    def get_jobs_page(cursor=None, per_page=10):
+        """One page of active jobs, newest first: (jobs, next_cursor, prev_cursor), see Job.page."""
+        return Job.page(cursor, per_page)
+
     @staticmethod
     def get_job_by_id(job_id):
         """
@@ -520,7 +583,7 @@ class UserController:
         return Application.delete_by_application_id(application_id)
 
     @staticmethod
-    def get_recommended_jobs(user):
+    def get_recommended_jobs(user, limit=None):
         """
         Get personalized job recommendations based on user's profile factors:
         - Skills match
@@ -529,97 +592,17 @@ class UserController:
         - Work history relevance
 
         Returns a list of dictionaries with job details and matched reasons.
-        Only includes jobs with at least one matched reason.
+        Only includes jobs with at least one matched reason. Scoring is done by
+        RecommendationEngine over a cached, vectorized copy of the active jobs.
         """
-        response = DynamoDB.scan(
-            'Jobs',
-            FilterExpression='is_active = :active',
-            ExpressionAttributeValues={':active': True}
-        )
+        return RecommendationEngine.get().recommend(user, limit=limit)
 
-        jobs = [Job(**item) for item in response.get('Items', [])]
-        scored_jobs = []
-
-        for job in jobs:
-            score = 0
-            matched_reasons = {
-                'skills': [],
-                'location': '',
-                'certifications': [],
-                'work_history': []
-            }
-
-            # Skills matching (highest weight - 40%)
-            user_skills = {skill['skill'].lower() for skill in user.skills}
-            job_skills = {skill.lower() for skill in job.skills}
-            if job_skills and user_skills:
-                matched_skills = user_skills.intersection(job_skills)
-                skills_match = len(matched_skills) / len(job_skills)
-                score += skills_match * 40
-                if matched_skills:
-                    matched_reasons['skills'] = list(matched_skills)
-
-            # Location matching (30%)
-            if user.city and user.country:
-                if job.city.lower() == user.city.lower():
-                        # and job.country.lower() == user.country.lower():
-                    score += 30
-                    matched_reasons['location'] = 'City match'
-
-            # Certification matching (20%)
-            user_certs = {cert['type'].lower() for cert in user.certifications}
-            job_certs = {cert.lower() for cert in job.certifications}
-            if job_certs and user_certs:
-                matched_certs = user_certs.intersection(job_certs)
-                cert_match = len(matched_certs) / len(job_certs)
-                score += cert_match * 20
-                if matched_certs:
-                    matched_reasons['certifications'] = list(matched_certs)
-
-            # Work history relevance (10%)
-            user_job_titles = {work['job_title'].lower() for work in user.work_history}
-            if job.job_title.lower() in user_job_titles:
-                score += 10
-                matched_reasons['work_history'].append(job.job_title.lower())
-
-            # Determine if there's at least one matched reason
-            has_match = (
-                    bool(matched_reasons['skills']) or
-                    bool(matched_reasons['location']) or
-                    bool(matched_reasons['certifications']) or
-                    bool(matched_reasons['work_history'])
-            )
-
-            if has_match:
-                scored_jobs.append({
-                    'job': job,
-                    'score': score,
-                    'matched_reasons': matched_reasons
-                })
-
-        # Sort jobs by score descending and date posted
-        scored_jobs.sort(key=lambda x: (x['score'], x['job'].date_posted), reverse=True)
-
-        # Prepare the final list with job and matched reasons
-        recommended_jobs = []
-        for entry in scored_jobs:
-            job = entry['job']
-            reasons = entry['matched_reasons']
-            recommended_jobs.append({
-                'job': job,
-                'matched_reasons': reasons,
-                'score': entry['score']
-            })
-
-        return recommended_jobs
-
-    # New method to get saved jobs for the user
+    # New method to get saved jobs for the user (None if they couldn't be read)
     @staticmethod
     def get_saved_jobs(user_id):
         user = User.get_by_id(user_id)
         if user and user.saved_jobs:
-            saved_jobs = [Job.get_by_id(job_id) for job_id in user.saved_jobs]
-            return [job for job in saved_jobs if job is not None]
+            return Job.get_many(user.saved_jobs)
         return []
 
     # Method to save a job for a user
@@ -653,14 +636,20 @@ class UserController:
     @staticmethod
     def get_user_applications(user_id):
         """
-        Get all applications for a user with associated job details
+        Get all applications for a user with associated job details, or None if the jobs
+        couldn't be read
         """
         applications = Application.get_by_user_id(user_id)
 
-        # For each application, fetch and attach the associated job
+        # Fetch all associated jobs in one batch, then attach them to their application
+        jobs = Job.get_many([application.job_id for application in applications])
+        if jobs is None:
+            return None
+        jobs = {job.job_id: job for job in jobs}
+
         for application in applications:
             try:
-                job = Job.get_by_id(application.job_id)
+                job = jobs.get(application.job_id)
                 if job and job.is_active:  # Make sure job exists and is active
                     # Create a simple dictionary with required job info
                     application.job = {
@@ -5,6 +5,7 @@ from .job_model import Job
 from .application_model import Application
 from .audit_log_model import AuditLog
 from .message_model import Message
+from .conversation_summary_model import ConversationSummary
 
 __all__ = [
     'Admin',
@@ -13,5 +14,6 @@ __all__ = [
     'Job',
     'Application',
     'AuditLog',
-    'Message'
+    'Message',
+    'ConversationSummary'
 ]
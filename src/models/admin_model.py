@@ -1,4 +1,5 @@
 from ..services.database_service import DynamoDB
+from ..services.session_service import SessionManager
 import secrets
 import datetime
 import uuid
@@ -29,22 +30,22 @@ class Admin:
 
     @staticmethod
     def get_by_email(email):
-        response = DynamoDB.scan('Admins',
-                                 FilterExpression='email = :email',
-                                 ExpressionAttributeValues={':email': email})
-        items = response.get('Items', [])
+        items = DynamoDB.query_index('Admins', 'email-index', {'email': email})
         if items:
             return Admin(**items[0])
         return None
 
     def increment_failed_attempts(self, threshold=5):
         self.failed_login_attempts += 1
-        if self.failed_login_attempts >= threshold:
+        locked = not self.account_locked and self.failed_login_attempts >= threshold
+        if locked:
             self.account_locked = True
         DynamoDB.update_item('Admins',
                              {'admin_id': self.admin_id},
                              {'failed_login_attempts': self.failed_login_attempts,
                               'account_locked': self.account_locked})
+        if locked:
+            SessionManager.bump_epoch(self.admin_id, 'admin')
 
     def reset_failed_attempts(self):
         self.failed_login_attempts = 0
@@ -57,6 +58,8 @@ class Admin:
         DynamoDB.update_item('Admins',
                              {'admin_id': self.admin_id},
                              {'account_locked': True})
+        # Locking ends the account's sessions
+        SessionManager.bump_epoch(self.admin_id, 'admin')
 
     def unlock_account(self):
         self.account_locked = False
@@ -78,14 +81,16 @@ class Admin:
 
     @staticmethod
     def get_by_reset_token(token):
-        response = DynamoDB.scan('Admins',
-                                 FilterExpression='reset_token = :token',
-                                 ExpressionAttributeValues={':token': token})
-        items = response.get('Items', [])
+        items = DynamoDB.query_index('Admins', 'reset_token-index', {'reset_token': token})
         if items:
             return Admin(**items[0])
         return None
 
+    def rehash_password(self, new_password):
+        """Store a new hash of the current password, unless the password was changed since this object was read."""
+        if DynamoDB.replace_value('Admins', {'admin_id': self.admin_id}, 'password', self.password, new_password):
+            self.password = new_password
+
     def update_password(self, new_password):
         DynamoDB.update_item('Admins',
                              {'admin_id': self.admin_id},
@@ -95,6 +100,8 @@ class Admin:
         self.token_expiration = None
         self.failed_login_attempts = 0
         self.account_locked = False
+        # Sessions opened with the old password end
+        SessionManager.bump_epoch(self.admin_id, 'admin')
 
     def to_dict(self):
         return {
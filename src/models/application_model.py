@@ -3,6 +3,7 @@
 import uuid
 import datetime
 from ..services.database_service import DynamoDB
+from ..services.identity_map import IdentityMap
 
 
 class Application:
@@ -48,31 +49,26 @@ class Application:
 
     @staticmethod
     def get_by_user_id(user_id):
-        response = DynamoDB.scan(
-            'Applications',
-            FilterExpression='user_id = :user_id',
-            ExpressionAttributeValues={':user_id': user_id}
-        )
-        return [Application(**item) for item in response['Items']]
+        items = DynamoDB.query_index('Applications', 'user_id-index', {'user_id': user_id})
+        return [Application(**item) for item in items or []]
 
     @staticmethod
     def get_by_user_and_job(user_id, job_id):
-        try:
-            response = DynamoDB.scan(
-                'Applications',
-                FilterExpression='user_id = :uid AND job_id = :jid',
-                ExpressionAttributeValues={
-                    ':uid': user_id,
-                    ':jid': job_id
-                }
-            )
-            items = response.get('Items', [])
-            if items:
-                return Application(**items[0])
-            return None
-        except Exception as e:
-            print(f"Error checking application: {e}")
-            return None
+        # Checked several times while applying, so remembered for the rest of the request
+        return IdentityMap.get('Applications:user_job', (user_id, job_id), Application._fetch_by_user_and_job)
+
+    @staticmethod
+    def _fetch_by_user_and_job(pairs):
+        applications = []
+        for user_id, job_id in pairs:
+            try:
+                items = DynamoDB.query_index('Applications', 'user_id-index',
+                                             {'user_id': user_id, 'job_id': job_id})
+                applications.append(Application(**items[0]) if items else None)
+            except Exception as e:
+                print(f"Error checking application: {e}")
+                applications.append(None)
+        return applications
 
     def _update_status(self, new_status):
         """Instance method to update the status of an application"""
@@ -105,7 +101,12 @@ class Application:
     @staticmethod
     def get_by_id(application_id):
         """Get application by ID"""
-        item = DynamoDB.get_item('Applications', {'application_id': application_id})
-        if item:
-            return Application(**item)
-        return None
+        return IdentityMap.get('Applications', application_id, Application._fetch_many)
+
+    @staticmethod
+    def _fetch_many(application_ids):
+        items = DynamoDB.batch_get('Applications', [{'application_id': application_id}
+                                                    for application_id in application_ids])
+        if items is None:
+            return None
+        return [Application(**item) if item else None for item in items]
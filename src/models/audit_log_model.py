@@ -31,7 +31,7 @@ class AuditLog:
 
     @staticmethod
     def get_all_logs():
-        response = DynamoDB.scan('AuditLogs')
+        response = DynamoDB.scan('AuditLogs', segments=DynamoDB.PARALLEL_SCAN_SEGMENTS)
         logs = response.get('Items', [])
 
         # Sort logs by timestamp in descending order
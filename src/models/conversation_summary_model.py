@@ -0,0 +1,109 @@
+from ..services.database_service import DynamoDB
+
+
+class ConversationSummary:
+    """
+    Inbox row for one participant of one conversation: who it is with, the last message
+    and how many messages they haven't read yet. Kept up to date by Message.save and
+    reset when the participant opens the chat, so the inbox and the unread badge are
+    keyed reads instead of scans over every message.
+    """
+    TABLE = 'ConversationSummaries'
+    # Per-participant row holding the unread count across all conversations
+    TOTAL_ID = '#total'
+
+    def __init__(self, participant_id, conversation_id, other_participant_id=None, job_id=None,
+                 last_message_id=None, last_content=None, last_timestamp=None, last_sender_id=None,
+                 last_sender_type=None, unread_count=0):
+        self.participant_id = participant_id
+        self.conversation_id = conversation_id
+        self.other_participant_id = other_participant_id
+        self.job_id = job_id
+        self.last_message_id = last_message_id
+        self.last_content = last_content
+        self.last_timestamp = last_timestamp
+        self.last_sender_id = last_sender_id
+        self.last_sender_type = last_sender_type
+        self.unread_count = int(unread_count or 0)
+
+    @staticmethod
+    def record_message(message):
+        """
+        Update both participants' summaries for a message that has just been saved.
+        Returns False if any of them couldn't be written (already logged).
+        """
+        last_message = {
+            'job_id': message.job_id,
+            'last_message_id': message.message_id,
+            'last_content': message.content,
+            'last_timestamp': message.timestamp,
+            'last_sender_id': message.sender_id,
+            'last_sender_type': message.sender_type
+        }
+        # Three independent atomic updates: ADDs on the same row never conflict with each other,
+        # so concurrent messages to one receiver all land
+        results = [
+            DynamoDB.update_counters(
+                ConversationSummary.TABLE,
+                {'participant_id': message.sender_id, 'conversation_id': message.conversation_id},
+                set_values={**last_message, 'other_participant_id': message.receiver_id}
+            ),
+            DynamoDB.update_counters(
+                ConversationSummary.TABLE,
+                {'participant_id': message.receiver_id, 'conversation_id': message.conversation_id},
+                increments={'unread_count': 1},
+                set_values={**last_message, 'other_participant_id': message.sender_id}
+            ),
+            DynamoDB.update_counters(
+                ConversationSummary.TABLE,
+                {'participant_id': message.receiver_id, 'conversation_id': ConversationSummary.TOTAL_ID},
+                increments={'unread_count': 1}
+            ),
+        ]
+        return all(result is not None for result in results)
+
+    @staticmethod
+    def mark_read(participant_id, conversation_id):
+        """Zero a conversation's unread count and take what it held off the participant's total."""
+        previous = DynamoDB.update_counters(
+            ConversationSummary.TABLE,
+            {'participant_id': participant_id, 'conversation_id': conversation_id},
+            set_values={'unread_count': 0},
+            only_if_exists=True,
+            return_values='UPDATED_OLD'
+        )
+        unread = int((previous or {}).get('unread_count', 0))
+        if unread:
+            DynamoDB.update_counters(
+                ConversationSummary.TABLE,
+                {'participant_id': participant_id, 'conversation_id': ConversationSummary.TOTAL_ID},
+                increments={'unread_count': -unread}
+            )
+
+    @staticmethod
+    def get_for_participant(participant_id):
+        """All of a participant's conversations, most recent message first."""
+        items = DynamoDB.query_range(ConversationSummary.TABLE, participant_id) or []
+        summaries = [ConversationSummary(**item) for item in items
+                     if item['conversation_id'] != ConversationSummary.TOTAL_ID]
+        return sorted(summaries, key=lambda summary: summary.last_timestamp or '', reverse=True)
+
+    @staticmethod
+    def get_unread_total(participant_id):
+        item = DynamoDB.get_item(ConversationSummary.TABLE,
+                                 {'participant_id': participant_id, 'conversation_id': ConversationSummary.TOTAL_ID})
+        return max(int(item.get('unread_count', 0)), 0) if item else 0
+
+    def to_dict(self):
+        return {
+            'participant_id': self.participant_id,
+            'conversation_id': self.conversation_id,
+            'other_participant_id': self.other_participant_id,
+            'job_id': self.job_id,
+            'last_message_id': self.last_message_id,
+            'last_content': self.last_content,
+            'last_timestamp': self.last_timestamp,
+            'last_sender_id': self.last_sender_id,
+            'last_sender_type': self.last_sender_type,
+            'unread_count': self.unread_count
+        }
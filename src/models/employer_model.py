@@ -1,6 +1,8 @@
 # Filename: src/models/employer_model.py
 
 from ..services.database_service import DynamoDB
+from ..services.session_service import SessionManager
+from ..services.identity_map import IdentityMap
 import secrets
 import datetime
 import uuid
@@ -38,10 +40,20 @@ class Employer:
 
     @staticmethod
     def get_by_id(employer_id):
-        item = DynamoDB.get_item('Employers', {'employer_id': employer_id})
-        if item:
-            return Employer(**item)
-        return None
+        return IdentityMap.get('Employers', employer_id, Employer._fetch_many)
+
+    @staticmethod
+    def get_many(employer_ids):
+        """Retrieve several employers with batched reads, in the order of employer_ids, or None if the read failed."""
+        employers = IdentityMap.get_many('Employers', employer_ids, Employer._fetch_many)
+        return [employer for employer in employers if employer] if employers is not None else None
+
+    @staticmethod
+    def _fetch_many(employer_ids):
+        items = DynamoDB.batch_get('Employers', [{'employer_id': employer_id} for employer_id in employer_ids])
+        if items is None:
+            return None
+        return [Employer(**item) if item else None for item in items]
 
     def generate_verification_token(self):
         token = secrets.token_urlsafe(32)
@@ -56,16 +68,11 @@ class Employer:
 
     @staticmethod
     def verify_account(token):
-        response = DynamoDB.scan(
-            'Employers',
-            FilterExpression='verification_token = :token AND is_active = :inactive',
-            ExpressionAttributeValues={
-                ':token': token,
-                ':inactive': False
-            }
-        )
-        if response['Items']:
-            employer_data = response['Items'][0]
+        items = DynamoDB.query_index('Employers', 'verification_token-index',
+                                     {'verification_token': token},
+                                     filter_values={'is_active': False})
+        if items:
+            employer_data = items[0]
             token_expiration = datetime.datetime.fromisoformat(employer_data['verification_token_expiration'])
             if datetime.datetime.utcnow() > token_expiration:
                 return False, "Verification token has expired."
@@ -80,17 +87,20 @@ class Employer:
 
     @staticmethod
     def get_all_employers():
-        items = DynamoDB.scan('Employers')
+        items = DynamoDB.scan('Employers', segments=DynamoDB.PARALLEL_SCAN_SEGMENTS)
         return [Employer(**item) for item in items.get('Items', [])]
 
     def increment_failed_attempts(self, threshold=5):
         self.failed_login_attempts += 1
-        if self.failed_login_attempts >= threshold:
+        locked = not self.account_locked and self.failed_login_attempts >= threshold
+        if locked:
             self.account_locked = True
         DynamoDB.update_item('Employers',
                              {'employer_id': self.employer_id},
                              {'failed_login_attempts': self.failed_login_attempts,
                               'account_locked': self.account_locked})
+        if locked:
+            SessionManager.bump_epoch(self.employer_id, 'employer')
 
     def reset_failed_attempts(self):
         self.failed_login_attempts = 0
@@ -103,6 +113,8 @@ class Employer:
         DynamoDB.update_item('Employers',
                              {'employer_id': self.employer_id},
                              {'account_locked': True})
+        # Locking ends the account's sessions
+        SessionManager.bump_epoch(self.employer_id, 'employer')
 
     def unlock_account(self):
         self.account_locked = False
@@ -125,13 +137,16 @@ class Employer:
 
     @staticmethod
     def get_by_reset_token(token):
-        response = DynamoDB.scan('Employers',
-                                 FilterExpression='reset_token = :token',
-                                 ExpressionAttributeValues={':token': token})
-        if response['Items']:
-            return Employer(**response['Items'][0])
+        items = DynamoDB.query_index('Employers', 'reset_token-index', {'reset_token': token})
+        if items:
+            return Employer(**items[0])
         return None
 
+    def rehash_password(self, new_password):
+        """Store a new hash of the current password, unless the password was changed since this object was read."""
+        if DynamoDB.replace_value('Employers', {'employer_id': self.employer_id}, 'password', self.password, new_password):
+            self.password = new_password
+
     def update_password(self, new_password):
         DynamoDB.update_item('Employers',
                              {'employer_id': self.employer_id},
@@ -145,6 +160,8 @@ class Employer:
         self.token_expiration = None
         self.failed_login_attempts = 0
         self.account_locked = False
+        # Sessions opened with the old password end
+        SessionManager.bump_epoch(self.employer_id, 'employer')
 
     def toggle_active_status(self):
         self.is_active = not self.is_active
@@ -2,13 +2,26 @@
 
 from decimal import Decimal
 
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from config import Config
 from ..models.application_model import Application
 from ..services.database_service import DynamoDB
+from ..services.identity_map import IdentityMap
+from ..services.job_catalogue import JobCatalogue
 import uuid
 import datetime
 
 class Job:
-    def __init__(self, job_id, employer_id, job_title, description, requirements, salary, city, country, certifications, skills, work_history, company_name, date_posted=None, is_active=True):
+    # Sparse index of the active jobs, see index_catalogue
+    ACTIVE_INDEX = 'active-date_posted-index'
+    ACTIVE_PARTITION = 'active'
+    # Page cursors are signed so a client can't hand DynamoDB an arbitrary start key
+    _cursor_serializer = URLSafeSerializer(Config.SECRET_KEY, salt='job-page-cursor')
+
+    def __init__(self, job_id, employer_id, job_title, description, requirements, salary, city, country, certifications, skills, work_history, company_name, date_posted=None, is_active=True,
+                 active_partition=None, change_partition=None, last_modified=None):
+        # active_partition is derived from is_active and change_partition is constant, see to_dict()
         self.job_id = job_id or str(uuid.uuid4())
         self.employer_id = employer_id
         self.job_title = job_title
@@ -26,9 +39,11 @@ class Job:
         self.company_name = company_name
         self.date_posted = date_posted or datetime.datetime.utcnow().isoformat()
         self.is_active = is_active
+        self.last_modified = last_modified
 
     def save_with_response(self):
         try:
+            self.last_modified = JobCatalogue.now()
             result = DynamoDB.put_item('Jobs', self.to_dict())
             if result:
                 return True, "Job saved successfully."
@@ -39,27 +54,46 @@ class Job:
             return False, "An error occurred while saving the job."
 
     @staticmethod
-    def get_by_id(job_id):
-        item = DynamoDB.get_item('Jobs', {'job_id': job_id})
-        if item:
-            return Job(**item)
-        return None
+    def get_many(job_ids):
+        """
+        Retrieve several jobs in as few round trips as possible, keeping the order
+        of job_ids and skipping ids that no longer exist. Jobs come from the JobCatalogue
+        when it has them. Returns None if the read failed.
+        """
+        jobs = IdentityMap.get_many('Jobs', job_ids, Job._fetch_many)
+        return [job for job in jobs if job] if jobs is not None else None
+
+    @staticmethod
+    def _fetch_many(job_ids):
+        items = JobCatalogue.get_many(job_ids)
+        if items is None:
+            return None
+        return [Job(**item) if item else None for item in items]
 
     @staticmethod
     def get_all_jobs():
-        response = DynamoDB.scan('Jobs', FilterExpression='is_active = :active', ExpressionAttributeValues={':active': True})
+        response = DynamoDB.scan('Jobs', FilterExpression='is_active = :active', ExpressionAttributeValues={':active': True},
+                                 segments=DynamoDB.PARALLEL_SCAN_SEGMENTS)
         return [Job(**item) for item in response.get('Items', [])]
 
     @staticmethod
     def get_jobs_by_employer(employer_id):
-        response = DynamoDB.scan('Jobs', FilterExpression='employer_id = :eid AND is_active = :active',
-                                 ExpressionAttributeValues={':eid': employer_id, ':active': True})
-        jobs = [Job(**item) for item in response.get('Items', [])]
-        return sorted(jobs, key=lambda x: x.date_posted, reverse=True)
+        # employer_id-index is sorted by date_posted, so newest first comes straight from the query
+        items = DynamoDB.query_index('Jobs', 'employer_id-index', {'employer_id': employer_id},
+                                     filter_values={'is_active': True}, scan_forward=False)
+        return [Job(**item) for item in items or []]
 
     def delete(self):
         self.is_active = False
-        DynamoDB.update_item('Jobs', {'job_id': self.job_id}, {'is_active': False})
+        # Removing active_partition takes the job out of the active index
+        self._update({'is_active': False, 'active_partition': None})
+
+    def _update(self, values):
+        """update_item on this job, stamping last_modified so other workers' catalogues see the change."""
+        self.last_modified = JobCatalogue.now()
+        return DynamoDB.update_item('Jobs', {'job_id': self.job_id},
+                                    dict(values, last_modified=self.last_modified,
+                                         change_partition=JobCatalogue.CHANGE_PARTITION))
 
     def to_dict(self):
         return {
@@ -76,7 +110,10 @@ class Job:
             'work_history': self.work_history,  # Store as a list of dicts
             'company_name': self.company_name,
             'date_posted': self.date_posted,
-            'is_active': self.is_active
+            'is_active': self.is_active,
+            'active_partition': Job.ACTIVE_PARTITION if self.is_active else None,
+            'change_partition': JobCatalogue.CHANGE_PARTITION,
+            'last_modified': self.last_modified
         }
 
     def add_skill(self, skill):
@@ -86,7 +123,7 @@ class Job:
 
         print(f"Adding skill '{skill}'")  # Debug log
         self.skills.append(skill)
-        success = DynamoDB.update_item('Jobs', {'job_id': self.job_id}, {'skills': self.skills})
+        success = self._update({'skills': self.skills})
 
         if success:
             print(f"Skill '{skill}' added successfully.")  # Debug log
@@ -98,21 +135,21 @@ class Job:
     def remove_skill(self, skill):
         if skill in self.skills:
             self.skills.remove(skill)
-            success = DynamoDB.update_item('Jobs', {'job_id': self.job_id}, {'skills': self.skills})
+            success = self._update({'skills': self.skills})
             return success, "Skill removed successfully"
         return False, "Skill not found"
 
     def add_certification(self, certification):
         if certification not in self.certifications:
             self.certifications.append(certification)
-            success = DynamoDB.update_item('Jobs', {'job_id': self.job_id}, {'certifications': self.certifications})
+            success = self._update({'certifications': self.certifications})
             return success, certification
         return False, "Certification already exists"
 
     def remove_certification(self, certification):
         if certification in self.certifications:
             self.certifications.remove(certification)
-            success = DynamoDB.update_item('Jobs', {'job_id': self.job_id}, {'certifications': self.certifications})
+            success = self._update({'certifications': self.certifications})
             return success, "Certification removed successfully"
         return False, "Certification not found"
 
@@ -125,7 +162,7 @@ class Job:
 
         print(f"Adding work history entry: {occupation} - {duration} months")  # Debug log
         self.work_history.append({'occupation': occupation, 'duration': duration})
-        success = DynamoDB.update_item('Jobs', {'job_id': self.job_id}, {'work_history': self.work_history})
+        success = self._update({'work_history': self.work_history})
 
         if success:
             print(f"Work history entry '{occupation} - {duration} months' added successfully.")  # Debug log
@@ -143,7 +180,7 @@ class Job:
 
         if entry_to_remove:
             self.work_history.remove(entry_to_remove)
-            success = DynamoDB.update_item('Jobs', {'job_id': self.job_id}, {'work_history': self.work_history})
+            success = self._update({'work_history': self.work_history})
             if success:
                 return True, f"Work history entry '{occupation} - {duration} months' removed successfully."
             else:
@@ -152,7 +189,10 @@ class Job:
 
     def update_fields(self, fields):
         try:
-            success = DynamoDB.update_item('Jobs', {'job_id': self.job_id}, fields)
+            values = dict(fields)
+            if 'is_active' in values:
+                values['active_partition'] = Job.ACTIVE_PARTITION if values['is_active'] else None
+            success = self._update(values)
             if success:
                 for key, value in fields.items():
                     setattr(self, key, value)
@@ -171,36 +211,88 @@ class Job:
         response = DynamoDB.scan(
             'Jobs',
             FilterExpression='is_active = :active',
-            ExpressionAttributeValues={':active': True}
+            ExpressionAttributeValues={':active': True},
+            segments=DynamoDB.PARALLEL_SCAN_SEGMENTS
         )
         jobs = [Job(**item) for item in response.get('Items', [])]
         # Sort jobs by date_posted descending
         sorted_jobs = sorted(jobs, key=lambda x: x.date_posted, reverse=True)
         return sorted_jobs
 
+    @staticmethod
+    def page(cursor=None, limit=10):
+        """
+        One page of active jobs, newest first, read from the active index so the cost
+        follows the page size rather than the number of jobs.
+
+        cursor is None for the first page or a cursor returned by an earlier call.
+        Returns (jobs, next_cursor, prev_cursor); a cursor is None when there is no such page.
+        """
+        position = Job._decode_cursor(cursor)
+        newer = position is not None and position[0] == 'prev'
+        # One item past the page tells whether there is another page beyond it
+        items, last_key = DynamoDB.query_page('Jobs', Job.ACTIVE_PARTITION, limit + 1,
+                                              start_key=position[1] if position else None,
+                                              index_name=Job.ACTIVE_INDEX, scan_forward=newer)
+        if items is None:
+            return [], None, None
+        more = len(items) > limit or last_key is not None
+        items = items[:limit]
+
+        if newer:
+            if not more and len(items) < limit:
+                # Fewer than a page of newer jobs left, so show the newest page
+                return Job.page(None, limit)
+            # Read towards newer jobs from the top of the current page, so flip the order
+            items.reverse()
+            return ([Job(**item) for item in items], Job._encode_cursor('next', items[-1]),
+                    Job._encode_cursor('prev', items[0]) if more else None)
+
+        next_cursor = Job._encode_cursor('next', items[-1]) if items and more else None
+        prev_cursor = Job._encode_cursor('prev', items[0]) if items and position else None
+        return [Job(**item) for item in items], next_cursor, prev_cursor
+
+    @staticmethod
+    def _encode_cursor(direction, item):
+        # A LastEvaluatedKey of the index holds the table key and the index key
+        key = {name: item[name] for name in ('job_id', 'active_partition', 'date_posted')}
+        return Job._cursor_serializer.dumps([direction, key])
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        """(direction, start key) of a cursor from _encode_cursor, or None for a missing or bad one."""
+        if not cursor:
+            return None
+        try:
+            direction, key = Job._cursor_serializer.loads(cursor)
+        except (BadSignature, TypeError, ValueError):
+            return None
+        if direction not in ('next', 'prev') or not isinstance(key, dict):
+            return None
+        return direction, key
+
     @staticmethod
     def get_by_id(job_id):
         """
-        Retrieve a job by its ID.
+        Retrieve a job by its ID, from the JobCatalogue when it has it.
         """
-        item = DynamoDB.get_item('Jobs', {'job_id': job_id})
-        if item:
-            return Job(**item)
-        return None
+        return IdentityMap.get('Jobs', job_id, Job._fetch_many)
 
     def get_applications(self):
-        """Get all applications for this job with user details"""
+        """Get all applications for this job with user details, or None if they couldn't be read"""
         from .user_model import User  # Import here to avoid circular imports
 
-        response = DynamoDB.scan(
-            'Applications',
-            FilterExpression='job_id = :job_id',
-            ExpressionAttributeValues={':job_id': self.job_id}
-        )
+        items = DynamoDB.query_index('Applications', 'job_id-index', {'job_id': self.job_id})
+        if items is None:
+            return None
+        users = User.get_many([item['user_id'] for item in items])
+        if users is None:
+            return None
+        users = {user.user_id: user for user in users}
 
         applications = []
-        for item in response.get('Items', []):
-            user = User.get_by_id(item['user_id'])
+        for item in items:
+            user = users.get(item['user_id'])
             if user:
                 applications.append({
                     'application': {
@@ -215,7 +307,8 @@ class Job:
                         'last_name': user.last_name,
                         'email': user.email,
                         'profile_picture_url': user.profile_picture_url,
-                        'skills': user.skills
+                        'skills': user.skills,
+                        'work_history': user.work_history
                     }
                 })
         return applications
\ No newline at end of file
@@ -1,12 +1,17 @@
 from datetime import datetime, timezone
+import logging
 import uuid
 from ..services.database_service import DynamoDB
+from .conversation_summary_model import ConversationSummary
 
 
 class Message:
+    # Partitioned by conversation_id and sorted by message_key, see index_catalogue
+    TABLE = 'ConversationMessages'
+
     def __init__(self, message_id=None, sender_id=None, receiver_id=None,
                  sender_type=None, content=None, timestamp=None, is_read=False,
-                 job_id=None):
+                 job_id=None, conversation_id=None, message_key=None):
         self.message_id = message_id or str(uuid.uuid4())
         self.sender_id = sender_id
         self.receiver_id = receiver_id
@@ -21,82 +26,75 @@ class Message:
 
         self.is_read = is_read
         self.job_id = job_id
+        self.conversation_id = conversation_id or Message.conversation_id_for(sender_id, receiver_id, job_id)
+        self.message_key = message_key or f"{self.timestamp}#{self.message_id}"
 
-    def save(self):
-        return DynamoDB.put_item('Messages', self.to_dict())
+    @staticmethod
+    def conversation_id_for(participant_id, other_participant_id, job_id=None):
+        """Same id whichever side sends, one conversation per user/employer pair and job."""
+        return f"{Message.pair_prefix(participant_id, other_participant_id)}{job_id or 'general'}"
 
     @staticmethod
-    def get_conversation(user_id, employer_id, job_id=None):
-        response = DynamoDB.scan(
-            'Messages',
-            FilterExpression=(
-                '(sender_id = :user_id AND receiver_id = :employer_id) OR '
-                '(sender_id = :employer_id AND receiver_id = :user_id)'
-            ),
-            ExpressionAttributeValues={
-                ':user_id': user_id,
-                ':employer_id': employer_id
-            }
-        )
+    def pair_prefix(participant_id, other_participant_id):
+        """The start shared by the ids of every conversation between two participants."""
+        first, second = sorted([participant_id or '', other_participant_id or ''])
+        return f"{first}#{second}#"
 
-        messages = [Message(**item) for item in response.get('Items', [])]
+    @staticmethod
+    def conversation_ids(user_id, employer_id, job_id=None):
+        """
+        The conversation about job_id, or with no job_id every conversation between the pair
+        (their general chat and one per job), found through the user's inbox rows.
+        """
         if job_id:
-            messages = [m for m in messages if m.job_id == job_id]
-
-        # Sort messages in ascending order (oldest first)
-        return sorted(messages, key=lambda x: x.timestamp)
-
-    def mark_as_read(self):
-        self.is_read = True
-        DynamoDB.update_item(
-            'Messages',
-            {'message_id': self.message_id},
-            {'is_read': True}
-        )
+            return [Message.conversation_id_for(user_id, employer_id, job_id)]
+        items = DynamoDB.query_range(ConversationSummary.TABLE, user_id,
+                                     prefix=Message.pair_prefix(user_id, employer_id))
+        conversation_ids = {item['conversation_id'] for item in items or []}
+        conversation_ids.add(Message.conversation_id_for(user_id, employer_id))
+        return sorted(conversation_ids)
 
-    @staticmethod
-    def get_unread_count(user_id, user_type):
-        response = DynamoDB.scan(
-            'Messages',
-            FilterExpression='receiver_id = :user_id AND is_read = :is_read',
-            ExpressionAttributeValues={
-                ':user_id': user_id,
-                ':is_read': False
-            }
-        )
-        return len(response.get('Items', []))
+    def save(self):
+        saved = DynamoDB.put_item(Message.TABLE, self.to_dict())
+        if saved and not ConversationSummary.record_message(self):
+            # The message itself is stored; scripts/rebuild_conversation_summaries.py repairs the inbox rows
+            logging.error(f"Conversation summaries not updated for message {self.message_id}")
+        return saved
 
     @staticmethod
-    def get_new_messages(user_id, last_check, user_type=None):
+    def get_conversation(user_id, employer_id, job_id=None, before=None, limit=None, conversation_ids=None):
         """
-        Get new messages, properly handling sender_type for both users and employers.
+        Messages between a user and an employer about job_id, or with no job_id all their
+        messages across conversations, oldest first.
 
-        Args:
-            user_id: The ID of the user/employer
-            last_check: Timestamp to check messages after
-            user_type: Type of the user ('user' or 'employer')
+        With limit, only the newest `limit` messages are read; pass the message_key of the
+        oldest one as `before` to get the page preceding it. Callers that already have
+        conversation_ids(user_id, employer_id, job_id) can pass them to skip that lookup.
         """
-        response = DynamoDB.scan(
-            'Messages',
-            FilterExpression='(sender_id = :user_id OR receiver_id = :user_id) AND #ts > :last_check',
-            ExpressionAttributeValues={
-                ':user_id': user_id,
-                ':last_check': last_check
-            },
-            ExpressionAttributeNames={
-                '#ts': 'timestamp'
-            }
-        )
+        if conversation_ids is None:
+            conversation_ids = Message.conversation_ids(user_id, employer_id, job_id)
+        items = []
+        for conversation_id in conversation_ids:
+            items.extend(DynamoDB.query_range(
+                Message.TABLE,
+                conversation_id,
+                before=before,
+                scan_forward=False,
+                limit=limit
+            ) or [])
+        # message_key starts with the timestamp, so it orders messages across conversations too
+        items.sort(key=lambda item: item['message_key'], reverse=True)
+        if limit:
+            items = items[:limit]
+        return [Message(**item) for item in reversed(items)]
 
-        messages = []
-        for item in response.get('Items', []):
-            message = Message(**item)
-            # If this message was sent by the current user, ensure sender_type is correct
-            if message.sender_id == user_id:
-                message.sender_type = user_type
-            messages.append(message)
-
-        return messages
+    def mark_as_read(self):
+        self.is_read = True
+        DynamoDB.update_item(
+            Message.TABLE,
+            {'conversation_id': self.conversation_id, 'message_key': self.message_key},
+            {'is_read': True}
+        )
 
     def to_dict(self):
         return {
@@ -107,5 +105,7 @@ class Message:
             'content': self.content,
             'timestamp': self.timestamp,
             'is_read': self.is_read,
-            'job_id': self.job_id
+            'job_id': self.job_id,
+            'conversation_id': self.conversation_id,
+            'message_key': self.message_key
         }
\ No newline at end of file
@@ -3,6 +3,8 @@ import uuid
 from flask import request
 
 from ..services.database_service import DynamoDB
+from ..services.session_service import SessionManager
+from ..services.identity_map import IdentityMap
 import secrets
 import datetime
 
@@ -39,12 +41,15 @@ class User:
 
     def increment_failed_attempts(self):
         self.failed_login_attempts += 1
-        if self.failed_login_attempts >= 5:
+        locked = not self.account_locked and self.failed_login_attempts >= 5
+        if locked:
             self.account_locked = True
         DynamoDB.update_item('Users',
                              {'user_id': self.user_id},
                              {'failed_login_attempts': self.failed_login_attempts,
                               'account_locked': self.account_locked})
+        if locked:
+            SessionManager.bump_epoch(self.user_id, 'user')
 
     def reset_failed_attempts(self):
         self.failed_login_attempts = 0
@@ -58,6 +63,8 @@ class User:
         DynamoDB.update_item('Users',
                              {'user_id': self.user_id},
                              {'account_locked': True})
+        # Locking ends the account's sessions
+        SessionManager.bump_epoch(self.user_id, 'user')
 
     def unlock_account(self):
         self.account_locked = False
@@ -75,10 +82,20 @@ class User:
 
     @staticmethod
     def get_by_id(user_id):
-        item = DynamoDB.get_item('Users', {'user_id': user_id})
-        if item:
-            return User(**item)
-        return None
+        return IdentityMap.get('Users', user_id, User._fetch_many)
+
+    @staticmethod
+    def get_many(user_ids):
+        """Retrieve several users with batched reads, in the order of user_ids, or None if the read failed."""
+        users = IdentityMap.get_many('Users', user_ids, User._fetch_many)
+        return [user for user in users if user] if users is not None else None
+
+    @staticmethod
+    def _fetch_many(user_ids):
+        items = DynamoDB.batch_get('Users', [{'user_id': user_id} for user_id in user_ids])
+        if items is None:
+            return None
+        return [User(**item) if item else None for item in items]
 
     def generate_verification_token(self):
         token = secrets.token_urlsafe(32)
@@ -93,16 +110,11 @@ class User:
 
     @staticmethod
     def verify_account(token):
-        response = DynamoDB.scan(
-            'Users',
-            FilterExpression='verification_token = :token AND is_active = :inactive',
-            ExpressionAttributeValues={
-                ':token': token,
-                ':inactive': False
-            }
-        )
-        if response['Items']:
-            user_data = response['Items'][0]
+        items = DynamoDB.query_index('Users', 'verification_token-index',
+                                     {'verification_token': token},
+                                     filter_values={'is_active': False})
+        if items:
+            user_data = items[0]
             token_expiration = datetime.datetime.fromisoformat(user_data['verification_token_expiration'])
             if datetime.datetime.utcnow() > token_expiration:
                 return False, "Verification token has expired."
@@ -129,13 +141,16 @@ class User:
 
     @staticmethod
     def get_by_reset_token(token):
-        response = DynamoDB.scan('Users',
-                                 FilterExpression='reset_token = :token',
-                                 ExpressionAttributeValues={':token': token})
-        if response['Items']:
-            return User(**response['Items'][0])
+        items = DynamoDB.query_index('Users', 'reset_token-index', {'reset_token': token})
+        if items:
+            return User(**items[0])
         return None
 
+    def rehash_password(self, new_password):
+        """Store a new hash of the current password, unless the password was changed since this object was read."""
+        if DynamoDB.replace_value('Users', {'user_id': self.user_id}, 'password', self.password, new_password):
+            self.password = new_password
+
     def update_password(self, new_password):
         DynamoDB.update_item('Users',
                              {'user_id': self.user_id},
@@ -143,6 +158,8 @@ class User:
         self.password = new_password
         self.reset_token = None
         self.token_expiration = None
+        # Sessions opened with the old password end
+        SessionManager.bump_epoch(self.user_id, 'user')
 
     def add_certification(self, cert_id, url, filename, cert_type):
         cert = {'id': cert_id, 'url': url, 'filename': filename, 'type': cert_type}
@@ -1,11 +1,22 @@
+from config import Config
 from .database_service import DynamoDB
 from .email_service import send_reset_email
-from .session_service import SessionManager
+from .email_outbox import EmailOutbox
+from .session_service import SessionManager as DynamoDBSessionManager
+from .signed_session_service import SignedCookieSessionManager
+from .session_cache import SessionCache
 from .google_auth_service import GoogleAuthService
 
+# Config.SESSION_BACKEND picks the session store used by the app
+SessionManager = SignedCookieSessionManager if Config.SESSION_BACKEND == 'signed_cookie' else DynamoDBSessionManager
+
 __all__ = [
     'DynamoDB',
     'send_reset_email',
+    'EmailOutbox',
     'SessionManager',
+    'DynamoDBSessionManager',
+    'SignedCookieSessionManager',
+    'SessionCache',
     'GoogleAuthService'
 ]
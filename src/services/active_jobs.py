@@ -0,0 +1,134 @@
+# src/services/active_jobs.py
+
+import logging
+import threading
+import time
+
+from config import Config
+from .database_service import DynamoDB
+
+
+class ActiveJobs:
+    """
+    The worker's one scan of the active jobs, shared by everything built from all of them
+    (JobSearchService, RecommendationEngine, JobMatchingService), so they don't each scan
+    Jobs on their own schedule.
+
+    Consumers subscribe with on_load(items, writes), which builds their structures from a
+    fresh scan and then applies the Jobs writes that raced with it, and optionally
+    on_write(key, values) for every later write made through DynamoDB. The first
+    ensure_loaded() scans on the calling thread. Afterwards a snapshot older than
+    ACTIVE_JOBS_TTL_SECONDS is reloaded on one background thread while consumers keep
+    serving what they built from the previous one; consumers subscribed with
+    reload_on_write also get a reload after a Jobs write, at most every
+    ACTIVE_JOBS_MIN_RELOAD_SECONDS. A failed scan is retried after ACTIVE_JOBS_RETRY_SECONDS.
+
+    on_write runs under this class's lock, so consumers must not call back into it there.
+    """
+    _consumers = []  # (on_load, on_write)
+    _reload_on_write = False
+    _loaded_at = None  # monotonic time the last successful scan started
+    _stale = False  # a Jobs write asked for a reload
+    _loading = False
+    _pending = None  # writes seen while a load is running
+    _retry_at = 0.0
+    _lock = threading.Lock()
+    _load_lock = threading.Lock()
+
+    @classmethod
+    def subscribe(cls, on_load, on_write=None, reload_on_write=False):
+        with cls._lock:
+            cls._consumers.append((on_load, on_write))
+            cls._reload_on_write = cls._reload_on_write or reload_on_write
+
+    @classmethod
+    def ensure_loaded(cls):
+        """Load the consumers on first use; later, start a background reload when one is due."""
+        with cls._lock:
+            now = time.monotonic()
+            loaded_at = cls._loaded_at
+            start = False
+            if loaded_at is not None and not cls._loading and now >= cls._retry_at:
+                age = now - loaded_at
+                start = age >= Config.ACTIVE_JOBS_TTL_SECONDS or (
+                    cls._stale and age >= Config.ACTIVE_JOBS_MIN_RELOAD_SECONDS)
+                cls._loading = start
+
+        if loaded_at is None:
+            # Nothing to serve yet: one request scans, the others wait for it
+            with cls._load_lock:
+                if cls._loaded_at is None and time.monotonic() >= cls._retry_at:
+                    cls._load()
+        elif start:
+            threading.Thread(target=cls._reload, name='active-jobs', daemon=True).start()
+
+    @classmethod
+    def _reload(cls):
+        try:
+            with cls._load_lock:
+                cls._load()
+        finally:
+            with cls._lock:
+                cls._loading = False
+
+    @classmethod
+    def _load(cls):
+        """Scan the active jobs and hand them to every consumer; caller holds _load_lock."""
+        with cls._lock:
+            cls._pending = []
+            cls._stale = False
+            consumers = list(cls._consumers)
+        started = time.monotonic()
+        applied = [0] * len(consumers)
+        items = None
+        try:
+            response = DynamoDB.scan('Jobs', FilterExpression='is_active = :active',
+                                     ExpressionAttributeValues={':active': True},
+                                     segments=DynamoDB.PARALLEL_SCAN_SEGMENTS)
+            if response is None:
+                # Scan failed (already logged); consumers keep what they have
+                return
+            items = response.get('Items', [])
+            for i, (on_load, _) in enumerate(consumers):
+                with cls._lock:
+                    writes = list(cls._pending)
+                try:
+                    on_load(items, writes)
+                    applied[i] = len(writes)
+                except Exception as e:
+                    logging.error(f"Building from the active jobs failed: {str(e)}")
+        finally:
+            with cls._lock:
+                # Writes that arrived after a consumer took its share go to what it built (or kept)
+                for (_, on_write), count in zip(consumers, applied):
+                    for key, values in cls._pending[count:]:
+                        cls._forward(on_write, key, values)
+                cls._pending = None
+                if items is None:
+                    cls._stale = True
+                    cls._retry_at = time.monotonic() + Config.ACTIVE_JOBS_RETRY_SECONDS
+                else:
+                    cls._loaded_at = started
+
+    @classmethod
+    def on_write(cls, key, values):
+        with cls._lock:
+            if cls._reload_on_write:
+                cls._stale = True
+            if cls._pending is not None:
+                cls._pending.append((key, values))
+                return
+            for _, on_write in cls._consumers:
+                cls._forward(on_write, key, values)
+
+    @staticmethod
+    def _forward(on_write, key, values):
+        if on_write is None:
+            return
+        try:
+            on_write(key, values)
+        except Exception as e:
+            logging.error(f"Applying a Jobs write to the active jobs failed: {str(e)}")
+
+
+DynamoDB.add_write_listener('Jobs', ActiveJobs.on_write)
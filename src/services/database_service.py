@@ -1,9 +1,55 @@
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
-from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import BotoCoreError, ClientError
 import logging
 
+from config import Config
+from .index_catalogue import TABLES, get_index, index_key_attributes, primary_key
+
 class DynamoDB:
-    dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
+    REGION = 'ap-southeast-2'
+    # DYNAMODB_ENDPOINT_URL points the app at a local DynamoDB stand-in; None means AWS
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=Config.DYNAMODB_ENDPOINT_URL)
+
+    # Number of Segment/TotalSegments workers used for full-table reads
+    PARALLEL_SCAN_SEGMENTS = Config.DYNAMODB_SCAN_SEGMENTS
+
+    # BatchGetItem accepts at most 100 keys per call
+    BATCH_GET_LIMIT = 100
+    BATCH_GET_MAX_RETRIES = 5
+    BATCH_GET_BACKOFF_SECONDS = 0.05
+
+    # Threads shared by every segmented scan in the process; each keeps its own boto3 resource.
+    # Scans asking for more segments than there are threads read the extra segments in turn
+    SCAN_POOL_WORKERS = max(PARALLEL_SCAN_SEGMENTS * 4, 8)
+
+    _local = threading.local()
+    _write_listeners = {}
+    _scan_executor = None
+    _scan_executor_lock = threading.Lock()
+
+    @classmethod
+    def add_write_listener(cls, table_name, listener):
+        """
+        Register listener(key, values), called after every successful put_item, update_item
+        or delete_item on table_name. values is the written item for put_item, the updated
+        attributes for update_item and None for delete_item.
+        """
+        cls._write_listeners.setdefault(table_name, []).append(listener)
+
+    @classmethod
+    def _notify_write(cls, table_name, key, values):
+        for listener in cls._write_listeners.get(table_name, []):
+            try:
+                listener(key, values)
+            except Exception as e:
+                logging.error(f"Write listener for {table_name} failed: {str(e)}")
 
     @classmethod
     def get_item(cls, table_name, key):
@@ -18,88 +64,536 @@ class DynamoDB:
     @classmethod
     def put_item(cls, table_name, item):
         table = cls.dynamodb.Table(table_name)
+        # GSI key attributes can't be NULL, leaving them out keeps the index sparse
+        sparse_attributes = index_key_attributes(table_name)
+        item = {k: v for k, v in item.items() if v is not None or k not in sparse_attributes}
         try:
             table.put_item(Item=item)
+            if table_name in TABLES:
+                cls._notify_write(table_name, {name: item.get(name) for name in primary_key(table_name)}, item)
             return True
         except ClientError as e:
             logging.error(f"Error putting item into {table_name}: {str(e)}")
             return False
 
     @classmethod
-    def update_item(cls, table_name, key, update_values, attribute_names=None):
+    def update_item(cls, table_name, key, update_values, attribute_names=None, remove=()):
+        # remove names attributes to delete from the item altogether
         table = cls.dynamodb.Table(table_name)
+        sparse_attributes = index_key_attributes(table_name)
 
-        # Handle reserved keywords if attribute_names is provided
+        set_clauses = []
+        remove_clauses = list(remove)
+        expression_attribute_values = {}
+        for k, v in update_values.items():
+            # Handle reserved keywords if attribute_names is provided
+            attribute_name = attribute_names.get(k, k) if attribute_names else k
+            if v is None and attribute_name in sparse_attributes:
+                # GSI key attributes can't hold NULL, so remove them and the item drops out of the index
+                remove_clauses.append(k)
+            else:
+                placeholder = f":{k.replace('#', '')}"
+                set_clauses.append(f"{k} = {placeholder}")
+                expression_attribute_values[placeholder] = v
+
+        update_expression = ""
+        if set_clauses:
+            update_expression = "SET " + ", ".join(set_clauses)
+        if remove_clauses:
+            update_expression += (" " if update_expression else "") + "REMOVE " + ", ".join(remove_clauses)
+
+        update_kwargs = {
+            'Key': key,
+            'UpdateExpression': update_expression
+        }
+        if expression_attribute_values:
+            update_kwargs['ExpressionAttributeValues'] = expression_attribute_values
         if attribute_names:
-            # Use the attribute names mapping for the update expression
-            update_expression = "SET " + ", ".join(f"{k} = :{k.replace('#', '')}" for k in update_values.keys())
-            expression_attribute_values = {f":{k.replace('#', '')}": v for k, v in update_values.items()}
+            update_kwargs['ExpressionAttributeNames'] = attribute_names
+
+        try:
+            table.update_item(**update_kwargs)
+            changes = {(attribute_names.get(k, k) if attribute_names else k): v for k, v in update_values.items()}
+            changes.update({(attribute_names.get(k, k) if attribute_names else k): None for k in remove})
+            cls._notify_write(table_name, key, changes)
+            return True
+        except ClientError as e:
+            logging.error(f"Error updating item in {table_name}: {str(e)}")
+            return False
+
+    @classmethod
+    def update_counters(cls, table_name, key, increments=None, set_values=None, only_if_exists=False,
+                        return_values='NONE'):
+        """
+        Atomically ADD the numbers in increments (negative to decrement) and SET set_values
+        in one UpdateItem, creating the item if needed unless only_if_exists is set.
+
+        Returns the Attributes asked for with return_values ({} when none, or when
+        only_if_exists found no item), or None on error. Write listeners get set_values only,
+        since the counters' new values aren't known without reading them back.
+        """
+        names = {}
+        values = {}
+        clauses = []
+        for prefix, action, attributes in ((':s', 'SET', set_values), (':a', 'ADD', increments)):
+            parts = []
+            for i, (name, value) in enumerate((attributes or {}).items()):
+                names[f"#{prefix[1]}{i}"] = name
+                values[f"{prefix}{i}"] = value
+                parts.append(f"#{prefix[1]}{i} = {prefix}{i}" if action == 'SET' else f"#{prefix[1]}{i} {prefix}{i}")
+            if parts:
+                clauses.append(f"{action} " + ", ".join(parts))
+
+        if only_if_exists:
+            names['#k'] = next(iter(key))
+
+        update_kwargs = {
+            'Key': key,
+            'UpdateExpression': " ".join(clauses),
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': values,
+            'ReturnValues': return_values
+        }
+        if only_if_exists:
+            update_kwargs['ConditionExpression'] = 'attribute_exists(#k)'
+
+        table = cls.dynamodb.Table(table_name)
+        try:
+            response = table.update_item(**update_kwargs)
+        except ClientError as e:
+            if only_if_exists and e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return {}
+            logging.error(f"Error updating counters in {table_name}: {str(e)}")
+            return None
+        cls._notify_write(table_name, key, dict(set_values or {}))
+        return response.get('Attributes', {})
 
+    @classmethod
+    def replace_value(cls, table_name, key, attribute, expected, value):
+        """
+        Set one attribute to value only while it still holds expected. Returns True when
+        written, False when the item changed in the meantime (or is gone), or on error.
+        """
+        table = cls.dynamodb.Table(table_name)
+        try:
+            table.update_item(
+                Key=key,
+                UpdateExpression='SET #a = :value',
+                ConditionExpression='#a = :expected',
+                ExpressionAttributeNames={'#a': attribute},
+                ExpressionAttributeValues={':value': value, ':expected': expected}
+            )
+            cls._notify_write(table_name, key, {attribute: value})
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                logging.error(f"Error updating {attribute} in {table_name}: {str(e)}")
+            return False
+
+    @classmethod
+    def claim_item(cls, table_name, key, lease_attribute, lease_until, now):
+        """
+        Take a lease on an existing item by setting lease_attribute to lease_until, unless
+        another caller holds one that runs past now. Both are ISO timestamps. Returns True
+        when the lease was taken, False when the item is gone, already leased, or on error.
+        """
+        table = cls.dynamodb.Table(table_name)
+        try:
+            table.update_item(
+                Key=key,
+                UpdateExpression='SET #lease = :until',
+                ConditionExpression='attribute_exists(#k) AND (attribute_not_exists(#lease) OR #lease <= :now)',
+                ExpressionAttributeNames={'#lease': lease_attribute, '#k': next(iter(key))},
+                ExpressionAttributeValues={':until': lease_until, ':now': now}
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                logging.error(f"Error claiming item in {table_name}: {str(e)}")
+            return False
+
+    @classmethod
+    def _thread_table(cls, table_name):
+        """
+        boto3 resources are not thread safe, so every scan pool thread gets its own, created
+        on the thread's first scan and reused for the rest of the process.
+        """
+        resource = getattr(cls._local, 'dynamodb', None)
+        if resource is None:
+            resource = boto3.session.Session().resource('dynamodb', region_name=cls.REGION,
+                                                        endpoint_url=Config.DYNAMODB_ENDPOINT_URL)
+            cls._local.dynamodb = resource
+        return resource.Table(table_name)
+
+    @staticmethod
+    def _scan_pages(table, scan_kwargs, segment=None, total_segments=None):
+        """
+        Yield one list of items per page, following LastEvaluatedKey until the
+        (segment of the) table has been read completely.
+        """
+        kwargs = dict(scan_kwargs)
+        if total_segments:
+            kwargs['Segment'] = segment
+            kwargs['TotalSegments'] = total_segments
+
+        while True:
+            response = table.scan(**kwargs)
+            yield response.get('Items', [])
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            kwargs['ExclusiveStartKey'] = last_key
+
+    @classmethod
+    def scan_iter(cls, table_name, FilterExpression=None, ExpressionAttributeValues=None,
+                  ExpressionAttributeNames=None, ProjectionExpression=None, segments=1):
+        """
+        Stream every item of a table.
+
+        With segments > 1 the table is split into that many Segment/TotalSegments
+        workers running on a thread pool; items are yielded as soon as any worker
+        has read a page, so the order is not stable between calls.
+        ClientError and BotoCoreError (timeouts, connection errors) are raised to the caller.
+        """
+        scan_kwargs = {}
+        if FilterExpression:
+            scan_kwargs['FilterExpression'] = FilterExpression
+        if ExpressionAttributeValues:
+            scan_kwargs['ExpressionAttributeValues'] = ExpressionAttributeValues
+        if ExpressionAttributeNames:
+            scan_kwargs['ExpressionAttributeNames'] = ExpressionAttributeNames
+        if ProjectionExpression:
+            scan_kwargs['ProjectionExpression'] = ProjectionExpression
+
+        if not segments or segments <= 1:
+            for page in cls._scan_pages(cls.dynamodb.Table(table_name), scan_kwargs):
+                yield from page
+            return
+
+        pages = queue.Queue(maxsize=segments * 2)
+        stop = threading.Event()
+        finished = object()
+
+        def put(value):
+            # Give up when the consumer has stopped reading instead of blocking forever
+            while not stop.is_set():
+                try:
+                    pages.put(value, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def worker(segment):
             try:
-                table.update_item(
-                    Key=key,
-                    UpdateExpression=update_expression,
-                    ExpressionAttributeValues=expression_attribute_values,
-                    ExpressionAttributeNames=attribute_names
-                )
-                return True
-            except ClientError as e:
-                logging.error(f"Error updating item in {table_name}: {str(e)}")
-                return False
-        else:
-            # Original behavior for backward compatibility
-            update_expression = "SET " + ", ".join(f"{k} = :{k}" for k in update_values.keys())
-            expression_attribute_values = {f":{k}": v for k, v in update_values.items()}
+                table = cls._thread_table(table_name)
+                for page in cls._scan_pages(table, scan_kwargs, segment, segments):
+                    if stop.is_set():
+                        return
+                    put(page)
+            except Exception as e:
+                put(e)
+            finally:
+                put(finished)
 
+        executor = cls._get_scan_executor()
+        try:
+            for segment in range(segments):
+                executor.submit(worker, segment)
+
+            remaining = segments
+            while remaining:
+                page = pages.get()
+                if page is finished:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield from page
+        finally:
+            stop.set()
+
+    @classmethod
+    def _get_scan_executor(cls):
+        if cls._scan_executor is None:
+            with cls._scan_executor_lock:
+                if cls._scan_executor is None:
+                    cls._scan_executor = ThreadPoolExecutor(max_workers=cls.SCAN_POOL_WORKERS,
+                                                            thread_name_prefix='dynamodb-scan')
+        return cls._scan_executor
+
+    @classmethod
+    def scan(cls, table_name, FilterExpression=None, ExpressionAttributeValues=None, ExpressionAttributeNames=None,
+             ProjectionExpression=None, segments=1):
+        """
+        Read the whole table (all pages) and return a response shaped dict
+        ({'Items': [...], 'Count': n}) so callers can keep using response.get('Items'),
+        or None (logged) when the scan failed.
+        """
+        try:
+            items = list(cls.scan_iter(table_name,
+                                       FilterExpression=FilterExpression,
+                                       ExpressionAttributeValues=ExpressionAttributeValues,
+                                       ExpressionAttributeNames=ExpressionAttributeNames,
+                                       ProjectionExpression=ProjectionExpression,
+                                       segments=segments))
+            return {'Items': items, 'Count': len(items)}
+        except (ClientError, BotoCoreError) as e:
+            logging.error(f"Error scanning table {table_name}: {str(e)}")
+            return None
+
+    @classmethod
+    def batch_get(cls, table_name, keys):
+        """
+        Fetch many items by primary key using BatchGetItem.
+
+        Keys are de-duplicated and sent in chunks of BATCH_GET_LIMIT; UnprocessedKeys
+        are retried with exponential backoff. Returns a list aligned with `keys`
+        (None where no item exists), so callers can rely on the input order, or None
+        when a chunk fails or still has unprocessed keys after BATCH_GET_MAX_RETRIES,
+        so a failed read doesn't look like missing items.
+        """
+        if not keys:
+            return []
+
+        key_names = sorted(keys[0].keys())
+
+        def identity(item):
+            return tuple(item[name] for name in key_names)
+
+        unique_keys = []
+        seen = set()
+        for key in keys:
+            if identity(key) not in seen:
+                seen.add(identity(key))
+                unique_keys.append(key)
+
+        found = {}
+        for start in range(0, len(unique_keys), cls.BATCH_GET_LIMIT):
+            request_items = {table_name: {'Keys': unique_keys[start:start + cls.BATCH_GET_LIMIT]}}
+            attempt = 0
+            while request_items:
+                try:
+                    response = cls.dynamodb.batch_get_item(RequestItems=request_items)
+                except ClientError as e:
+                    logging.error(f"Error batch getting items from {table_name}: {str(e)}")
+                    return None
+
+                for item in response.get('Responses', {}).get(table_name, []):
+                    found[identity(item)] = item
+
+                request_items = response.get('UnprocessedKeys') or {}
+                if request_items:
+                    attempt += 1
+                    if attempt > cls.BATCH_GET_MAX_RETRIES:
+                        logging.error(f"Giving up on unprocessed keys for {table_name} after {attempt - 1} retries")
+                        return None
+                    # Full jitter keeps concurrent callers from retrying in lockstep
+                    time.sleep(random.uniform(0, cls.BATCH_GET_BACKOFF_SECONDS * 2 ** attempt))
+
+        return [found.get(identity(key)) for key in keys]
+
+    @classmethod
+    def get_items(cls, keys):
+        """
+        Fetch single items from several tables in one BatchGetItem round trip.
+
+        keys is a list of distinct (table_name, key) pairs, at most BATCH_GET_LIMIT of them.
+        Returns the items aligned with keys (None where no item exists), or None on error,
+        so callers can tell a missing item from a failed read.
+        """
+        def identity(table_name, item):
+            return table_name, tuple(item[name] for name in primary_key(table_name))
+
+        request_items = {}
+        for table_name, key in keys:
+            request_items.setdefault(table_name, {'Keys': []})['Keys'].append(key)
+
+        found = {}
+        attempt = 0
+        while request_items:
             try:
-                table.update_item(
-                    Key=key,
-                    UpdateExpression=update_expression,
-                    ExpressionAttributeValues=expression_attribute_values
-                )
-                return True
+                response = cls.dynamodb.batch_get_item(RequestItems=request_items)
             except ClientError as e:
-                logging.error(f"Error updating item in {table_name}: {str(e)}")
-                return False
+                logging.error(f"Error batch getting items from {', '.join(request_items)}: {str(e)}")
+                return None
+
+            for table_name, items in response.get('Responses', {}).items():
+                for item in items:
+                    found[identity(table_name, item)] = item
+
+            request_items = response.get('UnprocessedKeys') or {}
+            if request_items:
+                attempt += 1
+                if attempt > cls.BATCH_GET_MAX_RETRIES:
+                    logging.error(f"Giving up on unprocessed keys for {', '.join(request_items)} after {attempt - 1} retries")
+                    return None
+                time.sleep(random.uniform(0, cls.BATCH_GET_BACKOFF_SECONDS * 2 ** attempt))
+
+        return [found.get(identity(table_name, key)) for table_name, key in keys]
 
     @classmethod
-    def scan(cls, table_name, FilterExpression=None, ExpressionAttributeValues=None, ExpressionAttributeNames=None):
+    def query_index(cls, table_name, index_name, key_values, filter_values=None, scan_forward=True, limit=None):
+        """
+        Equality lookup through a GSI declared in index_catalogue.
+
+        key_values names the index hash key (and optionally its range key), filter_values
+        are extra equality conditions applied as a FilterExpression. Returns every matching
+        item across all pages (or the first `limit`), or None on error.
+
+        If the index has not been provisioned yet the lookup falls back to a filtered scan,
+        so the code can be deployed before scripts/provision_dynamodb.py has been run. Any
+        other error, a malformed query included, is logged and returns None.
+        """
+        key_condition = None
+        for name, value in key_values.items():
+            condition = Key(name).eq(value)
+            key_condition = condition if key_condition is None else key_condition & condition
+
+        filter_condition = None
+        for name, value in (filter_values or {}).items():
+            condition = Attr(name).eq(value)
+            filter_condition = condition if filter_condition is None else filter_condition & condition
+
+        query_kwargs = {
+            'IndexName': index_name,
+            'KeyConditionExpression': key_condition,
+            'ScanIndexForward': scan_forward
+        }
+        if filter_condition is not None:
+            query_kwargs['FilterExpression'] = filter_condition
+
         table = cls.dynamodb.Table(table_name)
+        items = []
         try:
-            scan_kwargs = {}
-            if FilterExpression:
-                scan_kwargs['FilterExpression'] = FilterExpression
-            if ExpressionAttributeValues:
-                scan_kwargs['ExpressionAttributeValues'] = ExpressionAttributeValues
-            if ExpressionAttributeNames:
-                scan_kwargs['ExpressionAttributeNames'] = ExpressionAttributeNames
-
-            response = table.scan(**scan_kwargs)
-            return response
+            while True:
+                if limit:
+                    query_kwargs['Limit'] = limit
+                response = table.query(**query_kwargs)
+                items.extend(response.get('Items', []))
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key or (limit and len(items) >= limit):
+                    break
+                query_kwargs['ExclusiveStartKey'] = last_key
+            return items[:limit] if limit else items
         except ClientError as e:
-            print(f"Error scanning table {table_name}: {str(e)}")
+            if not cls._is_missing_index(e):
+                logging.error(f"Error querying {index_name} on {table_name}: {str(e)}")
+                return None
+            # Every call now reads the whole table until the index is provisioned, so make it loud
+            logging.error(f"Index {index_name} missing on {table_name}, falling back to a scan: {str(e)}")
+
+        return cls._scan_equal(table_name, index_name, {**key_values, **(filter_values or {})}, scan_forward, limit)
+
+    @staticmethod
+    def _is_missing_index(error):
+        """True for the errors a query gets when its table or index hasn't been created yet."""
+        code = error.response['Error']['Code']
+        message = error.response['Error'].get('Message', '')
+        return code == 'ResourceNotFoundException' or (
+            code == 'ValidationException' and 'does not have the specified index' in message)
+
+    @classmethod
+    def _scan_equal(cls, table_name, index_name, values, scan_forward=True, limit=None):
+        """Scan equivalent of query_index, ordered by the index range key like a query would be."""
+        filter_condition = None
+        for name, value in values.items():
+            condition = Attr(name).eq(value)
+            filter_condition = condition if filter_condition is None else filter_condition & condition
+
+        response = cls.scan(table_name, FilterExpression=filter_condition)
+        if response is None:
             return None
+        items = response.get('Items', [])
+
+        range_key = (get_index(table_name, index_name) or {}).get('range')
+        if range_key:
+            items.sort(key=lambda item: item.get(range_key, ''), reverse=not scan_forward)
+        return items[:limit] if limit else items
 
     @classmethod
-    def query_by_email(cls, table_name, email):
+    def query_range(cls, table_name, hash_value, before=None, after=None, index_name=None,
+                    scan_forward=True, limit=None, prefix=None, filter_condition=None):
+        """
+        Read one partition of a table (or of a GSI) in range key order.
+
+        Key names come from index_catalogue. before/after bound the range key exclusively,
+        or prefix keeps only range keys starting with it (it can't be combined with them).
+        scan_forward=False returns the highest range keys first, and limit stops after that
+        many items. filter_condition (a boto3 Attr condition) drops items server side; pages
+        are read until limit items pass it. Returns the items, or None on error.
+        """
+        schema = get_index(table_name, index_name) if index_name else TABLES[table_name]['key']
+        key_condition = Key(schema['hash']).eq(hash_value)
+        if prefix is not None:
+            key_condition = key_condition & Key(schema['range']).begins_with(prefix)
+        elif before is not None and after is not None:
+            # between is inclusive; the exclusive ends are trimmed below
+            key_condition = key_condition & Key(schema['range']).between(after, before)
+        elif before is not None:
+            key_condition = key_condition & Key(schema['range']).lt(before)
+        elif after is not None:
+            key_condition = key_condition & Key(schema['range']).gt(after)
+
+        query_kwargs = {'KeyConditionExpression': key_condition, 'ScanIndexForward': scan_forward}
+        if index_name:
+            query_kwargs['IndexName'] = index_name
+        if filter_condition is not None:
+            query_kwargs['FilterExpression'] = filter_condition
+
         table = cls.dynamodb.Table(table_name)
+        items = []
         try:
-            response = table.query(
-                IndexName='email-index',  # You'll need to create this secondary index
-                KeyConditionExpression='email = :email',
-                ExpressionAttributeValues={':email': email}
-            )
-            return response.get('Items')
+            while True:
+                if limit:
+                    query_kwargs['Limit'] = limit
+                response = table.query(**query_kwargs)
+                items.extend(item for item in response.get('Items', [])
+                             if item[schema['range']] not in (before, after))
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key or (limit and len(items) >= limit):
+                    break
+                query_kwargs['ExclusiveStartKey'] = last_key
+            return items[:limit] if limit else items
         except ClientError as e:
-            logging.error(f"Error querying {table_name} by email: {str(e)}")
+            logging.error(f"Error querying {index_name or 'primary key'} on {table_name}: {str(e)}")
             return None
 
+    @classmethod
+    def query_page(cls, table_name, hash_value, limit, start_key=None, index_name=None, scan_forward=True):
+        """
+        Read one page of a partition in range key order: at most limit items after
+        start_key (a LastEvaluatedKey from an earlier page). Returns (items, last_key);
+        last_key is None once the partition is exhausted, and items is None on error.
+        """
+        schema = get_index(table_name, index_name) if index_name else TABLES[table_name]['key']
+        query_kwargs = {
+            'KeyConditionExpression': Key(schema['hash']).eq(hash_value),
+            'ScanIndexForward': scan_forward,
+            'Limit': limit
+        }
+        if index_name:
+            query_kwargs['IndexName'] = index_name
+        if start_key:
+            query_kwargs['ExclusiveStartKey'] = start_key
+
+        try:
+            response = cls.dynamodb.Table(table_name).query(**query_kwargs)
+            return response.get('Items', []), response.get('LastEvaluatedKey')
+        except ClientError as e:
+            logging.error(f"Error reading a page of {index_name or 'primary key'} on {table_name}: {str(e)}")
+            return None, None
+
+    @classmethod
+    def query_by_email(cls, table_name, email):
+        return cls.query_index(table_name, 'email-index', {'email': email})
+
     @staticmethod
     def get_all_active_users():
         response = DynamoDB.scan(
             table_name='Users',
             FilterExpression='is_active = :active',
-            ExpressionAttributeValues={':active': True}
+            ExpressionAttributeValues={':active': True},
+            segments=DynamoDB.PARALLEL_SCAN_SEGMENTS
         )
         return response.get('Items', [])
 
@@ -108,21 +602,24 @@ class DynamoDB:
         response = DynamoDB.scan(
             table_name='Admins',
             FilterExpression='is_active = :active',
-            ExpressionAttributeValues={':active': True}
+            ExpressionAttributeValues={':active': True},
+            segments=DynamoDB.PARALLEL_SCAN_SEGMENTS
         )
         return response.get('Items', [])
 
     @staticmethod
     def get_all_users():
         response = DynamoDB.scan(
-            table_name='Users'
+            table_name='Users',
+            segments=DynamoDB.PARALLEL_SCAN_SEGMENTS
         )
         return response.get('Items', [])
 
     @staticmethod
     def get_all_admins():
         response = DynamoDB.scan(
-            table_name='Admins'
+            table_name='Admins',
+            segments=DynamoDB.PARALLEL_SCAN_SEGMENTS
         )
         return response.get('Items', [])
 
@@ -137,7 +634,7 @@ class DynamoDB:
             )
             return response
         except ClientError as e:
-            print(e.response['Error']['Message'])
+            logging.error(f"Error querying {index_name} on {table_name}: {str(e)}")
             return {}
 
     @classmethod
@@ -145,7 +642,7 @@ class DynamoDB:
         table = cls.dynamodb.Table(table_name)
         try:
             table.delete_item(Key=key)
-            print(f"delete action performed on {table_name}")
+            cls._notify_write(table_name, key, None)
             return True
         except ClientError as e:
             logging.error(f"Error deleting item from {table_name}: {str(e)}")
@@ -0,0 +1,168 @@
+# src/services/email_outbox.py
+
+import logging
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from boto3.dynamodb.conditions import Attr
+
+from config import Config
+from .database_service import DynamoDB
+from .email_transport import get_transport
+
+
+class EmailOutbox:
+    """
+    Durable queue of outgoing emails, so requests no longer wait on the Gmail API.
+
+    enqueue() writes the email to the EmailOutbox table and hands it to this worker's
+    sender threads, which send what is waiting in batches. A failed email is retried with
+    exponential backoff and moved to the 'dead' status after EMAIL_OUTBOX_MAX_ATTEMPTS.
+    Every worker also polls the table for due emails, which picks up retries and anything
+    left behind by a worker that stopped; a lease taken with DynamoDB.claim_item keeps two
+    workers from sending the same email.
+
+    Bodies carry reset and verification links, so they don't outlive the email: a sent
+    email is deleted, a dead one keeps only its recipient, subject and error, and every
+    row expires through the table's time to live after EMAIL_OUTBOX_RETENTION_HOURS.
+    """
+    TABLE = 'EmailOutbox'
+    STATUS_INDEX = 'status-index'
+    PENDING = 'pending'
+    DEAD = 'dead'
+    # How long a sender may hold an email before another worker can take it over
+    LEASE_SECONDS = 120
+
+    transport = None  # set on first use from Config.EMAIL_TRANSPORT; tests may assign a FakeTransport
+    _queue = queue.Queue()
+    _threads = []
+    _lock = threading.Lock()
+
+    @classmethod
+    def enqueue(cls, message):
+        """
+        Queue a {'to', 'subject', 'body'} email. Returns True once it is stored; if the
+        table can't be written the email is sent straight away and the result returned.
+        """
+        now = cls._now()
+        item = {
+            'outbox_id': str(uuid.uuid4()),
+            'status': cls.PENDING,
+            'next_attempt_at': now,
+            'created_at': now,
+            'attempts': 0,
+            'to': message['to'],
+            'subject': message['subject'],
+            'body': message['body'],
+            'expires_at': int(time.time()) + Config.EMAIL_OUTBOX_RETENTION_HOURS * 3600
+        }
+        if not DynamoDB.put_item(cls.TABLE, item):
+            logging.warning(f"Email outbox unavailable, sending to {message['to']} directly")
+            return cls._get_transport().send_batch([message])[0] is None
+
+        cls.start()
+        cls._queue.put(item)
+        return True
+
+    @classmethod
+    def start(cls):
+        """Start this process's sender threads and the poller, unless they are running."""
+        with cls._lock:
+            if cls._threads and all(thread.is_alive() for thread in cls._threads):
+                return
+            cls._threads = [threading.Thread(target=cls._send_loop, name=f'email-outbox-{i}', daemon=True)
+                            for i in range(Config.EMAIL_OUTBOX_WORKERS)]
+            cls._threads.append(threading.Thread(target=cls._poll_loop, name='email-outbox-poller', daemon=True))
+            for thread in cls._threads:
+                thread.start()
+
+    @classmethod
+    def dead_letters(cls):
+        """Emails that ran out of attempts, oldest first (recipient, subject and last_error; the body is gone)."""
+        return DynamoDB.query_range(cls.TABLE, cls.DEAD, index_name=cls.STATUS_INDEX) or []
+
+    @classmethod
+    def _get_transport(cls):
+        if cls.transport is None:
+            cls.transport = get_transport()
+        return cls.transport
+
+    @staticmethod
+    def _now(offset_seconds=0):
+        return (datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)).isoformat()
+
+    @classmethod
+    def _send_loop(cls):
+        while True:
+            batch = [cls._queue.get()]
+            while len(batch) < Config.EMAIL_OUTBOX_BATCH_SIZE:
+                try:
+                    batch.append(cls._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                cls._send(batch)
+            except Exception as e:
+                # The leases run out and the poller hands these emails out again
+                logging.error(f"Email outbox sender failed: {str(e)}")
+
+    @classmethod
+    def _send(cls, items):
+        now = cls._now()
+        lease_until = cls._now(cls.LEASE_SECONDS)
+        claimed = [item for item in items
+                   if DynamoDB.claim_item(cls.TABLE, {'outbox_id': item['outbox_id']}, 'lease_until', lease_until, now)]
+        if not claimed:
+            return
+
+        results = cls._get_transport().send_batch(
+            [{'to': item['to'], 'subject': item['subject'], 'body': item['body']} for item in claimed])
+        for item, error in zip(claimed, results):
+            key = {'outbox_id': item['outbox_id']}
+            if error is None:
+                DynamoDB.delete_item(cls.TABLE, key)
+                continue
+
+            attempts = int(item.get('attempts', 0)) + 1
+            if attempts >= Config.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                logging.error(f"Giving up on email {item['outbox_id']} to {item['to']} after {attempts} attempts: {error}")
+                DynamoDB.update_item(cls.TABLE, key, {'#status': cls.DEAD, 'attempts': attempts, 'last_error': str(error)},
+                                     attribute_names={'#status': 'status', '#body': 'body'}, remove=['#body'])
+                continue
+
+            # Exponential backoff with jitter; the lease keeps other workers off it until then
+            delay = min(Config.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), Config.EMAIL_OUTBOX_RETRY_MAX_SECONDS)
+            retry_at = cls._now(delay * random.uniform(1, 1.25))
+            logging.warning(f"Email {item['outbox_id']} failed (attempt {attempts}), retrying at {retry_at}: {error}")
+            DynamoDB.update_item(cls.TABLE, key, {
+                'attempts': attempts,
+                'next_attempt_at': retry_at,
+                'lease_until': retry_at,
+                'last_error': str(error)
+            })
+
+    @classmethod
+    def _poll_loop(cls):
+        while True:
+            time.sleep(Config.EMAIL_OUTBOX_POLL_SECONDS)
+            cls._poll()
+
+    @classmethod
+    def _poll(cls):
+        """Hand the senders due emails nobody holds a lease on, up to what they can take. Returns how many."""
+        wanted = Config.EMAIL_OUTBOX_BATCH_SIZE * Config.EMAIL_OUTBOX_WORKERS - cls._queue.qsize()
+        if wanted <= 0:
+            # The senders haven't caught up with the last poll yet
+            return 0
+        now = cls._now()
+        # Rows being sent hold a lease past now; without the filter they fill the page and starve the rest
+        claimable = Attr('lease_until').not_exists() | Attr('lease_until').lte(now)
+        due = DynamoDB.query_range(cls.TABLE, cls.PENDING, before=now, index_name=cls.STATUS_INDEX,
+                                   limit=wanted, filter_condition=claimable)
+        for item in due or []:
+            cls._queue.put(item)
+        return len(due or [])
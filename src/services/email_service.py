@@ -1,59 +1,51 @@
 from flask import url_for
-from email.mime.text import MIMEText
-import base64
 import logging
-from .google_auth_service import GoogleAuthService
-
-def send_reset_email(email, token, was_locked, role='user'):
-    logging.info("send_reset_email in email_service called")
-    try:
-        service = GoogleAuthService.get_gmail_service()
-
-        if role == 'user':
-            reset_link = url_for('user_views.reset_with_token', token=token, _external=True)
-            subject = 'User Password Reset Request'
-            prefix = "To reset your password"
-        elif role == 'employer':
-            reset_link = url_for('employer_views.reset_with_token', token=token, _external=True)
-            subject = 'Employer Password Reset Request'
-            prefix = "To reset your password"
-        elif role == 'admin':
-            reset_link = url_for('admin_views.reset_with_token', token=token, _external=True)
-            subject = 'Admin Password Reset Request'
-            prefix = "To reset your password"
-        else:
-            reset_link = url_for('landing.landing', _external=True)
-            subject = 'Password Reset Request'
-            prefix = "To reset your password"
-
-        unlock_message = " and unlock your account" if was_locked else ""
-        body = f'''{prefix}{unlock_message}, visit the following link:
+from .email_outbox import EmailOutbox
+
+# build_* return the email as {'to', 'subject', 'body'}; send_* queue it on the EmailOutbox,
+# whose workers deliver it, and return whether it was accepted
+
+def build_reset_email(email, token, was_locked, role='user'):
+    if role == 'user':
+        reset_link = url_for('user_views.reset_with_token', token=token, _external=True)
+        subject = 'User Password Reset Request'
+        prefix = "To reset your password"
+    elif role == 'employer':
+        reset_link = url_for('employer_views.reset_with_token', token=token, _external=True)
+        subject = 'Employer Password Reset Request'
+        prefix = "To reset your password"
+    elif role == 'admin':
+        reset_link = url_for('admin_views.reset_with_token', token=token, _external=True)
+        subject = 'Admin Password Reset Request'
+        prefix = "To reset your password"
+    else:
+        reset_link = url_for('landing.landing', _external=True)
+        subject = 'Password Reset Request'
+        prefix = "To reset your password"
+
+    unlock_message = " and unlock your account" if was_locked else ""
+    body = f'''{prefix}{unlock_message}, visit the following link:
 {reset_link}
 
 If you did not make this request then simply ignore this email and no changes will be made.
 '''
+    return {'to': email, 'subject': subject, 'body': body}
 
-        message = MIMEText(body)
-        message['to'] = email
-        message['subject'] = subject
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-
-        service.users().messages().send(userId='me', body={'raw': raw_message}).execute()
-        logging.info("Email sent successfully via Gmail API")
-        return True
+def send_reset_email(email, token, was_locked, role='user'):
+    logging.info("send_reset_email in email_service called")
+    try:
+        queued = EmailOutbox.enqueue(build_reset_email(email, token, was_locked, role))
+        logging.info("Reset email queued for delivery")
+        return queued
     except Exception as e:
-        logging.error(f"Error sending email via Gmail API: {str(e)}")
+        logging.error(f"Error queueing reset email: {str(e)}")
         logging.exception("Full traceback:")
         return False
 
-def send_verification_email(email, verification_link, role='user'):
-    logging.info("send_verification_email in email_service called")
-    try:
-        service = GoogleAuthService.get_gmail_service()
-
-        if role == 'user':
-            subject = 'Activate Your JobTrunk Account'
-            body = f'''Hello,
+def build_verification_email(email, verification_link, role='user'):
+    if role == 'user':
+        subject = 'Activate Your JobTrunk Account'
+        body = f'''Hello,
 
 Thank you for registering at JobTrunk! Please click the link below to verify your account:
 
@@ -64,9 +56,9 @@ If you did not register for this account, please ignore this email.
 Best regards,
 JobTrunk Team
 '''
-        elif role == 'employer':
-            subject = 'Activate Your Employer Account'
-            body = f'''Hello,
+    elif role == 'employer':
+        subject = 'Activate Your Employer Account'
+        body = f'''Hello,
 
 Thank you for registering as an employer at JobTrunk! Please click the link below to verify your account:
 
@@ -77,9 +69,9 @@ If you did not register for this account, please ignore this email.
 Best regards,
 JobTrunk Team
 '''
-        elif role == 'admin':
-            subject = 'Activate Your Admin Account'
-            body = f'''Hello,
+    elif role == 'admin':
+        subject = 'Activate Your Admin Account'
+        body = f'''Hello,
 
 Please click the link below to verify your admin account:
 
@@ -88,9 +80,9 @@ Please click the link below to verify your admin account:
 Best regards,
 JobTrunk Team
 '''
-        else:
-            subject = 'Account Verification'
-            body = f'''Hello,
+    else:
+        subject = 'Account Verification'
+        body = f'''Hello,
 
 Please verify your account by clicking the link below:
 
@@ -99,16 +91,15 @@ Please verify your account by clicking the link below:
 Best regards,
 JobTrunk Team
 '''
+    return {'to': email, 'subject': subject, 'body': body}
 
-        message = MIMEText(body)
-        message['to'] = email
-        message['subject'] = subject
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-
-        service.users().messages().send(userId='me', body={'raw': raw_message}).execute()
-        logging.info("Verification email sent successfully via Gmail API")
-        return True
+def send_verification_email(email, verification_link, role='user'):
+    logging.info("send_verification_email in email_service called")
+    try:
+        queued = EmailOutbox.enqueue(build_verification_email(email, verification_link, role))
+        logging.info("Verification email queued for delivery")
+        return queued
     except Exception as e:
-        logging.error(f"Error sending verification email via Gmail API: {str(e)}")
+        logging.error(f"Error queueing verification email: {str(e)}")
         logging.exception("Full traceback:")
-        return False
\ No newline at end of file
+        return False
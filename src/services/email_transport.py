@@ -0,0 +1,74 @@
+# src/services/email_transport.py
+
+import base64
+import logging
+import threading
+from email.mime.text import MIMEText
+
+from config import Config
+from .google_auth_service import GoogleAuthService
+
+
+class GmailTransport:
+    """Sends emails through the Gmail API, several per HTTP request."""
+    # Gmail accepts up to 100 calls per batch request but throttles large batches
+    MAX_BATCH_SIZE = 50
+
+    @staticmethod
+    def _raw(message):
+        mime = MIMEText(message['body'])
+        mime['to'] = message['to']
+        mime['subject'] = message['subject']
+        return base64.urlsafe_b64encode(mime.as_bytes()).decode('utf-8')
+
+    def send_batch(self, messages):
+        """
+        Send {'to', 'subject', 'body'} dicts; returns one entry per message, None when it
+        was sent or the error that stopped it.
+        """
+        results = [None] * len(messages)
+        start = 0
+        try:
+            service = GoogleAuthService.get_gmail_service()
+            for start in range(0, len(messages), self.MAX_BATCH_SIZE):
+                batch = service.new_batch_http_request()
+                for i in range(start, min(start + self.MAX_BATCH_SIZE, len(messages))):
+                    def callback(request_id, response, exception, i=i):
+                        results[i] = exception
+                    batch.add(service.users().messages().send(userId='me', body={'raw': self._raw(messages[i])}),
+                              callback=callback)
+                batch.execute()
+        except Exception as e:
+            logging.error(f"Error sending email batch via Gmail API: {str(e)}")
+            # Earlier batches went out; this one and the rest are retried
+            for i in range(start, len(messages)):
+                results[i] = results[i] or e
+        return results
+
+
+class FakeTransport:
+    """
+    Keeps emails in memory instead of sending them, for tests and local development.
+    Addresses in fail_for are rejected, to exercise retries and dead-lettering.
+    """
+    def __init__(self, fail_for=()):
+        self.sent = []
+        self.fail_for = set(fail_for)
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages):
+        results = []
+        with self._lock:
+            for message in messages:
+                if message['to'] in self.fail_for:
+                    results.append(RuntimeError(f"Fake delivery failure for {message['to']}"))
+                else:
+                    self.sent.append(dict(message))
+                    results.append(None)
+        logging.info(f"Fake transport accepted {results.count(None)} of {len(messages)} emails")
+        return results
+
+
+def get_transport():
+    """The transport picked by Config.EMAIL_TRANSPORT ('gmail' or 'fake')."""
+    return FakeTransport() if Config.EMAIL_TRANSPORT == 'fake' else GmailTransport()
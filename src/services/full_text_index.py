@@ -0,0 +1,599 @@
+# src/services/full_text_index.py
+
+import copy
+import functools
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import time
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\+\+|#)?")
+PHRASE_PATTERN = re.compile(r'"([^"]*)"')
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have if in into is it its of on or our so than that the their "
+    "then there these they this to was we were will with you your".split())
+# Positions skipped between fields, so a phrase can't match across the end of one field
+FIELD_GAP = 64
+# Terms a half-typed last word expands to, most common first
+PREFIX_EXPANSIONS = 20
+
+
+# Porter's stemming algorithm (1980): strips English suffixes so that "engineer",
+# "engineers" and "engineering" all index as "engin".
+
+def _is_consonant(word, i):
+    if word[i] in 'aeiou':
+        return False
+    if word[i] == 'y':
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(stem):
+    """m in Porter's [C](VC)^m[V]: how many vowel-consonant sequences stem has."""
+    m, i, n = 0, 0, len(stem)
+    while i < n and _is_consonant(stem, i):
+        i += 1
+    while i < n:
+        while i < n and not _is_consonant(stem, i):
+            i += 1
+        if i == n:
+            break
+        while i < n and _is_consonant(stem, i):
+            i += 1
+        m += 1
+    return m
+
+
+def _has_vowel(stem):
+    return any(not _is_consonant(stem, i) for i in range(len(stem)))
+
+
+def _ends_double_consonant(word):
+    return len(word) > 1 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1)
+
+
+def _ends_cvc(word):
+    return (len(word) > 2 and _is_consonant(word, len(word) - 3) and not _is_consonant(word, len(word) - 2)
+            and _is_consonant(word, len(word) - 1) and word[-1] not in 'wxy')
+
+
+def _replace_suffix(word, rules, min_measure):
+    # Only the longest matching suffix is considered, as in the original algorithm
+    for suffix, replacement in rules:
+        if word.endswith(suffix):
+            stem = word[:len(word) - len(suffix)]
+            return stem + replacement if _measure(stem) > min_measure else word
+    return word
+
+
+def _by_length(rules):
+    return sorted(rules, key=lambda rule: -len(rule[0]))
+
+
+_STEP2 = _by_length([
+    ('ational', 'ate'), ('tional', 'tion'), ('enci', 'ence'), ('anci', 'ance'), ('izer', 'ize'), ('bli', 'ble'),
+    ('alli', 'al'), ('entli', 'ent'), ('eli', 'e'), ('ousli', 'ous'), ('ization', 'ize'), ('ation', 'ate'),
+    ('ator', 'ate'), ('alism', 'al'), ('iveness', 'ive'), ('fulness', 'ful'), ('ousness', 'ous'), ('aliti', 'al'),
+    ('iviti', 'ive'), ('biliti', 'ble'), ('logi', 'log')])
+_STEP3 = _by_length([
+    ('icate', 'ic'), ('ative', ''), ('alize', 'al'), ('iciti', 'ic'), ('ical', 'ic'), ('ful', ''), ('ness', '')])
+_STEP4 = _by_length([(suffix, '') for suffix in (
+    'al', 'ance', 'ence', 'er', 'ic', 'able', 'ible', 'ant', 'ement', 'ment', 'ent', 'ion', 'ou', 'ism', 'ate',
+    'iti', 'ous', 'ive', 'ize')])
+
+
+@functools.lru_cache(maxsize=200000)
+def stem(word):
+    if len(word) <= 2 or not word.isalpha():
+        return word
+
+    # Step 1a: plurals
+    if word.endswith('sses') or word.endswith('ies'):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+
+    # Step 1b: -eed, -ed, -ing
+    if word.endswith('eed'):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ('ed', 'ing'):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(('at', 'bl', 'iz')):
+                    word += 'e'
+                elif _ends_double_consonant(word) and word[-1] not in 'lsz':
+                    word = word[:-1]
+                elif _measure(word) == 1 and _ends_cvc(word):
+                    word += 'e'
+                break
+
+    # Step 1c: y -> i
+    if word.endswith('y') and _has_vowel(word[:-1]):
+        word = word[:-1] + 'i'
+
+    word = _replace_suffix(word, _STEP2, 0)
+    word = _replace_suffix(word, _STEP3, 0)
+
+    # Step 4: -ion only goes after s or t
+    for suffix, _ in _STEP4:
+        if word.endswith(suffix):
+            base = word[:-len(suffix)]
+            if _measure(base) > 1 and (suffix != 'ion' or base.endswith(('s', 't'))):
+                word = base
+            break
+
+    # Step 5: final -e and -ll
+    if word.endswith('e'):
+        base = word[:-1]
+        if _measure(base) > 1 or (_measure(base) == 1 and not _ends_cvc(base)):
+            word = base
+    if word.endswith('ll') and _measure(word) > 1:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Lower-cased words of text with stopwords dropped, unstemmed."""
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+def analyze(text):
+    return [stem(token) for token in tokenize(text)]
+
+
+class Document:
+    """A document's terms: positions per term, BM25F-weighted frequency per term and weighted length."""
+    __slots__ = ('fingerprint', 'positions', 'frequencies', 'length')
+
+    def __init__(self, fields, item):
+        texts = [str(item.get(attribute) or '') for attribute, _ in fields]
+        self.fingerprint = fingerprint(texts)
+        self.positions = {}
+        self.frequencies = {}
+        self.length = 0.0
+        position = 0
+        for (_, weight), text in zip(fields, texts):
+            terms = analyze(text)
+            for term in terms:
+                self.positions.setdefault(term, []).append(position)
+                self.frequencies[term] = self.frequencies.get(term, 0.0) + weight
+                position += 1
+            self.length += weight * len(terms)
+            position += FIELD_GAP
+
+
+def fingerprint(texts):
+    """64-bit digest of a document's indexed text, to tell whether it needs indexing again."""
+    digest = hashlib.blake2b('\x1f'.join(texts).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+class Segment:
+    """
+    Immutable positional inverted index over a set of documents, stored as numpy arrays
+    that can be saved to and memory-mapped from one file.
+
+    Terms are sorted. Term t's postings are post_docs/post_tf[term_offsets[t]:term_offsets[t+1]],
+    ordered by document number, and posting p's positions are
+    positions[post_pos_offsets[p]:post_pos_offsets[p+1]].
+    """
+    MAGIC = b'JOBTXT01'
+    PREFIX = struct.Struct('<8sI')  # magic, length of the JSON header that follows
+    ARRAYS = {
+        'term_offsets': np.int64, 'term_text_offsets': np.int64, 'term_text': np.uint8,
+        'post_docs': np.int32, 'post_tf': np.float32, 'post_pos_offsets': np.int64, 'positions': np.int32,
+        'doc_lengths': np.float32, 'doc_fingerprints': np.int64, 'doc_id_offsets': np.int64, 'doc_id_text': np.uint8,
+    }
+
+    def __init__(self, arrays, built_at, buffer=None):
+        self.arrays = arrays
+        self.built_at = built_at
+        self._buffer = buffer  # keeps a memory map open while its arrays are in use
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self.terms = self._strings(self.term_text, self.term_text_offsets)
+        self.term_ids = {term: i for i, term in enumerate(self.terms)}
+        self.doc_ids = self._strings(self.doc_id_text, self.doc_id_offsets)
+        self.doc_id_array = np.array(self.doc_ids, dtype=object)
+
+    @staticmethod
+    def _strings(text, offsets):
+        data = bytes(text)
+        return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+    @staticmethod
+    def _string_arrays(strings):
+        encoded = [string.encode('utf-8') for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    @classmethod
+    def empty(cls):
+        return cls.merge(None, None, [])
+
+    @classmethod
+    def merge(cls, base, deleted, documents):
+        """
+        A new segment holding base's documents not flagged in deleted plus documents, a
+        list of (doc_id, Document). base may be None. Base postings are copied with array
+        operations, so only the new documents cost Python work.
+        """
+        if base is not None and len(base):
+            keep_docs = ~deleted
+            base_count = int(keep_docs.sum())
+            doc_numbers = np.cumsum(keep_docs) - 1
+            post_terms = np.repeat(np.arange(len(base.terms)), np.diff(base.term_offsets))
+            keep = keep_docs[base.post_docs]
+            base_terms = post_terms[keep]
+            base_docs = doc_numbers[base.post_docs[keep]]
+            base_tf = base.post_tf[keep]
+            base_starts = base.post_pos_offsets[:-1][keep]
+            base_lengths = np.diff(base.post_pos_offsets)[keep]
+            base_positions = np.asarray(base.positions)
+            term_names = base.terms
+            doc_ids = [doc_id for doc_id, kept in zip(base.doc_ids, keep_docs) if kept]
+            doc_lengths = [np.asarray(base.doc_lengths)[keep_docs]]
+            doc_fingerprints = [np.asarray(base.doc_fingerprints)[keep_docs]]
+        else:
+            base_count = 0
+            base_terms = base_docs = base_starts = base_lengths = np.zeros(0, dtype=np.int64)
+            base_tf = np.zeros(0, dtype=np.float32)
+            base_positions = np.zeros(0, dtype=np.int32)
+            term_names = []
+            doc_ids, doc_lengths, doc_fingerprints = [], [], []
+
+        # Terms of the new documents get ids after the base terms; everything is re-sorted below
+        extra_ids = {}
+        base_ids = base.term_ids if base is not None else {}
+        new_terms, new_docs, new_tf, new_lengths, new_positions = [], [], [], [], []
+        for number, (doc_id, document) in enumerate(documents, start=base_count):
+            doc_ids.append(doc_id)
+            for term, positions in document.positions.items():
+                term_id = base_ids.get(term)
+                if term_id is None:
+                    term_id = extra_ids.setdefault(term, len(term_names) + len(extra_ids))
+                new_terms.append(term_id)
+                new_docs.append(number)
+                new_tf.append(document.frequencies[term])
+                new_lengths.append(len(positions))
+                new_positions.extend(positions)
+        doc_lengths.append(np.array([document.length for _, document in documents], dtype=np.float32))
+        doc_fingerprints.append(np.array([document.fingerprint for _, document in documents], dtype=np.int64))
+
+        all_names = list(term_names) + sorted(extra_ids, key=extra_ids.get)
+        post_terms = np.concatenate([base_terms, np.array(new_terms, dtype=np.int64)])
+        post_docs = np.concatenate([base_docs, np.array(new_docs, dtype=np.int64)])
+        post_tf = np.concatenate([base_tf, np.array(new_tf, dtype=np.float32)])
+        pos_lengths = np.concatenate([base_lengths, np.array(new_lengths, dtype=np.int64)])
+        new_starts = len(base_positions) + np.concatenate([[0], np.cumsum(new_lengths)[:-1]]).astype(np.int64)
+        pos_starts = np.concatenate([base_starts, new_starts[:len(new_lengths)]])
+        all_positions = np.concatenate([base_positions, np.array(new_positions, dtype=np.int32)])
+
+        # Terms that lost all their postings are dropped; the rest are renumbered in sorted order
+        used = np.unique(post_terms)
+        names = [all_names[i] for i in used]
+        order_by_name = np.argsort(np.array(names, dtype=object)) if names else np.zeros(0, dtype=np.int64)
+        rank = np.zeros(len(all_names), dtype=np.int64)
+        rank[used[order_by_name]] = np.arange(len(used))
+        post_terms = rank[post_terms]
+        sorted_names = [names[i] for i in order_by_name]
+
+        order = np.lexsort((post_docs, post_terms))
+        post_terms, post_docs, post_tf = post_terms[order], post_docs[order], post_tf[order]
+        pos_lengths, pos_starts = pos_lengths[order], pos_starts[order]
+        post_pos_offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        post_pos_offsets[1:] = np.cumsum(pos_lengths)
+        # Gather every posting's positions into the new order in one indexing operation
+        gather = np.repeat(pos_starts - post_pos_offsets[:-1], pos_lengths) + np.arange(post_pos_offsets[-1])
+        term_offsets = np.searchsorted(post_terms, np.arange(len(sorted_names) + 1)).astype(np.int64)
+
+        term_text, term_text_offsets = cls._string_arrays(sorted_names)
+        doc_id_text, doc_id_offsets = cls._string_arrays(doc_ids)
+        arrays = {
+            'term_offsets': term_offsets, 'term_text_offsets': term_text_offsets, 'term_text': term_text,
+            'post_docs': post_docs.astype(np.int32), 'post_tf': post_tf.astype(np.float32),
+            'post_pos_offsets': post_pos_offsets, 'positions': all_positions[gather].astype(np.int32),
+            'doc_lengths': np.concatenate(doc_lengths).astype(np.float32),
+            'doc_fingerprints': np.concatenate(doc_fingerprints).astype(np.int64),
+            'doc_id_offsets': doc_id_offsets, 'doc_id_text': doc_id_text,
+        }
+        return cls(arrays, time.time())
+
+    def save(self, path):
+        """Write the segment to path atomically, so workers never map a half-written file."""
+        header = {'built_at': self.built_at, 'arrays': []}
+        offset = 0
+        for name, dtype in self.ARRAYS.items():
+            array = np.ascontiguousarray(self.arrays[name], dtype=dtype)
+            offset = -(-offset // 8) * 8
+            header['arrays'].append([name, offset, len(array)])
+            offset += array.nbytes
+        header_bytes = json.dumps(header).encode('utf-8')
+        data_start = -(-(self.PREFIX.size + len(header_bytes)) // 8) * 8
+
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(self.PREFIX.pack(self.MAGIC, len(header_bytes)))
+            f.write(header_bytes)
+            for (name, offset, _), dtype in zip(header['arrays'], self.ARRAYS.values()):
+                f.seek(data_start + offset)
+                f.write(np.ascontiguousarray(self.arrays[name], dtype=dtype).tobytes())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a segment written by save(); raises ValueError if the file isn't one."""
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(buffer) < cls.PREFIX.size:
+            raise ValueError(f"{path} is not a job text segment")
+        magic, header_length = cls.PREFIX.unpack_from(buffer, 0)
+        if magic != cls.MAGIC:
+            raise ValueError(f"{path} is not a job text segment")
+        header = json.loads(bytes(buffer[cls.PREFIX.size:cls.PREFIX.size + header_length]))
+        data_start = -(-(cls.PREFIX.size + header_length) // 8) * 8
+        arrays = {}
+        for name, offset, length in header['arrays']:
+            arrays[name] = np.frombuffer(buffer, dtype=cls.ARRAYS[name], count=length, offset=data_start + offset)
+        return cls(arrays, header['built_at'], buffer)
+
+    def postings(self, term):
+        """(doc numbers, weighted frequencies, first posting index) of term, or None."""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return None
+        start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+        return self.post_docs[start:end], self.post_tf[start:end], start
+
+    def _positions_in(self, term, numbers):
+        """(doc number, position) arrays of term's occurrences in numbers, sorted doc numbers that all hold it."""
+        docs, _, start = self.postings(term)
+        postings = start + np.searchsorted(docs, numbers)
+        starts = self.post_pos_offsets[postings]
+        lengths = self.post_pos_offsets[postings + 1] - starts
+        gathered = np.cumsum(lengths) - lengths
+        offsets = np.repeat(starts - gathered, lengths) + np.arange(int(lengths.sum()))
+        return np.repeat(numbers, lengths), self.positions[offsets]
+
+    def phrase_matches(self, phrase, numbers):
+        """The doc numbers among numbers (sorted, each holding every term of phrase) where phrase occurs."""
+        starts = None
+        for offset, term in enumerate(phrase):
+            docs, positions = self._positions_in(term, numbers)
+            # (doc, where the phrase would start) packed into one integer per occurrence
+            keys = (docs.astype(np.int64) << 32) | (positions.astype(np.int64) - offset + len(phrase))
+            starts = np.unique(keys) if starts is None else np.intersect1d(starts, keys)
+            if not len(starts):
+                break
+        return np.unique(starts >> 32).astype(numbers.dtype)
+
+    def terms_with_prefix(self, prefix):
+        start = _bisect_left(self.terms, prefix)
+        end = _bisect_left(self.terms, prefix + '￿')
+        return self.terms[start:end]
+
+
+def _bisect_left(strings, value):
+    low, high = 0, len(strings)
+    while low < high:
+        middle = (low + high) // 2
+        if strings[middle] < value:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class FullTextIndex:
+    """
+    BM25 keyword search over some text attributes of documents.
+
+    fields is a list of (attribute, weight); a word in a weight-3 title counts like three
+    in a weight-1 description (a simple BM25F). Words are lower-cased, stopwords dropped
+    and stemmed with Porter's algorithm, and every word's positions are kept so quoted
+    phrases can be matched exactly.
+
+    Documents live in an immutable Segment, usually loaded from disk, plus an in-memory
+    delta: documents added or changed since the segment was built, and the segment's
+    documents that were deleted or replaced. merged() folds the delta into a new segment
+    to save. A document whose text is unchanged (same fingerprint) is never re-analyzed.
+    The index isn't thread-safe: searches may run concurrently, but only while nothing
+    writes to it; apply writes to a copy() instead.
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, fields, segment=None):
+        self.fields = fields
+        self.segment = segment if segment is not None else Segment.empty()
+        self._deleted = np.zeros(len(self.segment), dtype=bool)
+        self._deleted_count = 0
+        self._segment_docs = {doc_id: number for number, doc_id in enumerate(self.segment.doc_ids)}
+        self._live = {}  # doc_id -> Document
+        self._live_postings = {}  # term -> set of doc_ids
+        self._count = len(self.segment)
+        self._total_length = float(np.sum(self.segment.doc_lengths, dtype=np.float64))
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, doc_id):
+        return doc_id in self._live or self._segment_number(doc_id) is not None
+
+    def copy(self):
+        """An independent copy sharing the immutable segment; only the delta is copied."""
+        other = copy.copy(self)
+        other._deleted = self._deleted.copy()
+        other._live = dict(self._live)
+        other._live_postings = {term: set(docs) for term, docs in self._live_postings.items()}
+        return other
+
+    @property
+    def delta_size(self):
+        """Documents held outside the segment: changed ones plus deleted ones."""
+        return len(self._live) + self._deleted_count
+
+    def doc_ids(self):
+        return [doc_id for doc_id in self._segment_docs if self._segment_number(doc_id) is not None] + list(self._live)
+
+    def _segment_number(self, doc_id):
+        number = self._segment_docs.get(doc_id)
+        return None if number is None or self._deleted[number] else number
+
+    def has_text(self, values):
+        return any(attribute in values for attribute, _ in self.fields)
+
+    def has_all_text(self, values):
+        return all(attribute in values for attribute, _ in self.fields)
+
+    def apply(self, doc_id, item):
+        """Index item (holding every field) as doc_id, unless its text is already indexed."""
+        texts = [str(item.get(attribute) or '') for attribute, _ in self.fields]
+        digest = fingerprint(texts)
+        live = self._live.get(doc_id)
+        if live is not None and live.fingerprint == digest:
+            return
+        number = self._segment_number(doc_id)
+        if live is None and number is not None and self.segment.doc_fingerprints[number] == digest:
+            return
+
+        self.remove(doc_id)
+        document = Document(self.fields, item)
+        self._live[doc_id] = document
+        for term in document.positions:
+            self._live_postings.setdefault(term, set()).add(doc_id)
+        self._count += 1
+        self._total_length += document.length
+
+    def remove(self, doc_id):
+        document = self._live.pop(doc_id, None)
+        if document is not None:
+            for term in document.positions:
+                docs = self._live_postings[term]
+                docs.discard(doc_id)
+                if not docs:
+                    del self._live_postings[term]
+            self._count -= 1
+            self._total_length -= document.length
+            return
+        number = self._segment_number(doc_id)
+        if number is not None:
+            self._deleted[number] = True
+            self._deleted_count += 1
+            self._count -= 1
+            self._total_length -= float(self.segment.doc_lengths[number])
+
+    def merged(self):
+        """A segment of everything currently indexed, to save and to start a fresh index from."""
+        return Segment.merge(self.segment, self._deleted, list(self._live.items()))
+
+    @staticmethod
+    def parse(query, prefix=True):
+        """
+        ([phrases as lists of terms], [terms], last word prefix or None). With prefix the
+        last word, unless followed by a space, also matches longer words it starts.
+        """
+        phrases = [analyze(phrase) for phrase in PHRASE_PATTERN.findall(query or '')]
+        rest = PHRASE_PATTERN.sub(' ', query or '')
+        words = tokenize(rest)
+        last = None
+        if prefix and words and rest.rstrip() == rest and (rest.lower().endswith(words[-1])):
+            last = words.pop()
+        return [phrase for phrase in phrases if phrase], [stem(word) for word in words], last
+
+    def _expand(self, word):
+        """Terms a half-typed word may become: its own stem plus the most common terms starting with it."""
+        candidates = set(self.segment.terms_with_prefix(word))
+        candidates.update(term for term in self._live_postings if term.startswith(word))
+        if len(candidates) > PREFIX_EXPANSIONS:
+            candidates = set(sorted(candidates, key=lambda term: -self._document_frequency(term))[:PREFIX_EXPANSIONS])
+        candidates.add(stem(word))
+        return candidates
+
+    def _document_frequency(self, term):
+        postings = self.segment.postings(term)
+        count = len(self._live_postings.get(term, ()))
+        if postings is not None:
+            count += len(postings[0]) - (int(np.count_nonzero(self._deleted[postings[0]])) if self._deleted_count else 0)
+        return count
+
+    def search(self, query, prefix=True):
+        """
+        {doc_id: BM25 score} of the documents holding every word and quoted phrase of
+        query; a half-typed last word matches any of its expansions.
+        """
+        phrases, terms, last = self.parse(query, prefix)
+        groups = [[term] for term in dict.fromkeys(terms + [term for phrase in phrases for term in phrase])]
+        if last is not None:
+            groups.append(sorted(self._expand(last)))
+        if not groups or not self._count:
+            return {}
+
+        average_length = self._total_length / self._count
+        segment_scores = np.zeros(len(self.segment))
+        segment_groups = np.zeros(len(self.segment), dtype=np.int32)
+        live_scores = {}
+        live_groups = {}
+        for group in groups:
+            segment_hit = np.zeros(len(self.segment), dtype=bool)
+            live_hit = set()
+            for term in group:
+                postings = self.segment.postings(term)
+                live_docs = self._live_postings.get(term, ())
+                if postings is not None:
+                    docs, frequencies, _ = postings
+                    if self._deleted_count:
+                        keep = ~self._deleted[docs]
+                        docs, frequencies = docs[keep], frequencies[keep]
+                else:
+                    docs = frequencies = np.zeros(0)
+                frequency = len(docs) + len(live_docs)
+                if not frequency:
+                    continue
+                idf = math.log(1 + (self._count - frequency + 0.5) / (frequency + 0.5))
+                if len(docs):
+                    lengths = self.segment.doc_lengths[docs]
+                    segment_scores[docs] += idf * frequencies * (self.K1 + 1) / (
+                        frequencies + self.K1 * (1 - self.B + self.B * lengths / average_length))
+                    segment_hit[docs] = True
+                for doc_id in live_docs:
+                    document = self._live[doc_id]
+                    tf = document.frequencies[term]
+                    live_scores[doc_id] = live_scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / (
+                        tf + self.K1 * (1 - self.B + self.B * document.length / average_length))
+                    live_hit.add(doc_id)
+            segment_groups += segment_hit
+            for doc_id in live_hit:
+                live_groups[doc_id] = live_groups.get(doc_id, 0) + 1
+
+        numbers = np.flatnonzero(segment_groups == len(groups))
+        for phrase in phrases:
+            if len(numbers):
+                numbers = self.segment.phrase_matches(phrase, numbers)
+        results = dict(zip(self.segment.doc_id_array[numbers].tolist(), segment_scores[numbers].tolist()))
+        results.update((doc_id, score) for doc_id, score in live_scores.items()
+                       if live_groups[doc_id] == len(groups)
+                       and all(self._has_phrase(self._live[doc_id], phrase) for phrase in phrases))
+        return results
+
+    @staticmethod
+    def _has_phrase(document, phrase):
+        starts = set(document.positions.get(phrase[0], ()))
+        for offset, term in enumerate(phrase[1:], start=1):
+            if not starts:
+                break
+            starts &= {position - offset for position in document.positions.get(term, ())}
+        return bool(starts)
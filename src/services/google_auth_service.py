@@ -1,72 +1,125 @@
 import json
 import logging
+import threading
 from google.auth.exceptions import RefreshError
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-from config import get_secret, store_secret
-from datetime import datetime
+from config import Config, get_secret, store_secret
+from datetime import datetime, timedelta
 
 class GoogleAuthService:
+    """
+    Gmail credentials and API client shared by the whole worker process.
+
+    The token is read from SSM once and kept in memory; it is refreshed (and written back
+    to SSM) only when it is about to expire, under a lock so concurrent senders refresh it
+    once. The Gmail service is built once per thread, since its HTTP transport is not
+    thread-safe, and reused until the credentials are replaced, so sending an email is a
+    single Gmail API call.
+    """
     TOKEN_PARAMETER = '/your-app/token'
 
-    @staticmethod
-    def get_credentials():
+    _credentials = None
+    _lock = threading.Lock()
+    _local = threading.local()
+
+    @classmethod
+    def get_credentials(cls):
         """
-        Retrieve credentials from AWS SSM Parameter Store, refresh if necessary,
-        and update the store with new tokens.
+        Return valid credentials, loading them from AWS SSM Parameter Store on first use
+        and refreshing them (and the store) when they are close to expiry.
         """
-        try:
-            token_json = get_secret(GoogleAuthService.TOKEN_PARAMETER)
-            if not token_json:
-                raise ValueError("No token found in SSM Parameter Store")
-
-            credentials = Credentials.from_authorized_user_info(json.loads(token_json))
+        credentials = cls._credentials
+        if credentials is not None and not cls._needs_refresh(credentials):
+            return credentials
 
-            if not credentials.valid:
-                if credentials.expired and credentials.refresh_token:
+        with cls._lock:
+            try:
+                if cls._credentials is None:
+                    cls._credentials = cls._load_credentials()
+                if cls._needs_refresh(cls._credentials):
                     try:
-                        credentials.refresh(Request())
-                        logging.info("Credentials refreshed successfully.")
-                    except RefreshError as e:
-                        if 'Token has been expired or revoked' in str(e):
-                            raise TokenExpiredError("Re-authentication required")
-                        raise
+                        cls._refresh(cls._credentials)
+                    except (RefreshError, TokenExpiredError, ValueError):
+                        # Another worker may have stored a newer token (e.g. after re-authorizing)
+                        stored = cls._load_credentials()
+                        if stored.refresh_token == cls._credentials.refresh_token:
+                            raise
+                        cls._credentials = stored
+                        if cls._needs_refresh(stored):
+                            cls._refresh(stored)
+                return cls._credentials
 
-                    # Update the token in SSM Parameter Store
-                    new_token_data = {
-                        "token": credentials.token,
-                        "refresh_token": credentials.refresh_token,
-                        "token_uri": credentials.token_uri,
-                        "client_id": credentials.client_id,
-                        "client_secret": credentials.client_secret,
-                        "scopes": credentials.scopes,
-                        "expiry": credentials.expiry.isoformat() if credentials.expiry else None
-                    }
-                    store_secret(GoogleAuthService.TOKEN_PARAMETER, json.dumps(new_token_data))
-                    logging.info("Stored refreshed credentials in SSM Parameter Store.")
-                else:
-                    raise ValueError("Credentials are invalid and cannot be refreshed.")
-
-            return credentials
-
-        except Exception as e:
-            logging.error(f"Error obtaining credentials: {str(e)}")
-            logging.exception("Full traceback:")
-            raise e
+            except Exception as e:
+                cls._credentials = None
+                logging.error(f"Error obtaining credentials: {str(e)}")
+                logging.exception("Full traceback:")
+                raise e
 
-    @staticmethod
-    def get_gmail_service():
+    @classmethod
+    def get_gmail_service(cls):
         """
-        Build and return a Gmail API service using valid credentials.
+        Return this thread's Gmail API service, building it when the thread has none yet
+        or the credentials have been replaced.
         """
         try:
-            credentials = GoogleAuthService.get_credentials()
-            service = build('gmail', 'v1', credentials=credentials)
-            return service
+            credentials = cls.get_credentials()
+            if getattr(cls._local, 'credentials', None) is not credentials:
+                cls._local.service = build('gmail', 'v1', credentials=credentials)
+                cls._local.credentials = credentials
+            return cls._local.service
         except Exception as e:
             logging.error(f"Error building Gmail service: {str(e)}")
             raise e
 
+    @classmethod
+    def invalidate(cls):
+        """Forget the cached credentials, e.g. once a new token has been stored in SSM."""
+        with cls._lock:
+            cls._credentials = None
+
+    @staticmethod
+    def _needs_refresh(credentials):
+        if not credentials.valid:
+            return True
+        if not credentials.refresh_token:
+            return False
+        # expiry is a naive UTC datetime
+        margin = timedelta(seconds=Config.GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS)
+        return credentials.expiry is not None and credentials.expiry - margin <= datetime.utcnow()
+
+    @staticmethod
+    def _load_credentials():
+        token_json = get_secret(GoogleAuthService.TOKEN_PARAMETER)
+        if not token_json:
+            raise ValueError("No token found in SSM Parameter Store")
+        return Credentials.from_authorized_user_info(json.loads(token_json))
+
+    @staticmethod
+    def _refresh(credentials):
+        if not credentials.refresh_token:
+            raise ValueError("Credentials are invalid and cannot be refreshed.")
+        try:
+            credentials.refresh(Request())
+            logging.info("Credentials refreshed successfully.")
+        except RefreshError as e:
+            if 'Token has been expired or revoked' in str(e):
+                raise TokenExpiredError("Re-authentication required")
+            raise
+
+        # Update the token in SSM Parameter Store
+        new_token_data = {
+            "token": credentials.token,
+            "refresh_token": credentials.refresh_token,
+            "token_uri": credentials.token_uri,
+            "client_id": credentials.client_id,
+            "client_secret": credentials.client_secret,
+            "scopes": credentials.scopes,
+            "expiry": credentials.expiry.isoformat() if credentials.expiry else None
+        }
+        store_secret(GoogleAuthService.TOKEN_PARAMETER, json.dumps(new_token_data))
+        logging.info("Stored refreshed credentials in SSM Parameter Store.")
+
 class TokenExpiredError(Exception):
     pass
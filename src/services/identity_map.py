@@ -0,0 +1,85 @@
+# src/services/identity_map.py
+
+from flask import g, has_request_context
+
+from .database_service import DynamoDB
+from .index_catalogue import TABLES
+
+
+class IdentityMap:
+    """
+    Request-scoped map of model objects kept on flask.g, so an entity looked up several
+    times while handling one request is read once, and every lookup returns the same object.
+
+    Objects are grouped by kind: a table name ('Users') for lookups by primary key, or
+    '<table>:<lookup>' for other unique lookups ('Applications:user_job'). Each kind is
+    loaded by one fetch function taking a list of keys and returning the objects (None for
+    missing ones) in the same order. get_many fetches the keys a request doesn't have yet
+    together, so a page listing several objects of a kind costs one BatchGetItem. Any
+    write to a table drops its kinds, so a request reads its own writes. Outside a
+    request nothing is kept. A fetch returns None when the read failed; lookups
+    then return None too and nothing is kept, so the next lookup reads again.
+    """
+
+    @staticmethod
+    def _state(create=True):
+        if not has_request_context():
+            return None
+        state = g.get('_identity_map')
+        if state is None and create:
+            # kind -> {key: object}
+            state = g._identity_map = {'objects': {}}
+        return state
+
+    @classmethod
+    def get(cls, kind, key, fetch):
+        objects = cls.get_many(kind, [key], fetch)
+        return objects[0] if objects is not None else None
+
+    @classmethod
+    def get_many(cls, kind, keys, fetch):
+        """The objects of keys, aligned with keys (None where there is none), or None if the read failed."""
+        keys = list(keys)
+        state = cls._state()
+        if state is None:
+            unique = list(dict.fromkeys(keys))
+            fetched = fetch(unique) if unique else []
+            if fetched is None:
+                return None
+            found = dict(zip(unique, fetched))
+            return [found[key] for key in keys]
+
+        objects = state['objects'].setdefault(kind, {})
+        missing = [key for key in dict.fromkeys(keys) if key not in objects]
+        if missing:
+            fetched = fetch(missing)
+            if fetched is None:
+                return None
+            objects.update(zip(missing, fetched))
+        return [objects[key] for key in keys]
+
+    @classmethod
+    def add(cls, kind, key, obj):
+        """Record an object read some other way, so later lookups of key in this request return it."""
+        state = cls._state()
+        if state is not None:
+            state['objects'].setdefault(kind, {})[key] = obj
+
+    @classmethod
+    def invalidate(cls, table_name):
+        state = cls._state(create=False)
+        if state is None:
+            return
+        for kind in list(state['objects']):
+            if kind.split(':', 1)[0] == table_name:
+                del state['objects'][kind]
+
+
+def _invalidate_on_write(table_name):
+    def listener(key, values):
+        IdentityMap.invalidate(table_name)
+    return listener
+
+
+for _table_name in TABLES:
+    DynamoDB.add_write_listener(_table_name, _invalidate_on_write(_table_name))
@@ -0,0 +1,126 @@
+# src/services/index_catalogue.py
+
+# Key schema of every DynamoDB table and the global secondary indexes (GSIs) the
+# models query. DynamoDB.query_index and scripts/provision_dynamodb.py both read
+# from here, so a new lookup path only needs to be declared once.
+#
+# Every key attribute is a string unless listed in ATTRIBUTE_TYPES.
+
+TABLES = {
+    'Users': {
+        'key': {'hash': 'user_id'},
+        'indexes': {
+            'email-index': {'hash': 'email'},
+            'reset_token-index': {'hash': 'reset_token'},
+            'verification_token-index': {'hash': 'verification_token'},
+        },
+    },
+    'Employers': {
+        'key': {'hash': 'employer_id'},
+        'indexes': {
+            'email-index': {'hash': 'email'},
+            'reset_token-index': {'hash': 'reset_token'},
+            'verification_token-index': {'hash': 'verification_token'},
+        },
+    },
+    'Admins': {
+        'key': {'hash': 'admin_id'},
+        'indexes': {
+            'email-index': {'hash': 'email'},
+            'reset_token-index': {'hash': 'reset_token'},
+        },
+    },
+    # active_partition is set to 'active' only while a job is active, so active-date_posted-index
+    # holds just the job board, newest first when read backwards. Every job has change_partition
+    # 'jobs' and the time of its last write in last_modified, the JobCatalogue change feed
+    'Jobs': {
+        'key': {'hash': 'job_id'},
+        'indexes': {
+            'employer_id-index': {'hash': 'employer_id', 'range': 'date_posted'},
+            'active-date_posted-index': {'hash': 'active_partition', 'range': 'date_posted'},
+            'last_modified-index': {'hash': 'change_partition', 'range': 'last_modified'},
+        },
+    },
+    'Applications': {
+        'key': {'hash': 'application_id'},
+        'indexes': {
+            'user_id-index': {'hash': 'user_id', 'range': 'job_id'},
+            'job_id-index': {'hash': 'job_id'},
+        },
+    },
+    'Sessions': {
+        'key': {'hash': 'session_id'},
+        'indexes': {
+            'user_id-index': {'hash': 'user_id', 'range': 'user_type'},
+        },
+    },
+    # Every write sets change_partition 'epochs' and last_modified, the SessionCache change feed
+    'SessionEpochs': {
+        'key': {'hash': 'principal'},
+        'indexes': {
+            'last_modified-index': {'hash': 'change_partition', 'range': 'last_modified'},
+        },
+    },
+    # Legacy message table, kept until scripts/backfill_conversation_messages.py has been run
+    'Messages': {
+        'key': {'hash': 'message_id'},
+        'indexes': {},
+    },
+    # message_key is "<timestamp>#<message_id>", so a conversation reads back in time order
+    'ConversationMessages': {
+        'key': {'hash': 'conversation_id', 'range': 'message_key'},
+        'indexes': {
+            'receiver_id-index': {'hash': 'receiver_id', 'range': 'message_key'},
+        },
+    },
+    # One row per (participant, conversation) with the last message and unread count, plus a
+    # conversation_id '#total' row per participant holding their overall unread count
+    'ConversationSummaries': {
+        'key': {'hash': 'participant_id', 'range': 'conversation_id'},
+        'indexes': {},
+    },
+    # Emails waiting to be sent; status is 'pending' or 'dead' (out of attempts)
+    'EmailOutbox': {
+        'key': {'hash': 'outbox_id'},
+        'indexes': {
+            'status-index': {'hash': 'status', 'range': 'next_attempt_at'},
+        },
+        # DynamoDB deletes rows once this epoch-seconds attribute has passed
+        'ttl': 'expires_at',
+    },
+    'AuditLogs': {
+        'key': {'hash': 'log_id'},
+        'indexes': {},
+    },
+}
+
+# DynamoDB attribute types for key attributes that are not strings ('S')
+ATTRIBUTE_TYPES = {}
+
+
+def primary_key(table_name):
+    """Return the primary key attribute names of a table (hash key first)."""
+    key = TABLES[table_name]['key']
+    return [name for name in (key.get('hash'), key.get('range')) if name]
+
+
+def get_index(table_name, index_name):
+    """Return the {'hash': ..., 'range': ...} schema of a declared index, or None."""
+    return TABLES.get(table_name, {}).get('indexes', {}).get(index_name)
+
+
+def index_key_attributes(table_name):
+    """
+    Attributes used as GSI keys on a table. DynamoDB rejects NULL values for these,
+    so they have to be left out of an item instead of being stored as None.
+    """
+    if table_name not in TABLES:
+        return set()
+    attributes = set()
+    for index in TABLES[table_name]['indexes'].values():
+        attributes.update(name for name in (index.get('hash'), index.get('range')) if name)
+    return attributes - set(primary_key(table_name))
+
+
+def attribute_type(attribute_name):
+    return ATTRIBUTE_TYPES.get(attribute_name, 'S')
@@ -0,0 +1,166 @@
+# src/services/inverted_index.py
+
+import threading
+import time
+
+from .database_service import DynamoDB
+
+
+class InvertedIndex:
+    """
+    In-memory token -> posting list (set of ids) index over some fields of a DynamoDB table.
+
+    fields maps a field name to (item attribute, tokenize), where tokenize turns the stored
+    attribute value into a set of tokens. Every write applied through on_write only
+    re-posts the attributes it wrote, so Job.add_skill or User.remove_skill touch one
+    field's postings. include(item) can keep items out of the index (inactive rows); it
+    only sees attributes present in the write.
+
+    With load, the index reads itself lazily (load() returns raw items, or None on
+    failure), listens to the table's writes and reloads after ttl seconds to pick up
+    other workers' writes. Without it, the owner feeds it through rebuild() and
+    on_write(), e.g. from ActiveJobs.
+    """
+
+    def __init__(self, table_name, id_attribute, fields, load=None, include=None, ttl=600):
+        self.table_name = table_name
+        self.id_attribute = id_attribute
+        self.fields = fields
+        self.ttl = ttl
+        self._load = load
+        self._include = include or (lambda item: True)
+
+        self._documents = None  # id -> {field: set of tokens}
+        self._postings = None  # field -> {token: set of ids}
+        self._pending = None  # writes seen while a load is running
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+        if load is not None:
+            DynamoDB.add_write_listener(table_name, self.on_write)
+
+    def _is_fresh(self):
+        return self._documents is not None and time.monotonic() - self._built_at < self.ttl
+
+    def _ensure_built(self):
+        if self._load is None or self._is_fresh():
+            return
+        with self._build_lock:
+            if self._is_fresh():
+                return
+            with self._lock:
+                self._pending = []
+
+            items = self._load()
+
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if items is None:
+                    # Load failed; keep serving what we have and try again on the next call
+                    if self._documents is None:
+                        self._reset([])
+                    for doc_id, values in pending:
+                        self._apply(doc_id, values)
+                    return
+                # Writes that raced with the load are newer than what it returned
+                self._reset(items, pending)
+
+    def rebuild(self, items, writes=()):
+        """Replace the index with items, then apply the (key, values) writes that raced with reading them."""
+        with self._lock:
+            self._reset(items, [(key.get(self.id_attribute), values) for key, values in writes])
+
+    def _reset(self, items, pending=()):
+        """Caller holds _lock."""
+        self._documents = {}
+        self._postings = {field: {} for field in self.fields}
+        for item in items:
+            self._apply(item[self.id_attribute], item)
+        for doc_id, values in pending:
+            self._apply(doc_id, values)
+        self._built_at = time.monotonic()
+
+    def on_write(self, key, values):
+        doc_id = key.get(self.id_attribute)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((doc_id, values))
+            elif self._documents is not None:
+                self._apply(doc_id, values)
+
+    def _apply(self, doc_id, values):
+        """Apply a written item (or the changed attributes of one) to the index; caller holds _lock."""
+        if values is None or not self._include(values):
+            self._remove(doc_id)
+            return
+
+        document = self._documents.get(doc_id)
+        if document is None:
+            if self.id_attribute not in values:
+                # Partial update of an item we never loaded; it shows up on the next reload
+                return
+            document = self._documents[doc_id] = {field: set() for field in self.fields}
+
+        for field, (attribute, tokenize) in self.fields.items():
+            if attribute not in values:
+                continue
+            postings = self._postings[field]
+            for token in document[field]:
+                postings[token].discard(doc_id)
+                if not postings[token]:
+                    del postings[token]
+            document[field] = tokenize(values[attribute])
+            for token in document[field]:
+                postings.setdefault(token, set()).add(doc_id)
+
+    def _remove(self, doc_id):
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+        for field, tokens in document.items():
+            postings = self._postings[field]
+            for token in tokens:
+                postings[token].discard(doc_id)
+                if not postings[token]:
+                    del postings[token]
+
+    def match_all(self, required):
+        """Ids of documents holding every token in required ({field: tokens})."""
+        self._ensure_built()
+        with self._lock:
+            if self._documents is None:
+                return set()
+            postings = [self._postings[field].get(token, set())
+                        for field, tokens in required.items() for token in tokens]
+            if not postings:
+                return set(self._documents)
+            # Intersect the shortest posting lists first so the working set shrinks fast
+            postings.sort(key=len)
+            result = set(postings[0])
+            for posting in postings[1:]:
+                if not result:
+                    break
+                result &= posting
+            return result
+
+    def match_covered(self, candidates, available):
+        """
+        Ids among candidates whose tokens, for every field in available ({field: tokens}),
+        are all contained in available[field].
+        """
+        self._ensure_built()
+        with self._lock:
+            if self._documents is None:
+                return set()
+            candidates = {doc_id for doc_id in candidates if doc_id in self._documents}
+            for field, tokens in available.items():
+                # Count how many of each candidate's tokens the caller has, via the callers' postings
+                hits = {}
+                for token in tokens:
+                    for doc_id in self._postings[field].get(token, ()):
+                        if doc_id in candidates:
+                            hits[doc_id] = hits.get(doc_id, 0) + 1
+                candidates = {doc_id for doc_id in candidates
+                              if hits.get(doc_id, 0) == len(self._documents[doc_id][field])}
+            return candidates
@@ -0,0 +1,134 @@
+# src/services/job_catalogue.py
+
+import copy
+import datetime
+import logging
+import threading
+import time
+
+from cachetools import LRUCache
+
+from config import Config
+from .database_service import DynamoDB
+
+
+class JobCatalogue:
+    """
+    Per-worker read-through cache of Jobs items, so the job detail, chat and application
+    pages stop reading the same jobs from DynamoDB on every request.
+
+    Entries are versioned by the item's last_modified, which every Job write sets. A write
+    through this worker drops the job's entry; writes from other workers are found by a
+    background thread that queries the last_modified-index every JOB_CATALOGUE_POLL_SECONDS
+    for jobs changed since its previous poll and replaces older cached versions. If polling
+    has failed for JOB_CATALOGUE_STALE_SECONDS, reads go to DynamoDB until it recovers.
+
+    Callers get their own deep copy of an item, so editing a Job's lists can't leak into
+    other requests.
+    """
+    INDEX = 'last_modified-index'
+    # Every job sits in one change feed partition of INDEX
+    CHANGE_PARTITION = 'jobs'
+    # Re-read a little before the previous poll to catch index updates that landed late
+    OVERLAP_SECONDS = 5
+
+    _entries = LRUCache(maxsize=Config.JOB_CATALOGUE_SIZE)  # job_id -> item
+    _invalidations = 0  # bumped by every local write, so a read racing one doesn't cache what it read
+    _synced_at = None  # monotonic time of the last successful poll
+    _lock = threading.Lock()
+    _thread = None
+
+    @staticmethod
+    def now():
+        """A last_modified value for a write happening now (naive UTC, like date_posted)."""
+        return datetime.datetime.utcnow().isoformat()
+
+    @classmethod
+    def _is_synced(cls):
+        if cls._thread is None or not cls._thread.is_alive():
+            with cls._lock:
+                if cls._thread is None or not cls._thread.is_alive():
+                    # Entries cached before a restart may have missed changes, so start empty
+                    cls._entries.clear()
+                    cls._synced_at = time.monotonic()
+                    cls._thread = threading.Thread(target=cls._run, name='job-catalogue', daemon=True)
+                    cls._thread.start()
+        return time.monotonic() - cls._synced_at < Config.JOB_CATALOGUE_STALE_SECONDS
+
+    @classmethod
+    def get(cls, job_id):
+        """The Jobs item of job_id (a private copy), or None if there is no such job or it couldn't be read."""
+        items = cls.get_many([job_id])
+        return items[0] if items is not None else None
+
+    @classmethod
+    def get_many(cls, job_ids):
+        """
+        Jobs items aligned with job_ids (None where a job doesn't exist); misses are read in
+        one batch. Returns None if that read failed.
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+        synced = cls._is_synced()
+        with cls._lock:
+            found = {job_id: cls._entries[job_id] for job_id in job_ids if synced and job_id in cls._entries}
+            invalidations = cls._invalidations
+
+        missing = [job_id for job_id in dict.fromkeys(job_ids) if job_id not in found]
+        if missing:
+            items = DynamoDB.batch_get('Jobs', [{'job_id': job_id} for job_id in missing])
+            if items is None:
+                return None
+            with cls._lock:
+                for job_id, item in zip(missing, items):
+                    if item is None:
+                        continue
+                    found[job_id] = item
+                    if invalidations == cls._invalidations:
+                        cls._store(item)
+        return [copy.deepcopy(found[job_id]) if job_id in found else None for job_id in job_ids]
+
+    @classmethod
+    def _store(cls, item):
+        # Only move forward: a poll can return a version older than one already read
+        cached = cls._entries.get(item['job_id'])
+        if cached is None or cached.get('last_modified', '') <= item.get('last_modified', ''):
+            cls._entries[item['job_id']] = item
+
+    @classmethod
+    def invalidate(cls, job_id):
+        with cls._lock:
+            cls._invalidations += 1
+            cls._entries.pop(job_id, None)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._invalidations += 1
+            cls._entries.clear()
+
+    @classmethod
+    def _run(cls):
+        last_check = datetime.datetime.utcnow()
+        while True:
+            time.sleep(Config.JOB_CATALOGUE_POLL_SECONDS)
+            tick = datetime.datetime.utcnow()
+            since = (last_check - datetime.timedelta(seconds=cls.OVERLAP_SECONDS)).isoformat()
+            items = DynamoDB.query_range('Jobs', cls.CHANGE_PARTITION, after=since, index_name=cls.INDEX)
+            if items is None:
+                # Query failed (already logged); retry the same window next poll
+                continue
+
+            with cls._lock:
+                for item in items:
+                    # Jobs nobody has read here aren't worth holding
+                    if item['job_id'] in cls._entries:
+                        cls._store(item)
+                cls._synced_at = time.monotonic()
+            if items:
+                logging.debug(f"Job catalogue refreshed {len(items)} changed job(s)")
+            last_check = tick
+
+
+DynamoDB.add_write_listener('Jobs', lambda key, values: JobCatalogue.invalidate(key.get('job_id')))
@@ -1,65 +1,98 @@
 # src/services/job_matching_service.py
 
+from config import Config
+from .active_jobs import ActiveJobs
 from .database_service import DynamoDB
+from .inverted_index import InvertedIndex
 from ..models.user_model import User
 from ..models.job_model import Job
 
-class JobMatchingService:
-    @staticmethod
-    def match_jobs_to_user(user):
-        user_skills = set(user.skills)
-        user_certifications = set(user.certifications)
-        user_location = user.location.lower()
-
-        jobs = Job.get_all_jobs()
-        matched_jobs = []
-
-        for job in jobs:
-            job_skills = set(job.skills)
-            job_certifications = set(job.certifications)
-            job_location = job.location.lower()
-
-            # Simple matching criteria:
-            # 1. User has all required skills
-            # 2. User has all required certifications
-            # 3. User's location matches job location or is within a certain radius (simplified here)
-
-            if not job_skills.issubset(user_skills):
-                continue
-
-            if not job_certifications.issubset(user_certifications):
-                continue
 
-            if user_location != job_location:
-                continue
+def _lower_set(values, key=None):
+    return {(value[key] if key else value).strip().lower() for value in values or [] if value}
 
-            matched_jobs.append(job)
 
-        return matched_jobs
+def _location(city):
+    return {city.strip().lower()} if city else set()
 
-    @staticmethod
-    def match_users_to_job(job):
-        job_skills = set(job.skills)
-        job_certifications = set(job.certifications)
-        job_location = job.location.lower()
 
-        users = User.get_all_users()
-        matched_users = []
+def _load_users():
+    # Only the attributes the postings are built from
+    response = DynamoDB.scan('Users', ProjectionExpression='#id, #skills, #certifications, #city, #active',
+                             ExpressionAttributeNames={'#id': 'user_id', '#skills': 'skills',
+                                                       '#certifications': 'certifications', '#city': 'city',
+                                                       '#active': 'is_active'},
+                             segments=DynamoDB.PARALLEL_SCAN_SEGMENTS)
+    return response.get('Items', []) if response is not None else None
 
-        for user in users:
-            user_skills = set(user.skills)
-            user_certifications = set(user.certifications)
-            user_location = user.location.lower()
 
-            if not job_skills.issubset(user_skills):
-                continue
-
-            if not job_certifications.issubset(user_certifications):
-                continue
-
-            if user_location != job_location:
-                continue
-
-            matched_users.append(user)
-
-        return matched_users
+class JobMatchingService:
+    # Postings over the fields the matching rules look at; jobs stored as skill/certification
+    # names, users as {'skill': ...} / {'type': ...} entries. The job postings are built from
+    # the worker's shared ActiveJobs scan, the user postings from their own read of Users.
+    job_index = InvertedIndex(
+        'Jobs', 'job_id',
+        fields={
+            'skills': ('skills', _lower_set),
+            'certifications': ('certifications', _lower_set),
+            'location': ('city', _location),
+        },
+        include=lambda item: item.get('is_active', True)
+    )
+    user_index = InvertedIndex(
+        'Users', 'user_id',
+        fields={
+            'skills': ('skills', lambda skills: _lower_set(skills, 'skill')),
+            'certifications': ('certifications', lambda certs: _lower_set(certs, 'type')),
+            'location': ('city', _location),
+        },
+        load=_load_users,
+        include=lambda item: item.get('is_active', True),
+        ttl=Config.MATCHING_INDEX_TTL_SECONDS
+    )
+
+    @classmethod
+    def qualified_job_ids(cls, user):
+        # Simple matching criteria:
+        # 1. User has all required skills
+        # 2. User has all required certifications
+        # 3. User's city matches the job's city (simplified location match)
+        user_location = _location(user.city)
+        if not user_location:
+            return set()
+
+        ActiveJobs.ensure_loaded()
+        candidates = cls.job_index.match_all({'location': user_location})
+        return cls.job_index.match_covered(candidates, {
+            'skills': _lower_set(user.skills, 'skill'),
+            'certifications': _lower_set(user.certifications, 'type'),
+        })
+
+    @classmethod
+    def match_jobs_to_user(cls, user):
+        """Active jobs the user meets every requirement of, or None if they couldn't be read."""
+        jobs = Job.get_many(sorted(cls.qualified_job_ids(user)))
+        if jobs is None:
+            return None
+        return [job for job in jobs if job.is_active]
+
+    @classmethod
+    def match_users_to_job(cls, job, exclude=(), limit=None):
+        """
+        Active users holding every skill and certification the job requires, in its city, or
+        None if they couldn't be read. Users in exclude are left out, and limit keeps the
+        first that many by user_id.
+        """
+        job_location = _location(job.city)
+        if not job_location:
+            return []
+
+        user_ids = sorted(cls.user_index.match_all({
+            'location': job_location,
+            'skills': _lower_set(job.skills),
+            'certifications': _lower_set(job.certifications),
+        }) - set(exclude))
+        return User.get_many(user_ids[:limit] if limit else user_ids)
+
+
+ActiveJobs.subscribe(JobMatchingService.job_index.rebuild, JobMatchingService.job_index.on_write)
@@ -0,0 +1,519 @@
+# src/services/job_search_service.py
+
+import bisect
+import copy
+import datetime
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from config import Config
+from .active_jobs import ActiveJobs
+from .database_service import DynamoDB
+from .full_text_index import FullTextIndex, Segment
+
+DAY_SECONDS = 86400
+
+
+def _timestamp(date_posted):
+    """Seconds since the epoch of an ISO date_posted (stored as naive UTC), 0 if unreadable."""
+    try:
+        posted = datetime.datetime.fromisoformat(str(date_posted))
+    except ValueError:
+        return 0.0
+    if posted.tzinfo is None:
+        posted = posted.replace(tzinfo=datetime.timezone.utc)
+    return posted.timestamp()
+
+
+def _salary(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class _Vocabulary:
+    """Codes for the lower-cased values of one facet, with the first spelling seen as its label."""
+
+    def __init__(self):
+        self.codes = {}
+        self.labels = []
+
+    def code(self, value, add=True):
+        key = value.strip().lower() if isinstance(value, str) else ''
+        if not key:
+            return -1
+        code = self.codes.get(key)
+        if code is None and add:
+            code = self.codes[key] = len(self.labels)
+            self.labels.append(value.strip())
+        return -1 if code is None else code
+
+    def copy(self):
+        other = _Vocabulary()
+        other.codes = dict(self.codes)
+        other.labels = list(self.labels)
+        return other
+
+
+class JobSearchIndex:
+    """
+    In-memory faceted index of the active jobs.
+
+    Every job owns a slot (a row in numpy columns). City and country are stored as
+    code columns, so a filter value's bitmap over the slots is one vectorized comparison
+    and a facet's counts one bincount. Skills, which a job has several of, are kept as
+    sparse (slot, skill) pair columns: the jobs having all of some skills and the skill
+    counts are each one pass over the pairs. Salary and date_posted are numeric columns
+    for range filters, sorting and their buckets. Slots of removed jobs are reused.
+
+    Facet counts are disjunctive: each facet is counted over the jobs matching every
+    other filter, so the counts show how picking another value would change the results.
+    The index isn't thread-safe: searches may run concurrently, but only while nothing
+    writes to it. JobSearchService applies writes to a copy().
+    """
+    SORTS = ('relevance', 'newest', 'salary_desc', 'salary_asc')
+    # Salary facet buckets, [edge i, edge i+1); the last one is open-ended
+    SALARY_EDGES = (0, 50000, 75000, 100000, 150000)
+    # Recency facet buckets, in days; counts include every job posted within that many days
+    POSTED_DAYS = (1, 7, 30)
+    # Values listed per city/country/skill facet
+    FACET_LIMIT = 20
+
+    def __init__(self, capacity=1024):
+        self._size = 0  # slots handed out so far; columns are only read up to here
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._city = np.full(capacity, -1, dtype=np.int32)
+        self._country = np.full(capacity, -1, dtype=np.int32)
+        self._salary = np.full(capacity, np.nan)
+        self._salary_bucket = np.full(capacity, -1, dtype=np.int8)  # index into SALARY_EDGES, -1 without a salary
+        self._posted = np.zeros(capacity)
+        self._ids = [None] * capacity
+        self._slots = {}  # job_id -> slot
+        self._free = []
+
+        self._pair_slot = np.zeros(capacity, dtype=np.int32)
+        self._pair_skill = np.full(capacity, -1, dtype=np.int32)  # -1 marks a pair dropped by an update
+        self._pair_positions = {}  # slot -> positions of its pairs
+        self._pair_count = 0
+        self._skill_totals = np.zeros(0, dtype=np.int64)  # active jobs per skill code, for unfiltered searches
+
+        self.vocabularies = {'city': _Vocabulary(), 'country': _Vocabulary(), 'skills': _Vocabulary()}
+
+    def __len__(self):
+        return len(self._slots)
+
+    def copy(self):
+        """An independent copy to apply writes to while searches keep reading this one."""
+        other = copy.copy(self)
+        for name in ('_alive', '_city', '_country', '_salary', '_salary_bucket', '_posted',
+                     '_pair_slot', '_pair_skill', '_skill_totals'):
+            setattr(other, name, getattr(self, name).copy())
+        other._ids = list(self._ids)
+        other._slots = dict(self._slots)
+        other._free = list(self._free)
+        # A slot's position list is replaced on update, never changed in place
+        other._pair_positions = dict(self._pair_positions)
+        other.vocabularies = {facet: vocabulary.copy() for facet, vocabulary in self.vocabularies.items()}
+        return other
+
+    @staticmethod
+    def _grown(column, capacity, fill):
+        grown = np.full(capacity, fill, dtype=column.dtype)
+        grown[:len(column)] = column
+        return grown
+
+    def _allocate(self, job_id):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self._size
+            if slot == len(self._alive):
+                capacity = 2 * len(self._alive)
+                self._alive = self._grown(self._alive, capacity, False)
+                self._city = self._grown(self._city, capacity, -1)
+                self._country = self._grown(self._country, capacity, -1)
+                self._salary = self._grown(self._salary, capacity, np.nan)
+                self._salary_bucket = self._grown(self._salary_bucket, capacity, -1)
+                self._posted = self._grown(self._posted, capacity, 0.0)
+                self._ids.extend([None] * (capacity - len(self._ids)))
+            self._size += 1
+        self._slots[job_id] = slot
+        self._ids[slot] = job_id
+        self._alive[slot] = True
+        return slot
+
+    def apply(self, job_id, values):
+        """
+        Apply a written job: a whole item, the attributes an update changed, or None when
+        it was deleted. Inactive jobs are removed; an update to a job the index doesn't
+        hold is ignored, since the rest of the job isn't known.
+        """
+        if values is None or not values.get('is_active', True):
+            self.remove(job_id)
+            return
+
+        slot = self._slots.get(job_id)
+        if slot is None:
+            if 'job_id' not in values:
+                return
+            slot = self._allocate(job_id)
+
+        if 'city' in values:
+            self._city[slot] = self.vocabularies['city'].code(values['city'])
+        if 'country' in values:
+            self._country[slot] = self.vocabularies['country'].code(values['country'])
+        if 'salary' in values:
+            salary = self._salary[slot] = _salary(values['salary'])
+            bucket = -1
+            if not np.isnan(salary):
+                # Anything below the first edge is counted in the first bucket
+                bucket = max(bisect.bisect_right(self.SALARY_EDGES, salary) - 1, 0)
+            self._salary_bucket[slot] = bucket
+        if 'date_posted' in values:
+            self._posted[slot] = _timestamp(values['date_posted'])
+        if 'skills' in values:
+            vocabulary = self.vocabularies['skills']
+            self._set_skills(slot, {vocabulary.code(skill) for skill in values['skills'] or []} - {-1})
+
+    def remove(self, job_id):
+        slot = self._slots.pop(job_id, None)
+        if slot is None:
+            return
+        self._set_skills(slot, set())
+        self._alive[slot] = False
+        self._city[slot] = -1
+        self._country[slot] = -1
+        self._salary[slot] = np.nan
+        self._salary_bucket[slot] = -1
+        self._posted[slot] = 0.0
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def _set_skills(self, slot, codes):
+        positions = self._pair_positions.pop(slot, [])
+        np.subtract.at(self._skill_totals, self._pair_skill[positions], 1)
+        self._pair_skill[positions] = -1
+        if not codes:
+            return
+
+        if self._pair_count + len(codes) > len(self._pair_slot):
+            self._compact_pairs(len(codes))
+        start = self._pair_count
+        self._pair_slot[start:start + len(codes)] = slot
+        self._pair_skill[start:start + len(codes)] = list(codes)
+        self._pair_positions[slot] = list(range(start, start + len(codes)))
+        self._pair_count += len(codes)
+        if max(codes) >= len(self._skill_totals):
+            self._skill_totals = self._grown(self._skill_totals, 2 * max(codes) + 1, 0)
+        self._skill_totals[list(codes)] += 1
+
+    def _compact_pairs(self, extra):
+        """Drop dead pairs, growing the pair columns if they are still too small for extra more."""
+        live = np.flatnonzero(self._pair_skill[:self._pair_count] >= 0)
+        capacity = len(self._pair_slot)
+        while len(live) + extra > capacity // 2:
+            capacity *= 2
+        pair_slot = np.zeros(capacity, dtype=np.int32)
+        pair_skill = np.full(capacity, -1, dtype=np.int32)
+        pair_slot[:len(live)] = self._pair_slot[live]
+        pair_skill[:len(live)] = self._pair_skill[live]
+        self._pair_slot, self._pair_skill = pair_slot, pair_skill
+        self._pair_count = len(live)
+        self._pair_positions = {}
+        for position, slot in enumerate(pair_slot[:len(live)].tolist()):
+            self._pair_positions.setdefault(slot, []).append(position)
+
+    def _filters(self, city, country, skills, salary_min, salary_max, posted_within_days, now, relevance):
+        """{facet: mask over the used slots} for every filter that was given."""
+        size = self._size
+        filters = {}
+        if relevance is not None:
+            # Keyword matches restrict every facet, but aren't a facet themselves
+            filters['text'] = ~np.isnan(relevance)
+        for facet, value, column in (('city', city, self._city), ('country', country, self._country)):
+            if value:
+                code = self.vocabularies[facet].code(value, add=False)
+                filters[facet] = column[:size] == code if code >= 0 else np.zeros(size, dtype=bool)
+
+        if skills:
+            vocabulary = self.vocabularies['skills']
+            codes = {vocabulary.code(skill, add=False) for skill in skills}
+            if -1 in codes:
+                filters['skills'] = np.zeros(size, dtype=bool)
+            else:
+                # A job's skills are distinct, so it has them all when it has len(codes) of them
+                hits = np.isin(self._pair_skill[:self._pair_count], list(codes))
+                counts = np.bincount(self._pair_slot[:self._pair_count][hits], minlength=size)
+                filters['skills'] = counts[:size] == len(codes)
+
+        if salary_min is not None or salary_max is not None:
+            salary = self._salary[:size]
+            # Jobs without a salary (NaN) fail both comparisons, so a salary filter drops them
+            mask = ~np.isnan(salary)
+            if salary_min is not None:
+                mask &= salary >= salary_min
+            if salary_max is not None:
+                mask &= salary < salary_max
+            filters['salary'] = mask
+
+        if posted_within_days is not None:
+            filters['posted'] = self._posted[:size] >= now - posted_within_days * DAY_SECONDS
+        return filters
+
+    def search(self, city=None, country=None, skills=(), salary_min=None, salary_max=None,
+               posted_within_days=None, sort='newest', offset=0, limit=10, now=None, scores=None):
+        """
+        Filter, sort and page the jobs. Jobs match when they are in city and country, have
+        every skill in skills, earn salary_min <= salary < salary_max and were posted within
+        posted_within_days; filters left as None are not applied. scores ({job_id: score},
+        e.g. keyword matches) keeps only those jobs and is what sort 'relevance' orders by,
+        newest first without it. sort is one of SORTS.
+
+        Returns {'job_ids', 'total', 'facets'}: the ids on
+        the requested page, how many jobs matched, and the facet counts
+        ({'city'|'country'|'skills': [(label, count)], 'salary': [(low, high, count)],
+        'posted': [(days, count)]}).
+        """
+        now = time.time() if now is None else now
+        size = self._size
+        alive = self._alive[:size]
+        relevance = None
+        if scores is not None:
+            relevance = np.full(size, np.nan)
+            slots = [(self._slots[job_id], score) for job_id, score in scores.items() if job_id in self._slots]
+            if slots:
+                relevance[[slot for slot, _ in slots]] = [score for _, score in slots]
+        filters = self._filters(city, country, skills, salary_min, salary_max, posted_within_days, now, relevance)
+        mask = alive.copy()
+        for facet_mask in filters.values():
+            mask &= facet_mask
+        matched = np.flatnonzero(mask)
+
+        return {
+            'job_ids': [self._ids[slot] for slot in self._sorted_page(matched, sort, offset, limit, relevance)],
+            'total': len(matched),
+            'facets': self._facets(alive, filters, mask, now)
+        }
+
+    def _sorted_page(self, matched, sort, offset, limit, relevance):
+        if sort == 'relevance' and relevance is not None:
+            keys = -relevance[matched]
+        elif sort == 'salary_desc':
+            keys = -np.nan_to_num(self._salary[matched], nan=-np.inf)
+        elif sort == 'salary_asc':
+            keys = np.nan_to_num(self._salary[matched], nan=np.inf)
+        else:
+            keys = -self._posted[matched]
+
+        end = offset + limit
+        if end <= 0 or offset >= len(matched):
+            return []
+        if end < len(matched):
+            # Only the first `end` results need ordering
+            top = np.argpartition(keys, end - 1)[:end]
+            matched, keys = matched[top], keys[top]
+        # Slot breaks ties so pages don't overlap
+        return matched[np.lexsort((matched, keys))][offset:end].tolist()
+
+    def _facets(self, alive, filters, mask, now):
+        def without(facet):
+            if facet not in filters:
+                return mask
+            others = alive.copy()
+            for name, facet_mask in filters.items():
+                if name != facet:
+                    others &= facet_mask
+            return others
+
+        facets = {}
+        for facet, column in (('city', self._city), ('country', self._country)):
+            codes = column[:self._size][without(facet)]
+            facets[facet] = self._top_values(facet, np.bincount(codes[codes >= 0], minlength=0))
+
+        if all(name == 'skills' for name in filters):
+            facets['skills'] = self._top_values('skills', self._skill_totals)
+        else:
+            pairs = self._pair_skill[:self._pair_count] >= 0
+            pairs &= without('skills')[self._pair_slot[:self._pair_count]]
+            facets['skills'] = self._top_values('skills', np.bincount(self._pair_skill[:self._pair_count][pairs]))
+
+        bucket = self._salary_bucket[:self._size][without('salary')]
+        buckets = np.bincount(bucket[bucket >= 0], minlength=len(self.SALARY_EDGES))
+        highs = self.SALARY_EDGES[1:] + (None,)
+        facets['salary'] = [(low, high, int(count)) for low, high, count in zip(self.SALARY_EDGES, highs, buckets)]
+
+        ages = now - self._posted[:self._size][without('posted')]
+        facets['posted'] = [(days, int(np.count_nonzero(ages <= days * DAY_SECONDS))) for days in self.POSTED_DAYS]
+        return facets
+
+    def _top_values(self, facet, counts):
+        labels = self.vocabularies[facet].labels
+        present = np.flatnonzero(counts)
+        if len(present) > self.FACET_LIMIT:
+            present = present[np.argpartition(-counts[present], self.FACET_LIMIT - 1)[:self.FACET_LIMIT]]
+        present = sorted(present.tolist(), key=lambda code: (-counts[code], labels[code].lower()))
+        return [(labels[code], int(counts[code])) for code in present]
+
+
+class JobSearchService:
+    """
+    The worker's shared JobSearchIndex and keyword FullTextIndex. Both are built from each
+    ActiveJobs snapshot and kept current from the Jobs writes it passes on, so a job
+    created, edited or closed through this process shows up in the next search. Writes
+    from other processes arrive with the next snapshot, which is built in the background
+    while searches keep using the current indexes.
+
+    The published pair of indexes is never modified, so searches only hold the lock to
+    take a reference to it and run concurrently. Writes are queued and the next search
+    applies them to copies of the indexes, which then replace the published pair; a burst
+    of writes costs one copy.
+
+    The text index starts from the segment file at JOB_TEXT_INDEX_PATH (written by
+    scripts/build_job_text_index.py or by any worker), so a new worker only analyzes the
+    jobs whose text changed since it was written. Once JOB_TEXT_MERGE_MIN_CHANGES jobs
+    differ from the file, a rebuild folds them in and writes it again.
+    """
+    # Indexed attributes and their weights: a word in the title counts three times
+    TEXT_FIELDS = [('job_title', 3.0), ('requirements', 1.5), ('description', 1.0)]
+
+    _indexes = None  # (JobSearchIndex, FullTextIndex) searches read; replaced, never modified
+    _writes = []  # (job_id, values) not yet applied to _indexes
+    _segment_mtime = None  # modification time of the file the text segment was loaded from
+    _dirty = set()  # jobs whose text was partly updated, re-read before the next keyword search
+    _lock = threading.Lock()
+    _publish_lock = threading.Lock()  # one thread at a time copies the indexes to apply writes
+
+    @classmethod
+    def _load(cls, items, writes):
+        index = JobSearchIndex()
+        for item in items:
+            index.apply(item['job_id'], item)
+        text_index = cls._build_text_index(items)
+
+        dirty = set()
+        # Writes that raced with the scan are newer than what it returned
+        for key, values in writes:
+            cls._apply(index, text_index, dirty, key.get('job_id'), values)
+        with cls._publish_lock, cls._lock:
+            # Queued writes came before the scan, which already has them
+            cls._writes = []
+            cls._dirty = dirty
+            cls._indexes = (index, text_index)
+
+    @classmethod
+    def _build_text_index(cls, items):
+        """A FullTextIndex of items, starting from the newest segment available."""
+        indexes = cls._indexes
+        segment = indexes[1].segment if indexes is not None else None
+        try:
+            mtime = os.path.getmtime(Config.JOB_TEXT_INDEX_PATH)
+            if mtime != cls._segment_mtime:
+                segment, cls._segment_mtime = Segment.load(Config.JOB_TEXT_INDEX_PATH), mtime
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logging.warning(f"Ignoring job text index {Config.JOB_TEXT_INDEX_PATH}: {e}")
+
+        text_index = FullTextIndex(cls.TEXT_FIELDS, segment)
+        scanned = set()
+        for item in items:
+            scanned.add(item['job_id'])
+            text_index.apply(item['job_id'], item)
+        for job_id in set(text_index.doc_ids()) - scanned:
+            text_index.remove(job_id)
+
+        if text_index.delta_size >= Config.JOB_TEXT_MERGE_MIN_CHANGES:
+            segment = text_index.merged()
+            text_index = FullTextIndex(cls.TEXT_FIELDS, segment)
+            try:
+                segment.save(Config.JOB_TEXT_INDEX_PATH)
+                cls._segment_mtime = os.path.getmtime(Config.JOB_TEXT_INDEX_PATH)
+            except OSError as e:
+                logging.error(f"Error writing job text index {Config.JOB_TEXT_INDEX_PATH}: {e}")
+        return text_index
+
+    @staticmethod
+    def _apply(index, text_index, dirty, job_id, values):
+        index.apply(job_id, values)
+        if values is None or not values.get('is_active', True):
+            text_index.remove(job_id)
+            dirty.discard(job_id)
+        elif text_index.has_all_text(values) and ('job_id' in values or job_id in text_index):
+            text_index.apply(job_id, values)
+            dirty.discard(job_id)
+        elif text_index.has_text(values) and job_id in text_index:
+            # An edit of one field; the others are needed to analyze the job again
+            dirty.add(job_id)
+
+    @classmethod
+    def on_write(cls, key, values):
+        with cls._lock:
+            if cls._indexes is not None:
+                cls._writes.append((key.get('job_id'), values))
+
+    @classmethod
+    def _current(cls):
+        """The indexes to search, with every queued write applied."""
+        with cls._lock:
+            if not cls._writes:
+                return cls._indexes
+        with cls._publish_lock:
+            with cls._lock:
+                indexes, writes, dirty = cls._indexes, list(cls._writes), set(cls._dirty)
+            if not writes:
+                # Another search published them while this one waited
+                return indexes
+            index, text_index = indexes[0].copy(), indexes[1].copy()
+            for job_id, values in writes:
+                cls._apply(index, text_index, dirty, job_id, values)
+            with cls._lock:
+                del cls._writes[:len(writes)]
+                cls._dirty = dirty
+                cls._indexes = (index, text_index)
+                return cls._indexes
+
+    @classmethod
+    def _refresh_dirty(cls):
+        with cls._lock:
+            job_ids = list(cls._dirty)
+        if not job_ids:
+            return
+        items = DynamoDB.batch_get('Jobs', [{'job_id': job_id} for job_id in job_ids])
+        if items is None:
+            # Read failed (already logged); the jobs stay dirty and are retried on the next search
+            return
+        with cls._lock:
+            queued = {job_id for job_id, _ in cls._writes}
+            for job_id, item in zip(job_ids, items):
+                # Deletes are applied by the listener, so a missing item is a failed read to retry;
+                # a write after the read already settled the job, or will once it is applied
+                if item is not None and job_id in cls._dirty and job_id not in queued:
+                    cls._writes.append((job_id, item))
+
+    @classmethod
+    def search(cls, query=None, **filters):
+        """
+        JobSearchIndex.search over the active jobs. With query, only jobs matching its
+        keywords are kept (see FullTextIndex.search) and the default sort is relevance.
+        """
+        ActiveJobs.ensure_loaded()
+        with cls._lock:
+            if cls._indexes is None:
+                # The active jobs couldn't be read yet
+                cls._indexes = (JobSearchIndex(), FullTextIndex(cls.TEXT_FIELDS))
+        if query and query.strip():
+            # Applying the queued writes is what marks partly edited jobs dirty
+            cls._current()
+            cls._refresh_dirty()
+        index, text_index = cls._current()
+        if query and query.strip():
+            filters.setdefault('sort', 'relevance')
+            return index.search(scores=text_index.search(query), **filters)
+        return index.search(**filters)
+
+
+ActiveJobs.subscribe(JobSearchService._load, JobSearchService.on_write)
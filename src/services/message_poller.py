@@ -0,0 +1,116 @@
+# src/services/message_poller.py
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from cachetools import TTLCache
+
+from config import Config
+from .database_service import DynamoDB
+
+
+class MessagePoller:
+    """
+    One background thread per worker process that reads new messages once per tick and
+    hands them to the open /messages/stream connections of their sender and receiver.
+
+    SSE views subscribe() a queue for the logged-in participant and block on it. Messages
+    saved by this worker are dispatched straight from the DynamoDB write listener. Each
+    tick, the poll picks up those written by other workers by querying receiver_id-index
+    for every subscribed participant's messages newer than the previous tick. A tick costs
+    one Query per participant with an open stream (not per browser) and reads only the new
+    messages, whatever the size of the table. A message a participant sent through another
+    worker reaches their own streams with the next page load.
+    """
+    # Same table as Message.TABLE; the models import this package, so it can't be imported here
+    TABLE = 'ConversationMessages'
+    # Partitioned by receiver_id, sorted by message_key ('<timestamp>#<message_id>')
+    RECEIVER_INDEX = 'receiver_id-index'
+    QUEUE_SIZE = 100
+    # Re-read a little before the previous tick to catch writes that landed late; seen ids are skipped
+    OVERLAP_SECONDS = 5
+
+    _subscribers = {}  # participant_id -> set of queues
+    _seen = TTLCache(maxsize=10000, ttl=60)
+    _lock = threading.Lock()
+    _thread = None
+
+    @classmethod
+    def subscribe(cls, participant_id):
+        """Return a queue that receives every new message (raw item) sent to or by participant_id."""
+        subscription = queue.Queue(maxsize=cls.QUEUE_SIZE)
+        with cls._lock:
+            cls._subscribers.setdefault(participant_id, set()).add(subscription)
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(target=cls._run, name='message-poller', daemon=True)
+                cls._thread.start()
+        return subscription
+
+    @classmethod
+    def unsubscribe(cls, participant_id, subscription):
+        with cls._lock:
+            subscriptions = cls._subscribers.get(participant_id)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del cls._subscribers[participant_id]
+
+    @classmethod
+    def dispatch(cls, item):
+        with cls._lock:
+            if item['message_id'] in cls._seen:
+                return
+            cls._seen[item['message_id']] = True
+            subscriptions = set()
+            for participant_id in {item.get('sender_id'), item.get('receiver_id')}:
+                subscriptions |= cls._subscribers.get(participant_id, set())
+
+        for subscription in subscriptions:
+            try:
+                subscription.put_nowait(item)
+            except queue.Full:
+                # The client stopped reading; it will see the message on its next page load
+                logging.warning(f"Dropping message {item['message_id']} for a stalled message stream")
+
+    @classmethod
+    def _run(cls):
+        last_check = datetime.now(timezone.utc)
+        while True:
+            time.sleep(Config.MESSAGE_POLL_INTERVAL_SECONDS)
+            with cls._lock:
+                participant_ids = list(cls._subscribers)
+            if not participant_ids:
+                last_check = datetime.now(timezone.utc)
+                continue
+
+            tick = datetime.now(timezone.utc)
+            # message_key starts with the timestamp, so it can be bounded by one
+            since = (last_check - timedelta(seconds=cls.OVERLAP_SECONDS)).isoformat()
+            items = []
+            failed = False
+            for participant_id in participant_ids:
+                received = DynamoDB.query_range(cls.TABLE, participant_id, after=since,
+                                                index_name=cls.RECEIVER_INDEX)
+                if received is None:
+                    # Query failed (already logged)
+                    failed = True
+                    continue
+                items.extend(received)
+
+            for item in sorted(items, key=lambda item: item['message_key']):
+                cls.dispatch(item)
+            if not failed:
+                # Otherwise retry the same window next tick; messages already dispatched are skipped
+                last_check = tick
+
+
+def _dispatch_on_save(key, values):
+    # Only new messages; updates such as mark_as_read carry just the changed attributes
+    if values and 'sender_id' in values:
+        MessagePoller.dispatch(values)
+
+
+DynamoDB.add_write_listener(MessagePoller.TABLE, _dispatch_on_save)
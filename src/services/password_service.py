@@ -0,0 +1,92 @@
+# src/services/password_service.py
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+from config import Config
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and checking on a small process pool, so the ~250ms of CPU a login or
+    password change costs no longer runs on (and holds) the request thread, and several
+    requests can hash at once instead of queueing behind the GIL.
+
+    The pool runs bcrypt's own functions, so its processes only import bcrypt. At most
+    PASSWORD_HASH_MAX_PENDING hashes are submitted at a time; further callers wait for a
+    slot. PASSWORD_HASH_WORKERS = 0 hashes inline instead. New hashes use
+    BCRYPT_ROUNDS, and needs_rehash() tells callers when a stored hash was made with
+    another cost so it can be replaced after the next successful login, off the request
+    with rehash_in_background().
+    """
+    _pool = None
+    _pool_pid = None
+    _lock = threading.Lock()
+    _slots = threading.BoundedSemaphore(max(Config.PASSWORD_HASH_MAX_PENDING, 1))
+
+    @classmethod
+    def hash(cls, password):
+        """Return the bcrypt hash of password as a string."""
+        salt = bcrypt.gensalt(rounds=Config.BCRYPT_ROUNDS)
+        return cls._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    @classmethod
+    def verify(cls, password, hashed):
+        try:
+            return cls._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError as e:
+            logging.error(f"Stored password hash is not a valid bcrypt hash: {str(e)}")
+            return False
+
+    @classmethod
+    def rehash_in_background(cls, password, save):
+        """Hash password with BCRYPT_ROUNDS and hand the hash to save() on another thread, so the login doesn't wait."""
+        def run():
+            try:
+                save(cls.hash(password))
+            except Exception as e:
+                logging.error(f"Error rehashing password: {str(e)}")
+        threading.Thread(target=run, name='password-rehash', daemon=True).start()
+
+    @staticmethod
+    def needs_rehash(hashed):
+        """True when hashed ("$2b$<cost>$...") was made with a cost other than BCRYPT_ROUNDS."""
+        try:
+            return int(hashed.split('$')[2]) != Config.BCRYPT_ROUNDS
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    @classmethod
+    def _get_pool(cls):
+        if Config.PASSWORD_HASH_WORKERS <= 0:
+            return None
+        with cls._lock:
+            # A pool inherited from a parent process (e.g. gunicorn --preload) can't be used
+            if cls._pool is None or cls._pool_pid != os.getpid():
+                cls._pool = ProcessPoolExecutor(
+                    max_workers=Config.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context(Config.PASSWORD_HASH_START_METHOD)
+                )
+                cls._pool_pid = os.getpid()
+            return cls._pool
+
+    @classmethod
+    def _run(cls, function, *args):
+        pool = cls._get_pool()
+        if pool is None:
+            return function(*args)
+        with cls._slots:
+            try:
+                return pool.submit(function, *args).result()
+            except BrokenProcessPool as e:
+                logging.error(f"Password hashing pool failed, hashing inline: {str(e)}")
+                with cls._lock:
+                    if cls._pool is pool:
+                        cls._pool = None
+                return function(*args)
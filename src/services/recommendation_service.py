@@ -0,0 +1,159 @@
+# src/services/recommendation_service.py
+
+import threading
+
+import numpy as np
+
+from .active_jobs import ActiveJobs
+
+
+class RecommendationEngine:
+    """
+    Scores every active job against a user's profile in one vectorized pass.
+
+    Job skills, certifications, cities and titles are lower-cased and encoded into
+    shared vocabularies when the engine is built. Skills and certifications are kept
+    as sparse (job row, term column) pairs, so the number of a user's terms a job asks
+    for is a single bincount over the user's term mask.
+
+    Weights match the original per-job loop: skills 40%, city 30%,
+    certifications 20%, work history (exact job title) 10%.
+
+    The built engine is shared by the worker process and rebuilt from every ActiveJobs
+    snapshot, on its background thread while the current engine keeps serving. Jobs
+    writes made through DynamoDB ask for a new snapshot. The Job objects it returns are
+    shared between requests and must not be modified.
+    """
+    SKILLS_WEIGHT = 40
+    LOCATION_WEIGHT = 30
+    CERTIFICATIONS_WEIGHT = 20
+    WORK_HISTORY_WEIGHT = 10
+
+    _engine = None
+    _lock = threading.Lock()
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.skill_vocab = {}
+        self.cert_vocab = {}
+        self.city_vocab = {}
+        self.title_vocab = {}
+
+        self._skill_rows, self._skill_cols = self._encode_terms(jobs, 'skills', self.skill_vocab)
+        self._cert_rows, self._cert_cols = self._encode_terms(jobs, 'certifications', self.cert_vocab)
+        self._skill_counts = np.bincount(self._skill_rows, minlength=len(jobs))
+        self._cert_counts = np.bincount(self._cert_rows, minlength=len(jobs))
+        self._city_codes = self._encode_values(jobs, 'city', self.city_vocab)
+        self._title_codes = self._encode_values(jobs, 'job_title', self.title_vocab)
+
+        # Rank of each job by date_posted (ISO strings sort chronologically), used to break score ties
+        self._date_rank = np.empty(len(jobs), dtype=np.int64)
+        self._date_rank[sorted(range(len(jobs)), key=lambda i: jobs[i].date_posted or '')] = np.arange(len(jobs))
+
+    @staticmethod
+    def _encode_terms(jobs, attribute, vocab):
+        rows, cols = [], []
+        for row, job in enumerate(jobs):
+            codes = {vocab.setdefault(term.lower(), len(vocab)) for term in getattr(job, attribute) if term}
+            rows.extend([row] * len(codes))
+            cols.extend(codes)
+        return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+    @staticmethod
+    def _encode_values(jobs, attribute, vocab):
+        codes = np.full(len(jobs), -1, dtype=np.int64)
+        for row, job in enumerate(jobs):
+            value = getattr(job, attribute)
+            if value:
+                codes[row] = vocab.setdefault(value.lower(), len(vocab))
+        return codes
+
+    @staticmethod
+    def _term_mask(vocab, terms):
+        mask = np.zeros(len(vocab), dtype=np.float64)
+        codes = [vocab[term] for term in terms if term in vocab]
+        mask[codes] = 1.0
+        return mask
+
+    def _matched_counts(self, rows, cols, vocab, terms):
+        mask = self._term_mask(vocab, terms)
+        return np.bincount(rows, weights=mask[cols], minlength=len(self.jobs))
+
+    @staticmethod
+    def _match_ratio(matched, counts):
+        return np.divide(matched, counts, out=np.zeros(len(matched)), where=counts > 0)
+
+    def recommend(self, user, limit=None):
+        """
+        Return [{'job', 'score', 'matched_reasons'}] for jobs with at least one matched
+        reason, best score first and newest first among equal scores.
+        """
+        if not self.jobs:
+            return []
+
+        user_skills = {skill['skill'].lower() for skill in user.skills}
+        user_certs = {cert['type'].lower() for cert in user.certifications}
+        user_job_titles = {work['job_title'].lower() for work in user.work_history}
+
+        matched_skills = self._matched_counts(self._skill_rows, self._skill_cols, self.skill_vocab, user_skills)
+        matched_certs = self._matched_counts(self._cert_rows, self._cert_cols, self.cert_vocab, user_certs)
+
+        city_match = np.zeros(len(self.jobs), dtype=bool)
+        if user.city and user.country and user.city.lower() in self.city_vocab:
+            city_match = self._city_codes == self.city_vocab[user.city.lower()]
+
+        title_codes = [self.title_vocab[title] for title in user_job_titles if title in self.title_vocab]
+        title_match = np.isin(self._title_codes, title_codes)
+
+        scores = (self._match_ratio(matched_skills, self._skill_counts) * self.SKILLS_WEIGHT
+                  + city_match * self.LOCATION_WEIGHT
+                  + self._match_ratio(matched_certs, self._cert_counts) * self.CERTIFICATIONS_WEIGHT
+                  + title_match * self.WORK_HISTORY_WEIGHT)
+
+        candidates = np.flatnonzero((matched_skills > 0) | city_match | (matched_certs > 0) | title_match)
+        if limit is not None and limit < len(candidates):
+            if limit <= 0:
+                return []
+            # Keep everything tied with the k-th best score so the date tie-break stays exact
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            threshold = scores[candidates[top]].min()
+            candidates = candidates[scores[candidates] >= threshold]
+
+        order = candidates[np.lexsort((self._date_rank[candidates], scores[candidates]))[::-1]]
+        if limit is not None:
+            order = order[:limit]
+
+        recommended_jobs = []
+        for row in order:
+            job = self.jobs[row]
+            matched_reasons = {
+                'skills': list(user_skills & {skill.lower() for skill in job.skills}),
+                'location': 'City match' if city_match[row] else '',
+                'certifications': list(user_certs & {cert.lower() for cert in job.certifications}),
+                'work_history': [job.job_title.lower()] if title_match[row] else []
+            }
+            recommended_jobs.append({
+                'job': job,
+                'matched_reasons': matched_reasons,
+                'score': float(scores[row])
+            })
+        return recommended_jobs
+
+    @classmethod
+    def get(cls):
+        """Return the process-wide engine (an empty one while the active jobs can't be read)."""
+        ActiveJobs.ensure_loaded()
+        with cls._lock:
+            return cls._engine or cls([])
+
+    @classmethod
+    def _load(cls, items, writes):
+        # Writes that raced with the scan left ActiveJobs stale, so the next snapshot has them
+        # Imported here because the models import this package
+        from ..models.job_model import Job
+        engine = cls([Job(**item) for item in items])
+        with cls._lock:
+            cls._engine = engine
+
+
+ActiveJobs.subscribe(RecommendationEngine._load, reload_on_write=True)
@@ -0,0 +1,143 @@
+import copy
+import datetime
+import threading
+import time
+
+from cachetools import TTLCache
+
+from config import Config
+from .database_service import DynamoDB
+
+
+class SessionCache:
+    """
+    Bounded LRU + TTL caches of session_id -> session record and of principal
+    ('<user_type>#<id>') -> (logged-in user, admin or employer, its session epoch), so a
+    cache hit in load_session reads nothing from DynamoDB.
+
+    A session is only trusted while the epoch it was created under is still the
+    principal's current one. Logging in or out, changing a password, locking an account
+    and admin edits bump the epoch; every other write to a principal's row touches its
+    SessionEpochs row. Both set last_modified there, and a background thread queries the
+    last_modified-index every SESSION_SYNC_POLL_SECONDS for principals changed since its
+    previous poll and drops them, so other workers re-read them (and reject revoked
+    sessions) on their next request. Writes through this worker drop the principal
+    directly. If polling has failed for SESSION_SYNC_STALE_SECONDS, principals are read
+    fresh until it recovers.
+
+    Callers get their own deep copy of a cached principal, so changes made while handling
+    one request can't leak into others.
+    """
+    # Same table as SessionManager.EPOCH_TABLE, which imports this module
+    EPOCH_TABLE = 'SessionEpochs'
+    INDEX = 'last_modified-index'
+    # Every epoch row sits in one change feed partition of INDEX
+    CHANGE_PARTITION = 'epochs'
+    # Re-read a little before the previous poll to catch index updates that landed late
+    OVERLAP_SECONDS = 5
+
+    _cache = TTLCache(maxsize=Config.SESSION_CACHE_SIZE, ttl=Config.SESSION_CACHE_TTL_SECONDS)
+    _principals = TTLCache(maxsize=Config.SESSION_CACHE_SIZE, ttl=Config.SESSION_CACHE_TTL_SECONDS)
+    _invalidations = 0  # bumped whenever a principal is dropped, so a read racing it doesn't cache what it read
+    _synced_at = None  # monotonic time of the last successful poll
+    _lock = threading.Lock()
+    _thread = None
+
+    @staticmethod
+    def now():
+        """A last_modified value for an epoch row written now (naive UTC)."""
+        return datetime.datetime.utcnow().isoformat()
+
+    @classmethod
+    def get(cls, session_id):
+        """Return the cached session record, or None."""
+        with cls._lock:
+            session = cls._cache.get(session_id)
+        if session is None:
+            return None
+
+        expires_at = datetime.datetime.fromisoformat(session['expires_at'])
+        if datetime.datetime.utcnow() >= expires_at:
+            cls.invalidate_session(session_id)
+            return None
+        return session
+
+    @classmethod
+    def put(cls, session_id, session):
+        with cls._lock:
+            cls._cache[session_id] = session
+
+    @classmethod
+    def invalidate_session(cls, session_id):
+        with cls._lock:
+            cls._cache.pop(session_id, None)
+
+    @classmethod
+    def version(cls):
+        """Take this before reading a principal and pass it to put_principal."""
+        with cls._lock:
+            return cls._invalidations
+
+    @classmethod
+    def get_principal(cls, principal):
+        """(a private copy of the principal, its epoch), or None when it has to be read."""
+        if not cls._is_synced():
+            return None
+        with cls._lock:
+            entry = cls._principals.get(principal)
+        if entry is None:
+            return None
+        user, epoch = entry
+        return copy.deepcopy(user), epoch
+
+    @classmethod
+    def put_principal(cls, principal, user, epoch, version):
+        with cls._lock:
+            if version == cls._invalidations:
+                cls._principals[principal] = (copy.deepcopy(user), epoch)
+
+    @classmethod
+    def invalidate_principal(cls, principal):
+        with cls._lock:
+            cls._invalidations += 1
+            cls._principals.pop(principal, None)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._invalidations += 1
+            cls._cache.clear()
+            cls._principals.clear()
+
+    @classmethod
+    def _is_synced(cls):
+        if cls._thread is None or not cls._thread.is_alive():
+            with cls._lock:
+                if cls._thread is None or not cls._thread.is_alive():
+                    # Principals cached before a restart may have missed changes, so start empty
+                    cls._invalidations += 1
+                    cls._principals.clear()
+                    cls._synced_at = time.monotonic()
+                    cls._thread = threading.Thread(target=cls._run, name='session-sync', daemon=True)
+                    cls._thread.start()
+        return time.monotonic() - cls._synced_at < Config.SESSION_SYNC_STALE_SECONDS
+
+    @classmethod
+    def _run(cls):
+        last_check = datetime.datetime.utcnow()
+        while True:
+            time.sleep(Config.SESSION_SYNC_POLL_SECONDS)
+            tick = datetime.datetime.utcnow()
+            since = (last_check - datetime.timedelta(seconds=cls.OVERLAP_SECONDS)).isoformat()
+            items = DynamoDB.query_range(cls.EPOCH_TABLE, cls.CHANGE_PARTITION, after=since, index_name=cls.INDEX)
+            if items is None:
+                # Query failed (already logged); retry the same window next poll
+                continue
+
+            with cls._lock:
+                if items:
+                    cls._invalidations += 1
+                for item in items:
+                    cls._principals.pop(item['principal'], None)
+                cls._synced_at = time.monotonic()
+            last_check = tick
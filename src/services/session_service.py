@@ -1,3 +1,4 @@
+import logging
 import uuid
 import datetime
 import json
@@ -5,15 +6,57 @@ from flask import request, g
 import hmac
 
 from .database_service import DynamoDB
+from .session_cache import SessionCache
 
 class SessionManager:
     SESSION_TABLE = 'Sessions'
+    # Per-principal revocation counter, shared with SignedCookieSessionManager
+    EPOCH_TABLE = 'SessionEpochs'
     SESSION_DURATION_HOURS = 24  # Session valid for 24 hours
+    # Principal table -> (user_type, id attribute), whose writes SessionCache has to hear about
+    PRINCIPAL_TABLES = {
+        'Users': ('user', 'user_id'),
+        'Employers': ('employer', 'employer_id'),
+        'Admins': ('admin', 'admin_id'),
+    }
+
+    @staticmethod
+    def principal(user_id, user_type):
+        return f"{user_type}#{user_id}"
+
+    @classmethod
+    def bump_epoch(cls, user_id, user_type):
+        """
+        Revoke every session issued so far for this principal and return the new epoch.
+        A session records the epoch it was created under and is only valid while that is
+        still the current one, which lets SessionCache trust cached sessions on every worker.
+        Called on login and logout, password changes, account locks and admin edits.
+        """
+        principal = cls.principal(user_id, user_type)
+        attributes = DynamoDB.update_counters(cls.EPOCH_TABLE, {'principal': principal}, {'epoch': 1},
+                                              cls._change_feed_values(), return_values='UPDATED_NEW')
+        if attributes is None:
+            logging.error(f"Error revoking sessions for {principal}")
+            return None
+        return int(attributes['epoch'])
+
+    @classmethod
+    def touch(cls, user_id, user_type):
+        """Tell every worker's SessionCache the principal changed, without revoking its sessions."""
+        principal = cls.principal(user_id, user_type)
+        if DynamoDB.update_counters(cls.EPOCH_TABLE, {'principal': principal}, set_values=cls._change_feed_values()) is None:
+            logging.error(f"Error publishing the change to {principal}")
+
+    @staticmethod
+    def _change_feed_values():
+        return {'change_partition': SessionCache.CHANGE_PARTITION, 'last_modified': SessionCache.now()}
 
     @classmethod
     def create_session(cls, user_id, user_type):
         # Remove existing sessions if needed
-        cls.remove_existing_sessions(user_id, user_type)
+        epoch = cls.remove_existing_sessions(user_id, user_type)
+        if epoch is None:
+            return None
 
         session_id = str(uuid.uuid4())
         created_at = datetime.datetime.utcnow()
@@ -25,6 +68,7 @@ class SessionManager:
             'user_type': user_type,  # Store user type
             'created_at': created_at.isoformat(),
             'expires_at': expires_at.isoformat(),
+            'epoch': epoch,
             'data': {}  # Additional session data
         }
 
@@ -35,19 +79,15 @@ class SessionManager:
 
     @classmethod
     def remove_existing_sessions(cls, user_id, user_type):
-        table = DynamoDB.dynamodb.Table(cls.SESSION_TABLE)
         try:
-            response = table.scan(
-                FilterExpression='user_id = :uid AND user_type = :utype',
-                ExpressionAttributeValues={
-                    ':uid': user_id,
-                    ':utype': user_type
-                }
-            )
-            for item in response.get('Items', []):
-                cls.delete_session(item['session_id'])
+            items = DynamoDB.query_index(cls.SESSION_TABLE, 'user_id-index',
+                                         {'user_id': user_id, 'user_type': user_type})
+            for item in items or []:
+                cls.delete_session(item['session_id'], revoke=False)
         except Exception as e:
             print(f"Error removing existing sessions for user {user_id}: {e}")
+        # One bump revokes them all, including copies other workers still have cached
+        return cls.bump_epoch(user_id, user_type)
 
     @classmethod
     def get_session(cls, session_id):
@@ -59,14 +99,19 @@ class SessionManager:
                 return item
             else:
                 # Session expired, delete it
-                cls.delete_session(session_id)
+                cls.delete_session(session_id, revoke=False)
         return None
 
     @classmethod
-    def delete_session(cls, session_id):
+    def delete_session(cls, session_id, revoke=True):
+        SessionCache.invalidate_session(session_id)
         table = DynamoDB.dynamodb.Table(cls.SESSION_TABLE)
         try:
-            table.delete_item(Key={'session_id': session_id})
+            response = table.delete_item(Key={'session_id': session_id}, ReturnValues='ALL_OLD')
+            session = response.get('Attributes')
+            # Bump after the delete, so a worker that reads the new epoch can no longer read the session
+            if revoke and session and 'epoch' in session:
+                cls.bump_epoch(session['user_id'], session['user_type'])
             return True
         except Exception as e:
             print(f"Error deleting session {session_id}: {e}")
@@ -88,13 +133,32 @@ class SessionManager:
 
     @classmethod
     def cleanup_expired_sessions(cls):
-        table = DynamoDB.dynamodb.Table(cls.SESSION_TABLE)
         try:
-            response = table.scan(
+            items = DynamoDB.scan_iter(
+                cls.SESSION_TABLE,
                 FilterExpression='expires_at < :now',
-                ExpressionAttributeValues={':now': datetime.datetime.utcnow().isoformat()}
+                ExpressionAttributeValues={':now': datetime.datetime.utcnow().isoformat()},
+                segments=DynamoDB.PARALLEL_SCAN_SEGMENTS
             )
-            for item in response.get('Items', []):
-                cls.delete_session(item['session_id'])
+            for item in items:
+                # Expired sessions are rejected on read anyway, no need to revoke anything
+                cls.delete_session(item['session_id'], revoke=False)
         except Exception as e:
             print(f"Error cleaning up expired sessions: {e}")
+
+
+def _touch_on_write(table_name):
+    user_type, id_attribute = SessionManager.PRINCIPAL_TABLES[table_name]
+
+    def listener(key, values):
+        principal_id = key.get(id_attribute)
+        # Drop this worker's copy now; the touch reaches the other workers through the change feed
+        SessionCache.invalidate_principal(SessionManager.principal(principal_id, user_type))
+        SessionManager.touch(principal_id, user_type)
+    return listener
+
+
+for _table_name in SessionManager.PRINCIPAL_TABLES:
+    DynamoDB.add_write_listener(_table_name, _touch_on_write(_table_name))
+DynamoDB.add_write_listener(SessionManager.EPOCH_TABLE,
+                            lambda key, values: SessionCache.invalidate_principal(key.get('principal')))
@@ -0,0 +1,161 @@
+import datetime
+import threading
+import uuid
+
+from cachetools import TTLCache
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from config import Config
+from .database_service import DynamoDB
+from .session_cache import SessionCache
+from .session_service import SessionManager
+
+
+class SignedCookieSessionManager:
+    """
+    Stateless alternative to SessionManager, selected with SESSION_BACKEND=signed_cookie.
+
+    user_id, user_type and expiry travel in the session_id cookie itself, HMAC-signed
+    with SECRET_KEY and, when SESSION_ENCRYPTION_KEY is set, encrypted with Fernet, so
+    loading a session doesn't touch the Sessions table.
+
+    Revocation goes through a per-principal epoch in the SessionEpochs table: a token is
+    only valid while its epoch matches the stored one, and logging in or out bumps it.
+    get_session caches epochs per worker for SESSION_EPOCH_CACHE_TTL_SECONDS; load_session
+    then checks the token against the principal's epoch in SessionCache, which every worker
+    refreshes from the SessionEpochs change feed, so a revoked cookie is rejected within
+    SESSION_SYNC_POLL_SECONDS.
+    """
+    EPOCH_TABLE = SessionManager.EPOCH_TABLE
+    SESSION_DURATION_HOURS = SessionManager.SESSION_DURATION_HOURS
+
+    _serializer = URLSafeSerializer(Config.SECRET_KEY, salt='session-cookie')
+    _epochs = TTLCache(maxsize=Config.SESSION_CACHE_SIZE, ttl=Config.SESSION_EPOCH_CACHE_TTL_SECONDS)
+    _lock = threading.Lock()
+    _fernet = None
+
+    @classmethod
+    def _cipher(cls):
+        if not Config.SESSION_ENCRYPTION_KEY:
+            return None
+        if cls._fernet is None:
+            try:
+                from cryptography.fernet import Fernet
+            except ImportError as e:
+                raise RuntimeError("SESSION_ENCRYPTION_KEY is set but the 'cryptography' package is not installed") from e
+            cls._fernet = Fernet(Config.SESSION_ENCRYPTION_KEY)
+        return cls._fernet
+
+    @staticmethod
+    def _principal(user_id, user_type):
+        return SessionManager.principal(user_id, user_type)
+
+    @classmethod
+    def _encode(cls, payload):
+        token = cls._serializer.dumps(payload)
+        cipher = cls._cipher()
+        if cipher:
+            token = cipher.encrypt(token.encode('utf-8')).decode('utf-8')
+        return token
+
+    @classmethod
+    def _decode(cls, token):
+        try:
+            cipher = cls._cipher()
+            if cipher:
+                from cryptography.fernet import InvalidToken
+                try:
+                    token = cipher.decrypt(token.encode('utf-8')).decode('utf-8')
+                except InvalidToken:
+                    return None
+            return cls._serializer.loads(token)
+        except BadSignature:
+            return None
+
+    @classmethod
+    def _get_epoch(cls, principal, refresh=False):
+        with cls._lock:
+            epoch = None if refresh else cls._epochs.get(principal)
+        if epoch is None:
+            item = DynamoDB.get_item(cls.EPOCH_TABLE, {'principal': principal})
+            epoch = int(item.get('epoch', 0)) if item else 0
+            with cls._lock:
+                cls._epochs[principal] = epoch
+        return epoch
+
+    @classmethod
+    def _bump_epoch(cls, user_id, user_type):
+        """Invalidate every token issued so far for this principal and return the new epoch."""
+        epoch = SessionManager.bump_epoch(user_id, user_type)
+        if epoch is not None:
+            with cls._lock:
+                cls._epochs[cls._principal(user_id, user_type)] = epoch
+        return epoch
+
+    @classmethod
+    def create_session(cls, user_id, user_type):
+        # Like SessionManager, a new login ends the principal's other sessions
+        epoch = cls._bump_epoch(user_id, user_type)
+        if epoch is None:
+            return None
+
+        created_at = datetime.datetime.utcnow()
+        expires_at = created_at + datetime.timedelta(hours=cls.SESSION_DURATION_HOURS)
+        return cls._encode({
+            'sid': uuid.uuid4().hex,
+            'uid': user_id,
+            'typ': user_type,
+            'iat': created_at.isoformat(),
+            'exp': expires_at.isoformat(),
+            'ep': epoch
+        })
+
+    @classmethod
+    def remove_existing_sessions(cls, user_id, user_type):
+        return cls._bump_epoch(user_id, user_type)
+
+    @classmethod
+    def get_session(cls, session_id):
+        payload = cls._decode(session_id)
+        if not payload:
+            return None
+
+        if datetime.datetime.utcnow() >= datetime.datetime.fromisoformat(payload['exp']):
+            return None
+
+        principal = cls._principal(payload['uid'], payload['typ'])
+        epoch = cls._get_epoch(principal)
+        if payload['ep'] > epoch:
+            # Issued by another worker after our cached epoch was read
+            epoch = cls._get_epoch(principal, refresh=True)
+        if payload['ep'] != epoch:
+            return None
+
+        return {
+            'session_id': session_id,
+            'user_id': payload['uid'],
+            'user_type': payload['typ'],
+            'created_at': payload['iat'],
+            'expires_at': payload['exp'],
+            'epoch': payload['ep'],
+            'data': {}
+        }
+
+    @classmethod
+    def delete_session(cls, session_id):
+        SessionCache.invalidate_session(session_id)
+        payload = cls._decode(session_id)
+        if not payload:
+            return False
+        return cls._bump_epoch(payload['uid'], payload['typ']) is not None
+
+    @classmethod
+    def update_session_data(cls, session_id, data):
+        # Nothing is stored server side; session data would have to be re-issued in the cookie
+        print("update_session_data is not supported by the signed cookie session backend")
+        return False
+
+    @classmethod
+    def cleanup_expired_sessions(cls):
+        # Expired cookies are rejected on read, there is nothing to clean up
+        pass
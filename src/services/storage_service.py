@@ -0,0 +1,159 @@
+# src/services/storage_service.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import BotoCoreError, ClientError
+
+from config import Config
+
+MB = 1024 * 1024
+
+
+class StorageService:
+    """
+    Uploads and deletes in the app's S3 bucket through one client shared by every request
+    in the worker (boto3 clients are thread-safe), so connections are pooled instead of
+    being set up for each upload.
+
+    Files larger than S3_MULTIPART_THRESHOLD_MB go up as multipart uploads of
+    S3_MULTIPART_CHUNK_MB parts, S3_UPLOAD_CONCURRENCY at a time. Parts are read from the
+    upload's stream as they are sent; Werkzeug already spools request files over 500KB to
+    a temporary file, so a large certification never sits in worker memory whole.
+    Deleting replaced or removed objects happens on a background pool, off the request.
+    presigned_post() lets browsers skip the app and upload straight to the bucket.
+    """
+    _client = None
+    _transfer_config = None
+    _delete_pool = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls):
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    cls._client = boto3.client(
+                        's3',
+                        region_name=Config.S3_REGION,
+                        aws_access_key_id=Config.AWS_ACCESS_KEY,
+                        aws_secret_access_key=Config.AWS_SECRET_KEY,
+                        config=BotocoreConfig(
+                            max_pool_connections=Config.S3_MAX_POOL_CONNECTIONS,
+                            retries={'max_attempts': 5, 'mode': 'standard'}
+                        )
+                    )
+        return cls._client
+
+    @classmethod
+    def get_transfer_config(cls):
+        if cls._transfer_config is None:
+            cls._transfer_config = TransferConfig(
+                multipart_threshold=Config.S3_MULTIPART_THRESHOLD_MB * MB,
+                multipart_chunksize=Config.S3_MULTIPART_CHUNK_MB * MB,
+                max_concurrency=Config.S3_UPLOAD_CONCURRENCY,
+                use_threads=Config.S3_UPLOAD_CONCURRENCY > 1
+            )
+        return cls._transfer_config
+
+    @staticmethod
+    def url_for_key(key):
+        return f"https://{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/{key}"
+
+    @staticmethod
+    def key_from_url(url):
+        """The object key of a URL made by url_for_key, or None for any other URL."""
+        prefix = f"{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/"
+        if not url or prefix not in url:
+            return None
+        return url.split(prefix, 1)[1] or None
+
+    @classmethod
+    def upload(cls, file, key, content_type=None):
+        """
+        Stream file (a file object or Werkzeug FileStorage) to key as a public object.
+        Returns its URL, or None if the upload failed.
+        """
+        extra_args = {'ACL': 'public-read'}
+        if content_type:
+            extra_args['ContentType'] = content_type
+        try:
+            cls.get_client().upload_fileobj(
+                getattr(file, 'stream', file),
+                Config.S3_BUCKET_NAME,
+                key,
+                ExtraArgs=extra_args,
+                Config=cls.get_transfer_config()
+            )
+            return cls.url_for_key(key)
+        except (BotoCoreError, ClientError) as e:
+            logging.error(f"Error uploading {key} to S3: {str(e)}")
+            return None
+
+    @classmethod
+    def presigned_post(cls, key, content_type, max_bytes):
+        """
+        A presigned POST ({'url', 'fields'}) that lets a browser upload one public object to
+        key directly, with exactly content_type and at most max_bytes; None on error.
+        """
+        try:
+            return cls.get_client().generate_presigned_post(
+                Bucket=Config.S3_BUCKET_NAME,
+                Key=key,
+                Fields={'acl': 'public-read', 'Content-Type': content_type},
+                Conditions=[
+                    {'acl': 'public-read'},
+                    {'Content-Type': content_type},
+                    ['content-length-range', 1, max_bytes]
+                ],
+                ExpiresIn=Config.S3_PRESIGN_EXPIRES_SECONDS
+            )
+        except (BotoCoreError, ClientError) as e:
+            logging.error(f"Error presigning upload of {key}: {str(e)}")
+            return None
+
+    @classmethod
+    def head(cls, key):
+        """The object's metadata (ContentLength, ContentType, ...), or None if it doesn't exist."""
+        try:
+            return cls.get_client().head_object(Bucket=Config.S3_BUCKET_NAME, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                logging.error(f"Error reading {key} from S3: {str(e)}")
+            return None
+        except BotoCoreError as e:
+            logging.error(f"Error reading {key} from S3: {str(e)}")
+            return None
+
+    @classmethod
+    def delete(cls, key):
+        try:
+            cls.get_client().delete_object(Bucket=Config.S3_BUCKET_NAME, Key=key)
+            return True
+        except (BotoCoreError, ClientError) as e:
+            logging.error(f"Error deleting {key} from S3: {str(e)}")
+            return False
+
+    @classmethod
+    def delete_later(cls, key):
+        """Delete key on the background pool; failures are logged."""
+        if not key:
+            return
+        if cls._delete_pool is None:
+            with cls._lock:
+                if cls._delete_pool is None:
+                    cls._delete_pool = ThreadPoolExecutor(max_workers=Config.S3_DELETE_WORKERS,
+                                                          thread_name_prefix='s3-delete')
+        cls._delete_pool.submit(cls.delete, key)
+
+    @classmethod
+    def delete_url_later(cls, url):
+        key = cls.key_from_url(url)
+        if key is None:
+            logging.warning(f"Not deleting {url}: not an object in {Config.S3_BUCKET_NAME}")
+            return
+        cls.delete_later(key)
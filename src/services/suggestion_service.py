@@ -0,0 +1,144 @@
+# src/services/suggestion_service.py
+
+import logging
+import os
+import threading
+
+import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from Lambda.suggestion_index import FUZZY_KINDS, SOURCES, SuggestionIndex, entries_from_rows, rows_from_file
+
+
+class SuggestionService:
+    """
+    Autocomplete for the city, skill, occupation and certification fields.
+
+    With Config.SUGGESTIONS_BACKEND = 'local' each worker answers from the same
+    SuggestionIndex the Lambdas use, loaded once from SUGGESTION_INDEX_DIR: a prebuilt
+    <kind>.idx (Lambda/build_suggestion_index.py) is memory-mapped, otherwise <kind>.csv
+    is indexed at first use. Kinds with neither file, and the 'lambda' backend, are
+    answered by the API Gateway endpoints.
+
+    API calls share one pooled requests.Session, and their answers are cached per worker
+    by (kind, normalized query). Identical queries arriving while a call is still in flight
+    wait for that call instead of making their own.
+    """
+    KINDS = tuple(SOURCES)
+    # Per-endpoint request timeouts; the city endpoint has always been given longer
+    REMOTE_TIMEOUTS = {'city': 10}
+    DEFAULT_REMOTE_TIMEOUT = 5
+
+    _indexes = {}  # kind -> SuggestionIndex, or None when there is nothing to load
+    _lock = threading.Lock()
+
+    _session = None
+    _cache = TTLCache(maxsize=Config.SUGGESTIONS_CACHE_SIZE, ttl=Config.SUGGESTIONS_CACHE_TTL_SECONDS)
+    _in_flight = {}  # (kind, query) -> threading.Event set once the call has finished
+    _remote_lock = threading.Lock()
+
+    @classmethod
+    def suggest(cls, kind, query):
+        """Up to ten suggestions for query, or None when the suggestions API could not answer."""
+        query = cls.normalize(query)
+        if not query:
+            return []
+        if Config.SUGGESTIONS_BACKEND == 'local':
+            index = cls.get_index(kind)
+            if index is not None:
+                return index.search(query)
+        return cls._remote_suggestions(kind, query)
+
+    @staticmethod
+    def normalize(query):
+        # Every backend matches case-insensitively on the trimmed query
+        return ' '.join(query.split()).lower()
+
+    @classmethod
+    def get_index(cls, kind):
+        if kind not in cls._indexes:
+            with cls._lock:
+                if kind not in cls._indexes:
+                    cls._indexes[kind] = cls._load_index(kind)
+        return cls._indexes[kind]
+
+    @classmethod
+    def preload(cls):
+        """Load every index up front, e.g. before a preforking server starts its workers."""
+        for kind in cls.KINDS:
+            cls.get_index(kind)
+
+    @staticmethod
+    def _load_index(kind):
+        directory = Config.SUGGESTION_INDEX_DIR
+        index_path = os.path.join(directory, f"{kind}.idx")
+        csv_path = os.path.join(directory, f"{kind}.csv")
+        try:
+            if os.path.exists(index_path):
+                index = SuggestionIndex.load(index_path)
+            elif os.path.exists(csv_path):
+                rows = rows_from_file(csv_path)
+                index = SuggestionIndex.build(entries_from_rows(rows, kind), fuzzy=kind in FUZZY_KINDS)
+            else:
+                logging.info(f"No local {kind} suggestion data in {directory}, using the API")
+                return None
+            logging.info(f"Loaded {len(index)} {kind} suggestions")
+            return index
+        except Exception as e:
+            logging.error(f"Error loading {kind} suggestion index: {e}")
+            return None
+
+    @classmethod
+    def get_session(cls):
+        if cls._session is None:
+            with cls._remote_lock:
+                if cls._session is None:
+                    adapter = HTTPAdapter(pool_connections=len(cls.KINDS), pool_maxsize=Config.SUGGESTIONS_HTTP_POOL_SIZE)
+                    session = requests.Session()
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    cls._session = session
+        return cls._session
+
+    @classmethod
+    def _remote_suggestions(cls, kind, query):
+        key = (kind, query)
+        with cls._remote_lock:
+            if key in cls._cache:
+                return cls._cache[key]
+            done = cls._in_flight.get(key)
+            leader = done is None
+            if leader:
+                done = cls._in_flight[key] = threading.Event()
+
+        if not leader:
+            # Another request is already asking for the same query; use its answer
+            done.wait(cls.REMOTE_TIMEOUTS.get(kind, cls.DEFAULT_REMOTE_TIMEOUT))
+            with cls._remote_lock:
+                return cls._cache.get(key)
+
+        try:
+            suggestions = cls._fetch(kind, query)
+            if suggestions is not None:
+                with cls._remote_lock:
+                    cls._cache[key] = suggestions
+            return suggestions
+        finally:
+            with cls._remote_lock:
+                cls._in_flight.pop(key, None)
+            done.set()
+
+    @classmethod
+    def _fetch(cls, kind, query):
+        url = f"{Config.SUGGESTIONS_API_URL.rstrip('/')}/{kind}"
+        timeout = cls.REMOTE_TIMEOUTS.get(kind, cls.DEFAULT_REMOTE_TIMEOUT)
+        try:
+            response = cls.get_session().get(url, params={'query': query}, timeout=timeout)
+            if response.status_code == 200:
+                return response.json().get('suggestions', [])
+            logging.error(f"{kind} suggestions API error: {response.status_code} - {response.text}")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.error(f"Error calling the {kind} suggestions API: {e}")
+        return None
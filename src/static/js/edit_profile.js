@@ -41,9 +41,23 @@ $(document).ready(function() {
     initializeDatePickers('.date-picker');
 
     // Handle Profile Picture Upload
+    function profilePictureUploaded(response) {
+        if(response.success) {
+            $('#profile-picture').attr('src', response.profile_picture_url);
+            showNotification('Profile picture updated successfully.', 'success');
+        } else {
+            showNotification(response.message, 'error');
+        }
+    }
+
     $('#profile-picture-input').on('change', function() {
-        var formData = new FormData();
         var file = this.files[0];
+        if (CONFIG.directUploads) {
+            uploadDirect('profile_picture', file, {}, profilePictureUploaded);
+            return;
+        }
+
+        var formData = new FormData();
         formData.append('profile_picture', file);
 
         $.ajax({
@@ -52,21 +66,37 @@ $(document).ready(function() {
             data: formData,
             contentType: false,
             processData: false,
-            success: function(response) {
-                if(response.success) {
-                    $('#profile-picture').attr('src', response.profile_picture_url);
-                    showNotification('Profile picture updated successfully.', 'success');
-                } else {
-                    showNotification(response.message, 'error');
-                }
-            },
+            success: profilePictureUploaded,
             error: handleAjaxError
         });
     });
 
     // Handle Adding a New Certification
+    function certificationUploaded(response) {
+        if(response.success) {
+            // Append the new certification to the list
+            $('#certifications-list').append(`
+                <li id="cert-${response.certifications[0].id}">
+                    <a href="${response.certifications[0].url}" target="_blank">${response.certifications[0].filename}</a> (${response.certifications[0].type})
+                    <button type="button" class="delete-cert-button" data-id="${response.certifications[0].id}">Delete</button>
+                </li>
+            `);
+            // Clear the form
+            $('#add-certification-form')[0].reset();
+            showNotification('Certification added successfully.', 'success');
+        } else {
+            showNotification(response.message, 'error');
+        }
+    }
+
     $('#add-certification-form').on('submit', function(e) {
         e.preventDefault();
+        if (CONFIG.directUploads) {
+            uploadDirect('certification', $('#cert_file')[0].files[0], {cert_type: $('#cert_type').val()},
+                certificationUploaded);
+            return;
+        }
+
         var formData = new FormData(this);
 
         $.ajax({
@@ -75,22 +105,7 @@ $(document).ready(function() {
             data: formData,
             contentType: false,
             processData: false,
-            success: function(response) {
-                if(response.success) {
-                    // Append the new certification to the list
-                    $('#certifications-list').append(`
-                        <li id="cert-${response.certifications[0].id}">
-                            <a href="${response.certifications[0].url}" target="_blank">${response.certifications[0].filename}</a> (${response.certifications[0].type})
-                            <button type="button" class="delete-cert-button" data-id="${response.certifications[0].id}">Delete</button>
-                        </li>
-                    `);
-                    // Clear the form
-                    $('#add-certification-form')[0].reset();
-                    showNotification('Certification added successfully.', 'success');
-                } else {
-                    showNotification(response.message, 'error');
-                }
-            },
+            success: certificationUploaded,
             error: handleAjaxError
         });
     });
@@ -236,3 +251,63 @@ function initializeDatePickers(selector) {
         dateFormat: 'yy-mm-dd'
     });
 }
+
+// Upload a file straight to S3: ask the app for a presigned POST, send the file to S3 with it,
+// then tell the app the upload is done. done receives the app's response to the last step.
+function uploadDirect(kind, file, extra, done) {
+    if (!file) {
+        showNotification('Please choose a file.', 'error');
+        return;
+    }
+    // The app answers 400 with a message for files it won't take
+    function appError(jqXHR, textStatus, errorThrown) {
+        if (jqXHR.responseJSON && jqXHR.responseJSON.message) {
+            showNotification(jqXHR.responseJSON.message, 'error');
+        } else {
+            handleAjaxError(jqXHR, textStatus, errorThrown);
+        }
+    }
+
+    $.ajax({
+        url: CONFIG.presignUploadUrl,
+        type: 'POST',
+        contentType: 'application/json',
+        data: JSON.stringify({ kind: kind, filename: file.name }),
+        success: function(upload) {
+            if (!upload.success) {
+                showNotification(upload.message, 'error');
+                return;
+            }
+            var formData = new FormData();
+            $.each(upload.fields, function(name, value) {
+                formData.append(name, value);
+            });
+            // S3 ignores form fields after the file
+            formData.append('file', file);
+
+            $.ajax({
+                url: upload.url,
+                type: 'POST',
+                data: formData,
+                contentType: false,
+                processData: false,
+                success: function() {
+                    $.ajax({
+                        url: CONFIG.completeUploadUrl,
+                        type: 'POST',
+                        contentType: 'application/json',
+                        data: JSON.stringify($.extend({ kind: kind, key: upload.key }, extra)),
+                        success: done,
+                        error: appError
+                    });
+                },
+                error: function(jqXHR) {
+                    // S3 answers 400 EntityTooLarge when the file is over the size limit
+                    var tooLarge = jqXHR.status === 400 && /EntityTooLarge/.test(jqXHR.responseText || '');
+                    showNotification(tooLarge ? 'The file is too large.' : 'Upload failed. Please try again.', 'error');
+                }
+            });
+        },
+        error: appError
+    });
+}
@@ -1,9 +1,7 @@
 # src/views/employer_views.py
 import json
 import logging
-import time
-from datetime import timezone
-from datetime import datetime as dt
+import queue
 
 from flask import Blueprint, render_template, request, redirect, url_for, make_response, g, flash, jsonify, Response, \
     Flask
@@ -11,8 +9,10 @@ from flask import Blueprint, render_template, request, redirect, url_for, make_r
 from config import Config
 from ..controllers import EmployerController
 from ..decorators.auth_required import auth_required
-from ..services import SessionManager, DynamoDB
-from ..models import Job, Application, Employer, User, Message
+from ..services import SessionManager
+from ..models import Job, Application, Employer, User, Message, ConversationSummary
+from ..services.job_matching_service import JobMatchingService
+from ..services.message_poller import MessagePoller
 
 employer_bp = Blueprint('employer_views', __name__, url_prefix='/employer')
 
@@ -349,9 +349,18 @@ def view_job_applications(job_id):
         flash("You don't have permission to view these applications", 'error')
         return redirect(url_for('employer_views.dashboard'))
 
-    applications = job.get_applications()
+    # Each entry is {'application': ..., 'user': ...}, the shape view_applications.html reads
+    applications, message = EmployerController.get_job_applications(job_id, g.user.employer_id)
+    if applications is None:
+        flash(message, 'error')
+        return redirect(url_for('employer_views.dashboard'))
+
+    # Users who meet every requirement of the job but haven't applied; None if they couldn't be read
+    candidates = JobMatchingService.match_users_to_job(
+        job, exclude={app['application']['user_id'] for app in applications}, limit=Config.MATCHING_CANDIDATES_LIMIT)
     return render_template('employer/view_applications.html',
                            applications=applications,
+                           candidates=candidates,
                            job=job)
 
 
@@ -421,20 +430,29 @@ def chat_with_user(user_id):
             }
         })
 
-    # Retrieve the conversation
-    messages = Message.get_conversation(user_id, employer_id, job_id)
+    # Looked up once: the page is read from these conversations and they are all marked read below
+    conversation_ids = Message.conversation_ids(user_id, employer_id, job_id)
+    # Retrieve the newest page of the conversation; "before" pages back through older ones
+    messages = Message.get_conversation(user_id, employer_id, job_id,
+                                        before=request.args.get('before'), limit=Config.CHAT_PAGE_SIZE,
+                                        conversation_ids=conversation_ids)
+    older_messages_before = messages[0].message_key if len(messages) == Config.CHAT_PAGE_SIZE else None
 
     # Mark all received messages in this conversation as read
     for message in messages:
         if message.receiver_id == employer_id and not message.is_read:
             message.mark_as_read()
+    # Without a job_id the chat shows every conversation with the user, so all of them are read
+    for conversation_id in conversation_ids:
+        ConversationSummary.mark_read(employer_id, conversation_id)
 
     return render_template(
         'employer/chat.html',
         messages=messages,
         user=user,
         job=job,
-        job_id=job_id
+        job_id=job_id,
+        older_messages_before=older_messages_before
     )
 
 
@@ -443,116 +461,82 @@ def chat_with_user(user_id):
 def view_all_chats():
     employer_id = g.user.employer_id
 
-    # Get all unique conversations for this employer
-    response = DynamoDB.scan(
-        'Messages',
-        FilterExpression='sender_id = :employer_id OR receiver_id = :employer_id',
-        ExpressionAttributeValues={':employer_id': employer_id}
-    )
-
-    messages = response.get('Items', [])
-
-    # Create a dictionary to store the latest message for each conversation
-    # Use combination of user_id and job_id as key
-    conversations = {}
-    for msg in messages:
-        message = Message(**msg)
-        other_id = message.receiver_id if message.sender_id == employer_id else message.sender_id
-
-        # Create a unique key combining user_id and job_id
-        conversation_key = f"{other_id}_{message.job_id}"
-
-        if (conversation_key not in conversations or
-                message.timestamp > conversations[conversation_key]['latest_message'].timestamp):
-            # Get the user information
-            user = User.get_by_id(other_id)
-            # Get the job information
-            job = Job.get_by_id(message.job_id) if message.job_id else None
-
-            if user:
-                conversations[conversation_key] = {
-                    'user': user,
-                    'latest_message': message,
-                    'unread_count': 0,
-                    'job_id': message.job_id,
-                    'job_title': job.job_title if job else 'General Discussion'
-                }
-
-    # Count unread messages for each conversation
-    for conv_key in conversations:
-        user_id = conv_key.split('_')[0]
-        job_id = conversations[conv_key]['job_id']
-
-        unread_count = DynamoDB.scan(
-            'Messages',
-            FilterExpression=('sender_id = :other_id AND receiver_id = :employer_id '
-                              'AND is_read = :is_read AND job_id = :job_id'),
-            ExpressionAttributeValues={
-                ':other_id': user_id,
-                ':employer_id': employer_id,
-                ':is_read': False,
-                ':job_id': job_id
-            }
-        )
-        conversations[conv_key]['unread_count'] = len(unread_count.get('Items', []))
-
-    # Sort conversations by latest message timestamp
-    sorted_conversations = sorted(
-        conversations.values(),
-        key=lambda x: x['latest_message'].timestamp,
-        reverse=True
-    )
+    # One summary row per conversation, already carrying its last message and unread count
+    summaries = ConversationSummary.get_for_participant(employer_id)
+    users = User.get_many({s.other_participant_id for s in summaries})
+    jobs = Job.get_many({s.job_id for s in summaries if s.job_id})
+    if users is None or jobs is None:
+        flash("Your conversations couldn't be loaded right now, please try again.", 'error')
+        return render_template('employer/messages.html', conversations=[])
+    users = {user.user_id: user for user in users}
+    jobs = {job.job_id: job for job in jobs}
+
+    conversations = []
+    for summary in summaries:
+        user = users.get(summary.other_participant_id)
+        if not user:
+            continue
+        job = jobs.get(summary.job_id)
+        conversations.append({
+            'user': user,
+            'latest_message': Message(
+                message_id=summary.last_message_id,
+                sender_id=summary.last_sender_id,
+                receiver_id=employer_id if summary.last_sender_id != employer_id else user.user_id,
+                sender_type=summary.last_sender_type,
+                content=summary.last_content,
+                timestamp=summary.last_timestamp,
+                job_id=summary.job_id
+            ),
+            'unread_count': summary.unread_count,
+            'job_id': summary.job_id,
+            'job_title': job.job_title if job else 'General Discussion'
+        })
 
-    return render_template('employer/messages.html', conversations=sorted_conversations)
+    return render_template('employer/messages.html', conversations=conversations)
 
 
 @employer_bp.route('/messages/stream')
 @auth_required(user_type='employer')
 def stream_messages():
-    from flask import copy_current_request_context, current_app
+    from flask import copy_current_request_context
 
     employer_id = g.user.employer_id
-    app = current_app._get_current_object()
 
     @copy_current_request_context
     def generate():
-        last_check = dt.now(timezone.utc).isoformat()
-        sent_message_ids = set()  # Track sent message IDs
+        # New messages come from the worker's shared MessagePoller instead of a scan per connection
+        subscription = MessagePoller.subscribe(employer_id)
 
         try:
             while True:
-                with app.app_context():
-                    try:
-                        new_messages = Message.get_new_messages(employer_id, last_check, user_type='employer')
-
-                        if new_messages:
-                            for message in new_messages:
-                                if message.message_id not in sent_message_ids:
-                                    sent_message_ids.add(message.message_id)
-                                    data = {
-                                        'message_id': message.message_id,
-                                        'content': message.content,
-                                        'timestamp': message.timestamp,
-                                        'sender_type': message.sender_type,
-                                        'sender_id': message.sender_id,
-                                        'receiver_id': message.receiver_id,
-                                        'job_id': message.job_id,
-                                        'conversation_id': f'{message.sender_id}_{message.job_id}',
-                                        'is_read': message.is_read
-                                    }
-                                    yield f"data: {json.dumps(data)}\n\n"
-
-                        last_check = dt.now(timezone.utc).isoformat()
-
-                    except Exception as e:
-                        app.logger.error(f"Stream error: {str(e)}")
-                        yield f"data: {json.dumps({'error': str(e)})}\n\n"
-                        return
-
-                time.sleep(2)
+                try:
+                    item = subscription.get(timeout=Config.MESSAGE_STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    # SSE comment line, keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+
+                message = Message(**item)
+                if message.sender_id == employer_id:
+                    message.sender_type = 'employer'
+                data = {
+                    'message_id': message.message_id,
+                    'content': message.content,
+                    'timestamp': message.timestamp,
+                    'sender_type': message.sender_type,
+                    'sender_id': message.sender_id,
+                    'receiver_id': message.receiver_id,
+                    'job_id': message.job_id,
+                    'conversation_id': f'{message.sender_id}_{message.job_id}',
+                    'is_read': message.is_read
+                }
+                yield f"data: {json.dumps(data)}\n\n"
 
         except GeneratorExit:
             pass
+        finally:
+            MessagePoller.unsubscribe(employer_id, subscription)
 
     return Response(
         generate(),
@@ -1,12 +1,10 @@
 import datetime
 from datetime import datetime, timezone
-from datetime import datetime as dt
 import json
+import queue
 import uuid
 import requests
-import time
 
-import boto3
 from botocore.exceptions import ClientError
 from flask import Blueprint, render_template, request, redirect, url_for, make_response, g, current_app, session, \
     jsonify, flash, Response, Flask
@@ -18,9 +16,13 @@ from werkzeug.utils import secure_filename
 from config import store_secret, Config
 from ..controllers import UserController
 from ..decorators.auth_required import auth_required
-from ..models import User, Employer, Message, Job
-from ..services import SessionManager, DynamoDB
+from ..models import User, Employer, Message, Job, ConversationSummary
+from ..services import SessionManager
 from ..services.google_auth_service import GoogleAuthService
+from ..services.message_poller import MessagePoller
+from ..services.suggestion_service import SuggestionService
+from ..services.job_search_service import JobSearchIndex
+from ..services.job_matching_service import JobMatchingService
 
 user_bp = Blueprint('user_views', __name__, url_prefix='/user')
 
@@ -93,7 +95,7 @@ def verify_account(token):
 @auth_required(user_type='user')
 def dashboard():
     user = g.user
-    recommended_jobs = UserController.get_recommended_jobs(user)
+    recommended_jobs = UserController.get_recommended_jobs(user, limit=Config.RECOMMENDATIONS_PAGE_SIZE)
     return render_template('user/dashboard.html', user=user, jobs=recommended_jobs)
 
 
@@ -220,7 +222,9 @@ def oauth2callback():
     }
 
     # Store the credentials securely in AWS SSM
-    store_secret('/your-app/token', json.dumps(session['credentials']))
+    store_secret(GoogleAuthService.TOKEN_PARAMETER, json.dumps(session['credentials']))
+    # Make this worker pick up the new token instead of its cached one
+    GoogleAuthService.invalidate()
     current_app.logger.info("OAuth credentials successfully stored in AWS SSM")
 
     return redirect(url_for('user_views.dashboard'))
@@ -340,6 +344,32 @@ def upload_certification():
     }), 200
 
 
+@user_bp.route('/uploads/presign', methods=['POST'])
+@auth_required(user_type='user')
+def presign_upload():
+    """Presigned POST for uploading a profile picture or certification straight to S3."""
+    data = request.get_json(silent=True) or {}
+    upload, error = UserController.presign_upload(g.user, data.get('kind'), data.get('filename'))
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
+    return jsonify({'success': True, **upload}), 200
+
+
+@user_bp.route('/uploads/complete', methods=['POST'])
+@auth_required(user_type='user')
+def complete_upload():
+    """Called by the browser once S3 accepted a presigned upload; records it on the profile."""
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind')
+    result, error = UserController.complete_upload(g.user, kind, data.get('key'), data.get('cert_type'))
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
+    # Same responses as upload_profile_picture and upload_certification
+    if kind == 'profile_picture':
+        return jsonify({'success': True, 'profile_picture_url': result}), 200
+    return jsonify({'success': True, 'certifications': [result]}), 200
+
+
 @user_bp.route('/delete_certification', methods=['POST'])
 @auth_required(user_type='user')
 def delete_certification():
@@ -354,10 +384,10 @@ def delete_certification():
     if not cert_to_delete:
         return jsonify({'success': False, 'message': 'Certification not found.'}), 404
 
-    # Remove from S3
+    # The file itself is deleted from S3 in the background
     success = UserController.delete_certification(user.user_id, cert_to_delete['url'])
     if not success:
-        return jsonify({'success': False, 'message': 'Failed to delete certification from storage.'}), 500
+        return jsonify({'success': False, 'message': 'Failed to delete certification.'}), 500
 
     # Remove from user certifications
     user.certifications = [cert for cert in user.certifications if cert.get('id') != cert_id]
@@ -408,32 +438,30 @@ def change_password():
         )
 
         if success:
-            return redirect(url_for('user_views.view_profile', success=message))
+            response = make_response(redirect(url_for('user_views.view_profile', success=message)))
+            # The password change ended every session, this one included, so issue a new one
+            session_id = SessionManager.create_session(user.user_id, 'user')
+            if session_id:
+                response.set_cookie('session_id', session_id, httponly=True, secure=True, samesite='Lax')
+            return response
         else:
             return render_template('user/change_password.html', error=message)
 
     return render_template('user/change_password.html')
 
 
-@user_bp.route('/city_suggestions', methods=['GET'])
-def city_suggestions():
-    query = request.args.get('query', '').strip()
-    if not query:
-        return jsonify({'suggestions': []}), 200
+def _suggestions_response(kind):
+    suggestions = SuggestionService.suggest(kind, request.args.get('query', ''))
+    response = jsonify({'suggestions': suggestions or []})
+    # Suggestions are the same for everyone, so browsers may reuse them; failed lookups are not cached
+    if suggestions is not None:
+        response.headers['Cache-Control'] = f"public, max-age={Config.SUGGESTIONS_BROWSER_CACHE_SECONDS}"
+    return response, 200
 
-    api_gateway_url = 'https://w6z5elzk0b.execute-api.ap-southeast-2.amazonaws.com/city'
 
-    try:
-        response = requests.get(api_gateway_url, params={'query': query}, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return jsonify({'suggestions': data['suggestions']}), 200
-        else:
-            current_app.logger.error(f"API Gateway error: {response.status_code} - {response.text}")
-            return jsonify({'suggestions': []}), 200
-    except requests.exceptions.RequestException as e:
-        current_app.logger.error(f"Error calling CitySuggestionsAPI: {e}")
-        return jsonify({'suggestions': []}), 200
+@user_bp.route('/city_suggestions', methods=['GET'])
+def city_suggestions():
+    return _suggestions_response('city')
 
 
 @user_bp.route('/work_history', methods=['GET'])
@@ -504,44 +532,12 @@ def delete_work_history():
 
 @user_bp.route('/get_occupation_suggestions', methods=['GET'])
 def get_occupation_suggestions():
-    query = request.args.get('query', '').strip().lower()
-    if not query:
-        return jsonify({'suggestions': []}), 200
-
-    api_gateway_url = 'https://w6z5elzk0b.execute-api.ap-southeast-2.amazonaws.com/occupation'
-
-    try:
-        response = requests.get(api_gateway_url, params={'query': query}, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            return jsonify({'suggestions': data.get('suggestions', [])}), 200
-        else:
-            current_app.logger.error(f"Occupation API error: {response.status_code} - {response.text}")
-            return jsonify({'suggestions': []}), 200
-    except requests.exceptions.RequestException as e:
-        current_app.logger.error(f"Error calling OccupationAutocompleteAPI: {e}")
-        return jsonify({'suggestions': []}), 200
+    return _suggestions_response('occupation')
 
 
 @user_bp.route('/certification_suggestions', methods=['GET'])
 def certification_suggestions():
-    query = request.args.get('query', '').strip()
-    if not query:
-        return jsonify({'suggestions': []}), 200
-
-    api_gateway_url = 'https://w6z5elzk0b.execute-api.ap-southeast-2.amazonaws.com/certification'
-
-    try:
-        response = requests.get(api_gateway_url, params={'query': query}, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            return jsonify({'suggestions': data.get('suggestions', [])}), 200
-        else:
-            current_app.logger.error(f"Certification API error: {response.status_code} - {response.text}")
-            return jsonify({'suggestions': []}), 200
-    except requests.exceptions.RequestException as e:
-        current_app.logger.error(f"Error calling CertificationAutocompleteAPI: {e}")
-        return jsonify({'suggestions': []}), 200
+    return _suggestions_response('certification')
 
 
 @user_bp.route('/skills', methods=['GET'])
@@ -583,26 +579,89 @@ def delete_skill():
 
 @user_bp.route('/skill_suggestions', methods=['GET'])
 def skill_suggestions():
-    query = request.args.get('query', '').strip()
-    if not query:
-        return jsonify({'suggestions': []}), 200
+    return _suggestions_response('skill')
 
-    api_gateway_url = 'https://w6z5elzk0b.execute-api.ap-southeast-2.amazonaws.com/skill'
 
-    try:
-        response = requests.get(api_gateway_url, params={'query': query}, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            return jsonify({'suggestions': data.get('suggestions', [])}), 200
-        else:
-            current_app.logger.error(f"Skill API error: {response.status_code} - {response.text}")
-            return jsonify({'suggestions': []}), 200
-    except requests.exceptions.RequestException as e:
-        current_app.logger.error(f"Error calling SkillAutocompleteAPI: {e}")
-        return jsonify({'suggestions': []}), 200
+# src/views/user_views.py
 
 
-# src/views/user_views.py
+def _job_search_filters():
+    """JobSearchIndex.search filters from the job board's query string; unusable values are ignored."""
+    filters = {}
+    query = (request.args.get('q') or '').strip()
+    if query:
+        filters['query'] = query
+    for name in ('city', 'country'):
+        value = (request.args.get(name) or '').strip()
+        if value:
+            filters[name] = value
+    skills = [skill.strip() for skill in request.args.getlist('skill') if skill.strip()]
+    if skills:
+        filters['skills'] = skills
+    for name in ('salary_min', 'salary_max'):
+        value = request.args.get(name, type=int)
+        if value is not None:
+            filters[name] = value
+    posted_within = request.args.get('posted_within', type=int)
+    if posted_within in JobSearchIndex.POSTED_DAYS:
+        filters['posted_within_days'] = posted_within
+    # Keyword searches are ordered by relevance unless asked otherwise, the rest newest first
+    sort = request.args.get('sort')
+    if sort in JobSearchIndex.SORTS and sort not in ('relevance', 'relevance' if query else 'newest'):
+        filters['sort'] = sort
+    return filters
+
+
+def _job_search_url(**changes):
+    """The current search with some parameters replaced (None removes one), back on page 1."""
+    args = request.args.to_dict(flat=False)
+    args.pop('cursor', None)
+    args.pop('page', None)
+    for name, value in changes.items():
+        if value is None or value == []:
+            args.pop(name, None)
+        else:
+            args[name] = value
+    return url_for('user_views.view_all_jobs', **args)
+
+
+def _job_page_url(page):
+    args = request.args.to_dict(flat=False)
+    args['page'] = page
+    return url_for('user_views.view_all_jobs', **args)
+
+
+def _job_facet_links(filters, facets):
+    """Facet counts as {'label', 'count', 'url', 'selected'} links that toggle the value as a filter."""
+    links = {}
+    for facet in ('city', 'country'):
+        selected = (filters.get(facet) or '').lower()
+        links[facet] = [{'label': label, 'count': count, 'selected': label.lower() == selected,
+                         'url': _job_search_url(**{facet: None if label.lower() == selected else label})}
+                        for label, count in facets[facet]]
+
+    skills = filters.get('skills', [])
+    selected_skills = {skill.lower() for skill in skills}
+    links['skills'] = [{'label': label, 'count': count, 'selected': label.lower() in selected_skills,
+                        'url': _job_search_url(skill=[skill for skill in skills if skill.lower() != label.lower()]
+                                               if label.lower() in selected_skills else skills + [label])}
+                       for label, count in facets['skills']]
+
+    links['salary'] = []
+    for low, high, count in facets['salary']:
+        selected = filters.get('salary_min') == low and filters.get('salary_max') == high
+        label = f"${low // 1000}k - ${high // 1000}k" if high else f"${low // 1000}k+"
+        links['salary'].append({'label': label, 'count': count, 'selected': selected,
+                                'url': _job_search_url(salary_min=None if selected else low,
+                                                       salary_max=None if selected else high)})
+
+    links['posted'] = []
+    for days, count in facets['posted']:
+        selected = filters.get('posted_within_days') == days
+        label = 'Last 24 hours' if days == 1 else f"Last {days} days"
+        links['posted'].append({'label': label, 'count': count, 'selected': selected,
+                                'url': _job_search_url(posted_within=None if selected else days)})
+    return links
 
 
 @user_bp.route('/jobs', methods=['GET'])
@@ -610,22 +669,38 @@ def skill_suggestions():
 def view_all_jobs():
     """
     Render a page displaying all available jobs with pagination.
+
+    Without filters the board is paged with cursors straight from DynamoDB; keywords, any
+    filter or sort go through the in-memory search indexes, which also supply facet counts.
     """
-    page = int(request.args.get('page', 1))
     per_page = 10  # Number of jobs per page
-    jobs = UserController.get_all_active_jobs()
-
-    total_jobs = len(jobs)
-    total_pages = (total_jobs + per_page - 1) // per_page
-    start = (page - 1) * per_page
-    end = start + per_page
-    paginated_jobs = jobs[start:end]
+    filters = _job_search_filters()
+    if not filters:
+        jobs, next_cursor, prev_cursor = UserController.get_jobs_page(request.args.get('cursor'), per_page)
+        return render_template(
+            'user/view_jobs.html',
+            jobs=jobs,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            filters=filters
+        )
 
+    page = max(request.args.get('page', 1, type=int), 1)
+    jobs, total, facets = UserController.search_jobs(filters, page, per_page)
+    if jobs is None:
+        flash("Jobs couldn't be loaded right now, please try again.", 'error')
+        jobs = []
+    total_pages = (total + per_page - 1) // per_page
     return render_template(
         'user/view_jobs.html',
-        jobs=paginated_jobs,
+        jobs=jobs,
+        filters=filters,
+        total=total,
+        facets=_job_facet_links(filters, facets),
         page=page,
-        total_pages=total_pages
+        total_pages=total_pages,
+        prev_page_url=_job_page_url(page - 1) if page > 1 else None,
+        next_page_url=_job_page_url(page + 1) if page < total_pages else None
     )
 
 
@@ -751,9 +826,10 @@ def revoke_application(job_id):
 @auth_required(user_type='user')
 def recommended_jobs():
     user = g.user
-    recommended_jobs = UserController.get_recommended_jobs(user)
-    print(f"Recommended Jobs for user {user.user_id}: {recommended_jobs}")
-    return render_template('user/recommended_jobs.html', jobs=recommended_jobs)
+    recommended_jobs = UserController.get_recommended_jobs(user, limit=Config.RECOMMENDATIONS_PAGE_SIZE)
+    # Recommendations the user meets every skill, certification and city requirement of
+    qualified_job_ids = JobMatchingService.qualified_job_ids(user)
+    return render_template('user/recommended_jobs.html', jobs=recommended_jobs, qualified_job_ids=qualified_job_ids)
 
 
 @user_bp.route('/saved_jobs', methods=['GET'])
@@ -761,6 +837,9 @@ def recommended_jobs():
 def saved_jobs():
     user = g.user
     saved_jobs = UserController.get_saved_jobs(user.user_id)
+    if saved_jobs is None:
+        flash("Your saved jobs couldn't be loaded right now, please try again.", 'error')
+        saved_jobs = []
     return render_template('user/saved_jobs.html', jobs=saved_jobs)
 
 
@@ -769,6 +848,9 @@ def saved_jobs():
 def view_applications():
     user = g.user
     applications = UserController.get_user_applications(user.user_id)
+    if applications is None:
+        flash("Your applications couldn't be loaded right now, please try again.", 'error')
+        applications = []
     return render_template('user/view_applications.html', applications=applications)
 
 
@@ -820,18 +902,29 @@ def chat_with_employer(employer_id):
             }
         })
 
+    # Looked up once: the page is read from these conversations and they are all marked read below
+    conversation_ids = Message.conversation_ids(g.user.user_id, employer_id, job_id)
+    # Only the newest page of the conversation is read; "before" pages back through older ones
+    messages = Message.get_conversation(g.user.user_id, employer_id, job_id,
+                                        before=request.args.get('before'), limit=Config.CHAT_PAGE_SIZE,
+                                        conversation_ids=conversation_ids)
+    older_messages_before = messages[0].message_key if len(messages) == Config.CHAT_PAGE_SIZE else None
+
     # Mark all messages in this conversation as read
-    messages = Message.get_conversation(g.user.user_id, employer_id, job_id)
     for message in messages:
         if message.receiver_id == g.user.user_id and not message.is_read:
             message.mark_as_read()
+    # Without a job_id the chat shows every conversation with the employer, so all of them are read
+    for conversation_id in conversation_ids:
+        ConversationSummary.mark_read(g.user.user_id, conversation_id)
 
     return render_template(
         'user/chat.html',
         messages=messages,
         employer=employer,
         job=job,
-        job_id=job_id
+        job_id=job_id,
+        older_messages_before=older_messages_before
     )
 
 
@@ -840,116 +933,82 @@ def chat_with_employer(employer_id):
 def view_all_chats():
     user_id = g.user.user_id
 
-    # Get all messages for this user
-    response = DynamoDB.scan(
-        'Messages',
-        FilterExpression='sender_id = :user_id OR receiver_id = :user_id',
-        ExpressionAttributeValues={':user_id': user_id}
-    )
-
-    messages = response.get('Items', [])
-
-    # Create a dictionary to store the latest message for each conversation
-    conversations = {}
-    for msg in messages:
-        message = Message(**msg)
-        other_id = message.receiver_id if message.sender_id == user_id else message.sender_id
-
-        # Create a unique key combining employer_id and job_id
-        conversation_key = f"{other_id}_{message.job_id}"
-
-        if (conversation_key not in conversations or
-                message.timestamp > conversations[conversation_key]['latest_message'].timestamp):
-            # Get the employer information
-            employer = Employer.get_by_id(other_id)
-            # Get the job information
-            job = Job.get_by_id(message.job_id) if message.job_id else None
-
-            if employer:
-                conversations[conversation_key] = {
-                    'employer': employer,
-                    'latest_message': message,
-                    'unread_count': 0,
-                    'job_id': message.job_id,
-                    'job_title': job.job_title if job else 'General Discussion'
-                }
-
-    # Count unread messages for each conversation
-    for conv_key in conversations:
-        employer_id = conv_key.split('_')[0]
-        job_id = conversations[conv_key]['job_id']
-
-        unread_count = DynamoDB.scan(
-            'Messages',
-            FilterExpression=('sender_id = :other_id AND receiver_id = :user_id '
-                            'AND is_read = :is_read AND job_id = :job_id'),
-            ExpressionAttributeValues={
-                ':other_id': employer_id,
-                ':user_id': user_id,
-                ':is_read': False,
-                ':job_id': job_id
-            }
-        )
-        conversations[conv_key]['unread_count'] = len(unread_count.get('Items', []))
-
-    # Sort conversations by latest message timestamp
-    sorted_conversations = sorted(
-        conversations.values(),
-        key=lambda x: x['latest_message'].timestamp,
-        reverse=True
-    )
+    # One summary row per conversation, already carrying its last message and unread count
+    summaries = ConversationSummary.get_for_participant(user_id)
+    employers = Employer.get_many({s.other_participant_id for s in summaries})
+    jobs = Job.get_many({s.job_id for s in summaries if s.job_id})
+    if employers is None or jobs is None:
+        flash("Your conversations couldn't be loaded right now, please try again.", 'error')
+        return render_template('user/messages.html', conversations=[])
+    employers = {employer.employer_id: employer for employer in employers}
+    jobs = {job.job_id: job for job in jobs}
+
+    conversations = []
+    for summary in summaries:
+        employer = employers.get(summary.other_participant_id)
+        if not employer:
+            continue
+        job = jobs.get(summary.job_id)
+        conversations.append({
+            'employer': employer,
+            'latest_message': Message(
+                message_id=summary.last_message_id,
+                sender_id=summary.last_sender_id,
+                receiver_id=user_id if summary.last_sender_id != user_id else employer.employer_id,
+                sender_type=summary.last_sender_type,
+                content=summary.last_content,
+                timestamp=summary.last_timestamp,
+                job_id=summary.job_id
+            ),
+            'unread_count': summary.unread_count,
+            'job_id': summary.job_id,
+            'job_title': job.job_title if job else 'General Discussion'
+        })
 
-    return render_template('user/messages.html', conversations=sorted_conversations)
+    return render_template('user/messages.html', conversations=conversations)
 
 
 @user_bp.route('/messages/stream')
 @auth_required(user_type='user')
 def stream_messages():
-    from flask import copy_current_request_context, current_app
+    from flask import copy_current_request_context
 
     user_id = g.user.user_id
-    app = current_app._get_current_object()
 
     @copy_current_request_context
     def generate():
-        last_check = dt.now(timezone.utc).isoformat()
-        sent_message_ids = set()  # Track sent message IDs
+        # New messages come from the worker's shared MessagePoller instead of a scan per connection
+        subscription = MessagePoller.subscribe(user_id)
 
         try:
             while True:
-                with app.app_context():
-                    try:
-                        new_messages = Message.get_new_messages(user_id, last_check, user_type='user')
-
-                        if new_messages:
-                            for message in new_messages:
-                                # Only send message if we haven't sent it before
-                                if message.message_id not in sent_message_ids:
-                                    sent_message_ids.add(message.message_id)
-                                    data = {
-                                        'message_id': message.message_id,
-                                        'content': message.content,
-                                        'timestamp': message.timestamp,
-                                        'sender_type': message.sender_type,
-                                        'sender_id': message.sender_id,
-                                        'receiver_id': message.receiver_id,
-                                        'job_id': message.job_id,
-                                        'conversation_id': f'{message.sender_id}_{message.job_id}',
-                                        'is_read': message.is_read  # Add this line
-                                    }
-                                    yield f"data: {json.dumps(data)}\n\n"
-
-                        last_check = dt.now(timezone.utc).isoformat()
-
-                    except Exception as e:
-                        app.logger.error(f"Stream error: {str(e)}")
-                        yield f"data: {json.dumps({'error': str(e)})}\n\n"
-                        return
-
-                time.sleep(2)
+                try:
+                    item = subscription.get(timeout=Config.MESSAGE_STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    # SSE comment line, keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+
+                message = Message(**item)
+                if message.sender_id == user_id:
+                    message.sender_type = 'user'
+                data = {
+                    'message_id': message.message_id,
+                    'content': message.content,
+                    'timestamp': message.timestamp,
+                    'sender_type': message.sender_type,
+                    'sender_id': message.sender_id,
+                    'receiver_id': message.receiver_id,
+                    'job_id': message.job_id,
+                    'conversation_id': f'{message.sender_id}_{message.job_id}',
+                    'is_read': message.is_read
+                }
+                yield f"data: {json.dumps(data)}\n\n"
 
         except GeneratorExit:
             pass
+        finally:
+            MessagePoller.unsubscribe(user_id, subscription)
 
     return Response(
         generate(),
@@ -0,0 +1,97 @@
+# tests/conftest.py
+#
+# Run from the repository root:
+#
+#   python -m pytest -q
+#
+# The fixtures here replace DynamoDB's table calls with an in-memory store, so the
+# tests need the app's requirements installed but no AWS access.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.database_service import DynamoDB
+from src.services.index_catalogue import TABLES, get_index
+
+
+def _matches(condition, item):
+    """Evaluate the few boto3 Attr conditions the services pass as filters."""
+    expression = condition.get_expression()
+    operator, values = expression['operator'], expression['values']
+    if operator == 'OR':
+        return any(_matches(value, item) for value in values)
+    if operator == 'AND':
+        return all(_matches(value, item) for value in values)
+    if operator == 'attribute_not_exists':
+        return values[0].name not in item
+    if operator == 'attribute_exists':
+        return values[0].name in item
+    name, value = values[0].name, values[1]
+    if name not in item:
+        return False
+    return {'=': item[name] == value, '<': item[name] < value, '<=': item[name] <= value,
+            '>': item[name] > value, '>=': item[name] >= value}[operator]
+
+
+class MemoryTables:
+    """Just enough of DynamoDB's helpers for the services under test, keyed by table and hash key."""
+
+    def __init__(self):
+        self.tables = {}
+
+    def rows(self, table_name):
+        return self.tables.setdefault(table_name, {})
+
+    def _hash_key(self, table_name, key):
+        return key[TABLES[table_name]['key']['hash']]
+
+    def put_item(self, table_name, item):
+        self.rows(table_name)[self._hash_key(table_name, item)] = dict(item)
+        return True
+
+    def get_item(self, table_name, key):
+        item = self.rows(table_name).get(self._hash_key(table_name, key))
+        return dict(item) if item else None
+
+    def update_item(self, table_name, key, update_values, attribute_names=None, remove=()):
+        item = self.rows(table_name).setdefault(self._hash_key(table_name, key), dict(key))
+        for name, value in update_values.items():
+            item[attribute_names.get(name, name) if attribute_names else name] = value
+        for name in remove:
+            item.pop(attribute_names.get(name, name) if attribute_names else name, None)
+        return True
+
+    def delete_item(self, table_name, key):
+        self.rows(table_name).pop(self._hash_key(table_name, key), None)
+        return True
+
+    def claim_item(self, table_name, key, lease_attribute, lease_until, now):
+        item = self.rows(table_name).get(self._hash_key(table_name, key))
+        if item is None or item.get(lease_attribute, now) > now:
+            return False
+        item[lease_attribute] = lease_until
+        return True
+
+    def query_range(self, table_name, hash_value, before=None, after=None, index_name=None,
+                    scan_forward=True, limit=None, prefix=None, filter_condition=None):
+        schema = get_index(table_name, index_name) if index_name else TABLES[table_name]['key']
+        items = [dict(item) for item in self.rows(table_name).values()
+                 if item.get(schema['hash']) == hash_value and schema['range'] in item
+                 and (before is None or item[schema['range']] < before)
+                 and (after is None or item[schema['range']] > after)
+                 and (prefix is None or item[schema['range']].startswith(prefix))
+                 and (filter_condition is None or _matches(filter_condition, item))]
+        items.sort(key=lambda item: item[schema['range']], reverse=not scan_forward)
+        return items[:limit] if limit else items
+
+
+@pytest.fixture
+def tables(monkeypatch):
+    store = MemoryTables()
+    for name in ('put_item', 'get_item', 'update_item', 'delete_item', 'claim_item', 'query_range'):
+        monkeypatch.setattr(DynamoDB, name, getattr(store, name))
+    return store
@@ -0,0 +1,125 @@
+import queue
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import Config
+from src.services.email_outbox import EmailOutbox
+from src.services.email_transport import FakeTransport
+
+
+@pytest.fixture
+def outbox(tables, monkeypatch):
+    # Drive the senders by hand instead of from background threads
+    monkeypatch.setattr(EmailOutbox, 'start', classmethod(lambda cls: None))
+    monkeypatch.setattr(EmailOutbox, '_queue', queue.Queue())
+    monkeypatch.setattr(EmailOutbox, 'transport', FakeTransport(fail_for={'bounce@example.com'}))
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 3)
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_RETRY_BASE_SECONDS', 30)
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_RETRY_MAX_SECONDS', 3600)
+    return EmailOutbox
+
+
+def _email(to='someone@example.com'):
+    return {'to': to, 'subject': 'Reset your password', 'body': 'https://example.com/reset/token'}
+
+
+def _queued(outbox):
+    items = []
+    while not outbox._queue.empty():
+        items.append(outbox._queue.get_nowait())
+    return items
+
+
+def _seconds_from_now(timestamp):
+    return (datetime.fromisoformat(timestamp) - datetime.now(timezone.utc)).total_seconds()
+
+
+def test_sent_email_is_deleted(outbox, tables):
+    assert outbox.enqueue(_email())
+    outbox._send(_queued(outbox))
+
+    assert [message['to'] for message in outbox.transport.sent] == ['someone@example.com']
+    assert tables.rows(outbox.TABLE) == {}
+
+
+def test_email_leased_elsewhere_is_not_sent(outbox, tables):
+    outbox.enqueue(_email())
+    item = _queued(outbox)[0]
+    # Another worker's sender holds it
+    tables.update_item(outbox.TABLE, {'outbox_id': item['outbox_id']}, {'lease_until': outbox._now(outbox.LEASE_SECONDS)})
+    outbox._send([item])
+
+    assert outbox.transport.sent == []
+    assert item['outbox_id'] in tables.rows(outbox.TABLE)
+
+
+def test_poll_skips_leased_emails(outbox, tables, monkeypatch):
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_BATCH_SIZE', 1)
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_WORKERS', 1)
+    outbox.enqueue(_email('leased@example.com'))
+    outbox.enqueue(_email('waiting@example.com'))
+    leased, waiting = _queued(outbox)
+    tables.update_item(outbox.TABLE, {'outbox_id': leased['outbox_id']},
+                       {'next_attempt_at': outbox._now(-60), 'lease_until': outbox._now(outbox.LEASE_SECONDS)})
+    time.sleep(0.001)
+
+    assert outbox._poll() == 1
+    assert [item['outbox_id'] for item in _queued(outbox)] == [waiting['outbox_id']]
+
+
+def test_poll_leaves_room_for_what_is_queued(outbox, monkeypatch):
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_BATCH_SIZE', 1)
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_WORKERS', 1)
+    outbox.enqueue(_email())
+
+    assert outbox._poll() == 0
+
+
+def test_failed_email_is_retried_with_backoff(outbox, tables):
+    outbox.enqueue(_email('bounce@example.com'))
+    item = _queued(outbox)[0]
+    outbox._send([item])
+
+    row = tables.rows(outbox.TABLE)[item['outbox_id']]
+    assert row['attempts'] == 1
+    assert row['body'] == item['body']
+    assert 'Fake delivery failure' in row['last_error']
+    # First retry after the base delay, plus up to 25% jitter; the lease runs until then
+    assert 29 <= _seconds_from_now(row['next_attempt_at']) <= 30 * 1.25 + 1
+    assert row['lease_until'] == row['next_attempt_at']
+
+    # Not due yet, so the poller leaves it alone
+    assert outbox._poll() == 0
+
+    tables.update_item(outbox.TABLE, {'outbox_id': item['outbox_id']},
+                       {'next_attempt_at': outbox._now(-1), 'lease_until': outbox._now(-1)})
+    outbox._send([tables.get_item(outbox.TABLE, {'outbox_id': item['outbox_id']})])
+    row = tables.rows(outbox.TABLE)[item['outbox_id']]
+    assert row['attempts'] == 2
+    assert 59 <= _seconds_from_now(row['next_attempt_at']) <= 60 * 1.25 + 1
+
+
+def test_email_is_dead_lettered_after_max_attempts(outbox, tables):
+    outbox.enqueue(_email('bounce@example.com'))
+    item = _queued(outbox)[0]
+    tables.update_item(outbox.TABLE, {'outbox_id': item['outbox_id']}, {'attempts': Config.EMAIL_OUTBOX_MAX_ATTEMPTS - 1})
+    outbox._send([tables.get_item(outbox.TABLE, {'outbox_id': item['outbox_id']})])
+
+    row = tables.rows(outbox.TABLE)[item['outbox_id']]
+    assert row['status'] == outbox.DEAD
+    assert row['attempts'] == Config.EMAIL_OUTBOX_MAX_ATTEMPTS
+    assert 'body' not in row
+    assert [dead['outbox_id'] for dead in outbox.dead_letters()] == [item['outbox_id']]
+    # Dead emails are never handed out again
+    assert outbox._poll() == 0
+
+
+def test_every_row_expires_after_retention(outbox, tables, monkeypatch):
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_RETENTION_HOURS', 72)
+    outbox.enqueue(_email())
+    row = next(iter(tables.rows(outbox.TABLE).values()))
+
+    expected = (datetime.now(timezone.utc) + timedelta(hours=72)).timestamp()
+    assert abs(row['expires_at'] - expected) <= 5